@@ -0,0 +1,80 @@
+# benchmarks/bench_excel_ingest.py
+# =========================================================
+# EXCEL UPLOAD INGEST – old vs streaming path
+#
+# Writes an N-row workbook shaped like the uploaded dataset,
+# then times:
+#   old   pd.read_excel → to_excel backup → to_csv
+#   new   raw-bytes backup → read_excel_chunked (calamine or
+#         openpyxl read-only) → type_dataset → Parquet
+# The typed frames of both readers are compared.
+#
+# Usage:
+#   python -m benchmarks.bench_excel_ingest [-n 100000]
+# =========================================================
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services import excel_reader  # noqa: E402
+from services.file_store import type_dataset  # noqa: E402
+from benchmarks.bench_global_search import synthetic_frame  # noqa: E402
+
+
+def timed(label, fn):
+    t0 = time.perf_counter()
+    out = fn()
+    print(f"  {label:<34} {time.perf_counter() - t0:7.2f} s")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Excel upload path")
+    parser.add_argument("-n", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "upload.xlsx")
+        frame = synthetic_frame(args.n)
+        frame["order_date"] = frame["order_date"].dt.date
+        frame.to_excel(src, index=False)
+        data = open(src, "rb").read()
+        print(f"workbook: {args.n} rows, {len(data) / 1e6:.1f} MB")
+
+        print("old")
+        t0 = time.perf_counter()
+        old = timed("pd.read_excel", lambda: pd.read_excel(src))
+        timed("to_excel backup", lambda: old.to_excel(os.path.join(tmp, "b.xlsx"), index=False))
+        timed("to_csv", lambda: old.to_csv(os.path.join(tmp, "b.csv"), index=False))
+        old_secs = time.perf_counter() - t0
+
+        print(f"new ({excel_reader.reader_name(src)})")
+        t0 = time.perf_counter()
+
+        def backup():
+            with open(os.path.join(tmp, "c.xlsx"), "wb") as f:
+                f.write(data)
+
+        timed("raw bytes backup", backup)
+        new = timed("read_excel_chunked", lambda: excel_reader.read_excel_chunked(data, src))
+        typed = timed("type_dataset", lambda: type_dataset(new))
+        timed("to_parquet", lambda: typed.to_parquet(os.path.join(tmp, "c.parquet"), index=False))
+        new_secs = time.perf_counter() - t0
+
+        print(f"total  old {old_secs:.2f} s  new {new_secs:.2f} s  ({old_secs / new_secs:.1f}x)")
+        same = type_dataset(old).equals(typed)
+        print(f"same typed frame as pd.read_excel: {same}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+# benchmarks/bench_extraction_throughput.py
+# =========================================================
+# END-TO-END EXTRACTION THROUGHPUT
+#
+# Runs every PDF extractor over the same corpus (synthetic
+# by default, see synthetic_corpus.py) and reports:
+#   pages/sec, docs/sec, p50 / p95 latency, peak RSS
+#
+# - Each extractor runs in its own fresh Python process so
+#   peak RSS is not polluted by the others
+# - PDF bytes are read before timing; caches are bypassed
+# - Fully offline (reportlab + the extractors' own deps)
+#
+# Usage:
+#   python -m benchmarks.bench_extraction_throughput
+#       [--corpus DIR] [-n 50] [--seed 0] [--only NAME ...]
+# =========================================================
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import resource
+import subprocess
+import tempfile
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+EXTRACTORS = ["custom_pdf_extractor", "extractor", "hybrid_pdf_extractor", "data_Extract"]
+
+
+# =========================================================
+# EXTRACTOR ADAPTERS (imported lazily, inside the worker)
+# =========================================================
+def _load_extractor(name):
+    """Return a callable taking raw PDF bytes."""
+    if name == "custom_pdf_extractor":
+        from services.custom_pdf_extractor import extract_pdf_structured_data
+        return lambda b: extract_pdf_structured_data(b, use_cache=False)
+    if name == "extractor":
+        from services.extractor import extract_pdf_to_table
+        return lambda b: extract_pdf_to_table(BytesIO(b))
+    if name == "hybrid_pdf_extractor":
+        from services.hybrid_pdf_extractor import extract_pdf
+        return extract_pdf
+    if name == "data_Extract":
+        from screens.data_Extract import process_single_pdf_bytes
+        return process_single_pdf_bytes
+    raise ValueError(f"Unknown extractor: {name}")
+
+
+def _page_count(pdf_bytes):
+    from pypdf import PdfReader
+    return len(PdfReader(BytesIO(pdf_bytes)).pages)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+# =========================================================
+# WORKER (one extractor, fresh process)
+# =========================================================
+def run_worker(name, corpus_dir, warmup):
+    paths = sorted(glob.glob(os.path.join(corpus_dir, "*.pdf")))
+    docs = []
+    for path in paths:
+        with open(path, "rb") as f:
+            docs.append(f.read())
+    pages = sum(_page_count(b) for b in docs)
+
+    extract = _load_extractor(name)
+    for b in docs[:warmup]:
+        extract(b)
+
+    latencies = []
+    errors = 0
+    t_start = time.perf_counter()
+    for b in docs:
+        t0 = time.perf_counter()
+        try:
+            extract(b)
+        except Exception:
+            errors += 1
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - t_start
+
+    # ru_maxrss is KiB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    return {
+        "extractor": name,
+        "docs": len(docs),
+        "pages": pages,
+        "errors": errors,
+        "seconds": elapsed,
+        "latencies_ms": latencies,
+        "peak_rss_mb": peak_rss_mb,
+    }
+
+
+def run_in_subprocess(name, corpus_dir, warmup):
+    proc = subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.bench_extraction_throughput",
+            "--worker", name, "--corpus", corpus_dir, "--warmup", str(warmup),
+        ],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    # Extractors may print; the result is always the last stdout line
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        err = proc.stderr.strip().splitlines()
+        print(f"{name:<22} FAILED: {err[-1] if err else proc.returncode}")
+        return None
+    return json.loads(lines[-1])
+
+
+# =========================================================
+# REPORT
+# =========================================================
+def report(result):
+    lat = result["latencies_ms"]
+    secs = result["seconds"] or float("inf")
+    print(
+        f"{result['extractor']:<22} "
+        f"{result['pages'] / secs:9.1f} "
+        f"{result['docs'] / secs:9.1f} "
+        f"{percentile(lat, 50):9.2f} "
+        f"{percentile(lat, 95):9.2f} "
+        f"{result['peak_rss_mb']:9.1f} "
+        f"{result['errors']:>6}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF extractor throughput")
+    parser.add_argument("--corpus", help="directory of PDFs (default: synthetic)")
+    parser.add_argument("-n", type=int, default=50, help="synthetic documents")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--only", nargs="+", choices=EXTRACTORS)
+    parser.add_argument("--worker", choices=EXTRACTORS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.corpus, args.warmup)))
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="gem_corpus_") as tmp:
+        corpus_dir = args.corpus
+        if not corpus_dir:
+            from benchmarks.synthetic_corpus import generate_corpus
+            corpus_dir = tmp
+            generate_corpus(corpus_dir, args.n, args.seed)
+            print(f"Synthetic corpus: {args.n} docs (seed {args.seed})")
+
+        print(
+            f"{'extractor':<22} {'pages/s':>9} {'docs/s':>9} "
+            f"{'p50 ms':>9} {'p95 ms':>9} {'RSS MB':>9} {'errors':>6}"
+        )
+        for name in args.only or EXTRACTORS:
+            result = run_in_subprocess(name, corpus_dir, args.warmup)
+            if result:
+                report(result)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+# benchmarks/bench_frame_memory.py
+# =========================================================
+# LOAD-TIME MEMORY COMPACTION – bytes before / after
+#
+# Builds an N-row frame shaped like the uploaded dataset
+# with every text column as plain Python strings (as the
+# old CSV store loaded it), runs compact_frame and prints
+# the per-column memory report and the time it took.
+#
+# Usage:
+#   python -m benchmarks.bench_frame_memory [-n 1000000]
+# =========================================================
+
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.frame_memory import compact_frame, memory_report  # noqa: E402
+from benchmarks.bench_global_search import synthetic_frame  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark load-time memory compaction")
+    parser.add_argument("-n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.n)
+    for c in df.columns:
+        if df[c].dtype.name in ("category", "str"):
+            df[c] = df[c].astype(object)
+    df["quantity"] = df["quantity"].astype("int64")
+
+    t0 = time.perf_counter()
+    compact = compact_frame(df)
+    secs = time.perf_counter() - t0
+
+    report = memory_report(df, compact)
+    print(report.to_string(index=False))
+
+    before = report["Before (bytes)"].sum()
+    after = report["After (bytes)"].sum()
+    print(f"total  {before / 1e6:,.1f} MB → {after / 1e6:,.1f} MB  "
+          f"({(1 - after / before) * 100:.1f}% saved, {secs:.2f} s)")
+    print(f"same values: {compact.astype(object).equals(df.astype(object))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# benchmarks/bench_global_search.py
+# =========================================================
+# GLOBAL SEARCH – SearchIndex vs row-wise apply
+#
+# Builds an N-row frame shaped like the uploaded dataset
+# (organization / buyer / seller / brand / category /
+# quantity / value / city / state / order_date), indexes it
+# once and times a few typical top-bar queries. The old
+# row-wise lambda is timed on a sample and extrapolated.
+#
+# Usage:
+#   python -m benchmarks.bench_global_search [-n 1000000]
+#       [--sample 20000]
+# =========================================================
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.search_index import SearchIndex  # noqa: E402
+from benchmarks.synthetic_corpus import CITIES, PRODUCTS, STATES  # noqa: E402
+
+QUERIES = ["pune", "vendor 1234", "hospital", "2024-03", "98765", "zzz-no-match"]
+
+
+def synthetic_frame(n, seed=0):
+    r = np.random.default_rng(seed)
+    pick = lambda values: np.asarray(values, dtype=object)[r.integers(0, len(values), n)]  # noqa: E731
+    numbered = lambda prefix, k: np.char.add(prefix, r.integers(0, k, n).astype(str)).astype(object)  # noqa: E731
+
+    return pd.DataFrame({
+        "organization_name": numbered("District Hospital ", max(1, n // 200)),
+        "buyer_name": numbered("Buyer ", max(1, n // 20)),
+        "buyer_contact_no": r.integers(6_000_000_000, 9_999_999_999, n),
+        "seller_name": numbered("Vendor ", max(1, n // 50)),
+        "brand_name": pd.Categorical(pick([p[2] for p in PRODUCTS])),
+        "category": pd.Categorical(pick([p[1] for p in PRODUCTS])),
+        "quantity": r.integers(1, 5000, n),
+        "value": r.integers(100, 5_000_000, n).astype(float),
+        "city": pd.Categorical(pick([c.title() for c in CITIES])),
+        "state": pd.Categorical(pick([s.title() for s in STATES])),
+        "order_date": pd.Timestamp("2023-01-01") + pd.to_timedelta(r.integers(0, 730, n), unit="D"),
+    })
+
+
+def rowwise(df, term):
+    s = term.lower()
+    return df[df.apply(lambda row: row.astype(str).str.lower().str.contains(s).any(), axis=1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the global search index")
+    parser.add_argument("-n", type=int, default=1_000_000)
+    parser.add_argument("--sample", type=int, default=20_000,
+                        help="rows for the row-wise baseline (0 = skip)")
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.n)
+
+    t0 = time.perf_counter()
+    index = SearchIndex(df)
+    print(f"index build  {args.n} rows  {time.perf_counter() - t0:7.2f} s")
+
+    print(f"  {'query':<16} {'first':>8}     {'rerun':>8}")
+    for q in QUERIES:
+        t0 = time.perf_counter()
+        hits = index.mask(q)
+        first = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        index.mask(q)
+        rerun = (time.perf_counter() - t0) * 1000
+        print(f"  {q!r:<16} {first:8.1f} ms  {rerun:8.3f} ms  {int(hits.sum()):>9} rows")
+
+    if args.sample:
+        sample = df.head(args.sample)
+        t0 = time.perf_counter()
+        expected = rowwise(sample, QUERIES[0])
+        secs = time.perf_counter() - t0
+        print(f"row-wise {QUERIES[0]!r} on {args.sample} rows  {secs:.2f} s  "
+              f"(~{secs * args.n / args.sample:.0f} s for {args.n})")
+        same = expected.index.equals(index.filter(sample, QUERIES[0]).index)
+        print(f"same rows as row-wise: {same}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# benchmarks/bench_powerbi_tables.py
+# =========================================================
+# STAR-SCHEMA BUILD – generate_powerbi_tables
+#
+# Builds Dim_Buyer / Dim_Seller / Dim_Product /
+# Fact_Contract_Sales from N synthetic extracted rows.
+# With --baseline the same rows go through the version at
+# an older git revision; timings and table equality are
+# reported.
+#
+# Usage:
+#   python -m benchmarks.bench_powerbi_tables [-n 100000]
+#       [--baseline REV]
+# =========================================================
+
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services import custom_pdf_extractor as current  # noqa: E402
+from benchmarks.bench_structured_fields import load_baseline  # noqa: E402
+from benchmarks.synthetic_corpus import (  # noqa: E402
+    CITIES, DESIGNATIONS, PRODUCTS, STATES, UNITS,
+)
+
+
+def synthetic_rows(n, seed=0):
+    """Extracted-contract dicts with realistic repetition of buyers/sellers/products."""
+    r = random.Random(seed)
+    buyers = [
+        (r.choice(DESIGNATIONS), f"buyer{i}@gov.in", f"0{r.randint(200, 999)}-{r.randint(1000000, 9999999)}",
+         r.choice(STATES).title())
+        for i in range(max(1, n // 20))
+    ]
+    sellers = [
+        (f"Vendor {i} Pvt Ltd", f"sales{i}@vendor.co.in", str(r.randint(6000000000, 9999999999)),
+         f"27AABCA{r.randint(1000, 9999)}B1Z9", r.choice(STATES).title(),
+         r.choice([f"{r.randint(10, 99)}B{r.randint(1000000, 9999999)}", "NA"]))
+        for i in range(max(1, n // 50))
+    ]
+
+    rows = []
+    for i in range(n):
+        b = r.choice(buyers)
+        s = r.choice(sellers)
+        product, category, brand = r.choice(PRODUCTS)
+        qty = r.randint(1, 5000)
+        price = r.choice([15, 70, 250, 1250])
+        rows.append({
+            "Contract No": f"GEMC-{511687700000 + i}",
+            "Organisation Name": f"District Hospital {r.choice(CITIES)}",
+            "Buyer Designation": b[0], "Buyer Email": b[1],
+            "Buyer Phone Number": b[2], "Buyer State": b[3],
+            "Seller Name": s[0], "Seller Shop Name": s[0], "Seller Email": s[1],
+            "Seller Phone Number": s[2], "Seller GSTIN": s[3], "Seller State": s[4],
+            "GeM Seller ID": s[5],
+            "Product Name": product, "Product Category": category, "Brand": brand,
+            "Unit": r.choice(UNITS), "Quantity": str(qty), "Unit Price": str(price),
+            "Total Order Value (INR)": r.choice([str(qty * price), "NA", "-"]),
+        })
+    return rows
+
+
+def timed(fn, rows):
+    t0 = time.perf_counter()
+    tables = fn(rows)
+    return time.perf_counter() - t0, tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generate_powerbi_tables")
+    parser.add_argument("-n", type=int, default=100_000)
+    parser.add_argument("--baseline", help="git revision to compare against")
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.n)
+    secs, tables = timed(current.generate_powerbi_tables, rows)
+    sizes = ", ".join(f"{k}={len(v)}" for k, v in tables.items())
+    print(f"current    {args.n} rows  {secs:7.2f} s  ({sizes})")
+
+    if args.baseline:
+        base_mod = load_baseline(args.baseline)
+        base_secs, base_tables = timed(base_mod.generate_powerbi_tables, rows)
+        print(f"{args.baseline:<10} {args.n} rows  {base_secs:7.2f} s")
+        print(f"speedup    {base_secs / secs:.2f}x")
+
+        same = all(tables[k].equals(base_tables[k]) for k in base_tables)
+        print(f"identical tables: {same}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
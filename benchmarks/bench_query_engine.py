@@ -0,0 +1,100 @@
+# benchmarks/bench_query_engine.py
+# =========================================================
+# SCREEN QUERIES – pandas (prepared frame) vs DuckDB
+#
+# Stores an N-row frame shaped like the uploaded dataset in a
+# temporary partitioned dataset, then runs the same screen
+# queries on both backends of services.query_engine:
+#   period KPIs, search + groupby-sum, category / city
+#   filters + groupby-sum, first 100 rows, one page of a
+#   sorted grid
+# Reports setup time, per-query latency, the bytes each
+# backend holds in Python and whether the results agree.
+#
+# Usage:
+#   python -m benchmarks.bench_query_engine [-n 1000000]
+# =========================================================
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.partitioned_store import DatasetStore  # noqa: E402
+from services.prepared_dataset import PreparedDataset  # noqa: E402
+from services.query_engine import FrameQuery, SqlDataset, SqlQuery, duckdb  # noqa: E402
+from benchmarks.bench_global_search import synthetic_frame  # noqa: E402
+
+PERIOD = dict(start_date="2024-01-01", end_date="2024-06-30", mode="custom")
+
+
+def scenarios(open_query):
+    return {
+        "period KPIs": lambda: open_query(**PERIOD).summary("value"),
+        "search + city sums": lambda: open_query(search="pune").group_sum("city", "value", n=5),
+        "filters + seller sums": lambda: (
+            open_query(**PERIOD)
+            .where_in("category", ["Malaria Kits", "Dengue Kits"])
+            .where_equals("city", "Pune")
+            .group_sum("seller_name", "value", n=5)
+        ),
+        "first 100 rows": lambda: open_query(**PERIOD).rows(limit=100),
+        "sorted page 41 of 50": lambda: open_query(**PERIOD).rows(
+            limit=50, offset=2000, order_by="value", ascending=False
+        ),
+    }
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, (time.perf_counter() - t0) * 1000
+
+
+def same(a, b) -> bool:
+    if isinstance(a, dict):
+        return a["rows"] == b["rows"] and abs(a["sum"] - b["sum"]) < 1e-6 * max(1, abs(a["sum"]))
+    return a.reset_index(drop=True).astype(str).equals(b.reset_index(drop=True).astype(str))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the screen query backends")
+    parser.add_argument("-n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if duckdb is None:
+        print("duckdb is not installed")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DatasetStore(os.path.join(tmp, "dataset"))
+        store.upsert(synthetic_frame(args.n))
+        files = store.files(store.select())
+        print(f"dataset: {args.n} rows, {len(files)} part files")
+
+        data, build = timed(lambda: PreparedDataset(store.load(), 0))
+        held = data.frame.memory_usage(deep=True).sum()
+        print(f"pandas  prepare {build / 1000:7.2f} s  frame held {held / 1e6:8.1f} MB")
+
+        sql, build = timed(lambda: SqlDataset(files))
+        print(f"duckdb  open    {build / 1000:7.2f} s  (rows stay on disk)")
+
+        frame_q = scenarios(lambda **kw: FrameQuery.open(data, **kw))
+        sql_q = scenarios(lambda **kw: SqlQuery.open(sql, **kw))
+
+        print(f"  {'query':<24} {'pandas':>9}    {'duckdb':>9}    result")
+        for name in frame_q:
+            a, ta = timed(frame_q[name])
+            b, tb = timed(sql_q[name])
+            size = len(b) if hasattr(b, "__len__") and not isinstance(b, dict) else 1
+            print(f"  {name:<24} {ta:8.1f} ms  {tb:8.1f} ms  {size:>4} rows  same: {same(a, b)}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# benchmarks/bench_structured_fields.py
+# =========================================================
+# MICRO-BENCHMARK – extract_structured_fields
+#
+# Times field extraction only (PDF text is read once up
+# front) over a corpus of contract PDFs. With --baseline the
+# same corpus is run through the extractor from an older git
+# revision and the per-document speedup is reported.
+#
+# Usage:
+#   python -m benchmarks.bench_structured_fields [PDF_DIR ...]
+#       [--baseline REV] [--repeat N]
+# =========================================================
+
+import os
+import sys
+import glob
+import time
+import argparse
+import statistics
+import subprocess
+import importlib.util
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services import custom_pdf_extractor as current  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(ROOT, "downloads", "*", "pdfs")
+
+
+def load_corpus(dirs):
+    paths = []
+    for d in dirs:
+        paths.extend(sorted(glob.glob(os.path.join(d, "*.pdf"))))
+
+    texts = []
+    for path in paths:
+        try:
+            raw = current.extract_pdf_to_text(path)
+        except Exception as e:
+            print(f"skip {os.path.basename(path)}: {e}")
+            continue
+        texts.append(current.clean_extracted_text(raw))
+    return texts
+
+
+def load_baseline(rev):
+    """Import services/custom_pdf_extractor.py as it was at `rev`."""
+    source = subprocess.check_output(
+        ["git", "show", f"{rev}:services/custom_pdf_extractor.py"],
+        cwd=ROOT
+    )
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".py")
+    tmp.write(source)
+    tmp.close()
+
+    spec = importlib.util.spec_from_file_location("baseline_extractor", tmp.name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    os.remove(tmp.name)
+    return module
+
+
+def time_per_doc(extract, texts, repeat):
+    """Best-of-`repeat` wall time per document, in milliseconds."""
+    timings = []
+    for text in texts:
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            extract(text)
+            best = min(best, time.perf_counter() - t0)
+        timings.append(best * 1000)
+    return timings
+
+
+def summarize(label, timings):
+    print(
+        f"{label:<10} docs={len(timings):<5} "
+        f"mean={statistics.mean(timings):8.3f} ms  "
+        f"median={statistics.median(timings):8.3f} ms  "
+        f"max={max(timings):8.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extract_structured_fields")
+    parser.add_argument("dirs", nargs="*", default=[DEFAULT_CORPUS])
+    parser.add_argument("--baseline", help="git revision to compare against")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = load_corpus(args.dirs)
+    if not texts:
+        print("No PDFs found in:", ", ".join(args.dirs))
+        return 1
+
+    cur = time_per_doc(current.extract_structured_fields, texts, args.repeat)
+    summarize("current", cur)
+
+    if args.baseline:
+        base_mod = load_baseline(args.baseline)
+        base = time_per_doc(base_mod.extract_structured_fields, texts, args.repeat)
+        summarize(args.baseline, base)
+
+        speedups = [b / c for b, c in zip(base, cur) if c > 0]
+        print(
+            f"speedup    median={statistics.median(speedups):.2f}x  "
+            f"min={min(speedups):.2f}x  max={max(speedups):.2f}x"
+        )
+
+        diffs = sum(
+            base_mod.extract_structured_fields(t) != current.extract_structured_fields(t)
+            for t in texts
+        )
+        print(f"output mismatches: {diffs}/{len(texts)}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
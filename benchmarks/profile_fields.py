@@ -0,0 +1,60 @@
+# benchmarks/profile_fields.py
+# =========================================================
+# SLOWEST FIELDS / PATTERNS ACROSS A BATCH
+#
+# Runs extract_structured_fields under the opt-in profiler
+# (services/extraction_profile.py) and writes the sorted
+# per-field and per-pattern timing report.
+#
+# Usage:
+#   python -m benchmarks.profile_fields [PDF_DIR ...]
+#       [--synthetic N] [--top 20] [--out report.txt]
+# =========================================================
+
+import os
+import sys
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services import custom_pdf_extractor as extractor  # noqa: E402
+from services.extraction_profile import profiling  # noqa: E402
+from benchmarks.bench_structured_fields import DEFAULT_CORPUS, load_corpus  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-field extraction timing report")
+    parser.add_argument("dirs", nargs="*", default=[DEFAULT_CORPUS])
+    parser.add_argument("--synthetic", type=int, metavar="N",
+                        help="profile N synthetic contracts instead")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--out", help="also write the full report here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="gem_corpus_") as tmp:
+        dirs = args.dirs
+        if args.synthetic:
+            from benchmarks.synthetic_corpus import generate_corpus
+            generate_corpus(tmp, args.synthetic)
+            dirs = [tmp]
+        texts = load_corpus(dirs)
+
+    if not texts:
+        print("No PDFs found in:", ", ".join(dirs))
+        return 1
+
+    with profiling() as prof:
+        for text in texts:
+            extractor.extract_structured_fields(text)
+
+    print(prof.report(args.top))
+    if args.out:
+        prof.write_report(args.out)
+        print(f"Full report written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
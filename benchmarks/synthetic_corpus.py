@@ -0,0 +1,207 @@
+# benchmarks/synthetic_corpus.py
+# =========================================================
+# SYNTHETIC GeM CONTRACT CORPUS (REPORTLAB, OFFLINE)
+#
+# - Deterministic per (seed, index): same corpus every run
+# - Varies buyer / seller / product blocks and page count
+# - Mixes in doubled-glyph headers and labels
+#   ("SSeelllleerr DDeettaaiillss") as some GeM fonts emit
+# - Writes contract_0000.pdf ... into the output directory
+#
+# Usage:
+#   python -m benchmarks.synthetic_corpus OUT_DIR [-n 50] [--seed 0]
+# =========================================================
+
+import os
+import sys
+import random
+import argparse
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+STATES = [
+    "MAHARASHTRA", "GUJARAT", "UTTAR PRADESH", "BIHAR", "DELHI",
+    "KARNATAKA", "JHARKHAND", "ASSAM",
+]
+CITIES = ["Pune", "Surat", "Lucknow", "Patna", "New Delhi", "Mysuru", "Ranchi", "Guwahati"]
+ORGANISATIONS = [
+    "National Health Mission", "District Hospital", "Collector Office",
+    "Community Health Centre", "Municipal Corporation", "Public Works Department",
+]
+DEPARTMENTS = [
+    "Health & Family Welfare Department", "Public Health Department",
+    "Revenue Department", "Medical Education Department",
+]
+DESIGNATIONS = ["District Health Officer", "Medical Officer", "Accountant", "Store Officer"]
+PRODUCTS = [
+    ("Malaria Rapid Diagnostic Test Kit", "Malaria Kits", "TRUSTwell"),
+    ("Dengue NS1 Antigen Kit", "Dengue Kits", "J Mitra"),
+    ("Widal ELISA Rapid Kit", "Typhoid Kits", "Pratham"),
+    ("Office Chair Revolving", "Office Furniture", "Godrej"),
+    ("A4 Copier Paper 75 GSM", "Paper Products", "JK Copier"),
+]
+UNITS = ["Pieces", "Nos", "Test", "Packs"]
+
+FILLER = (
+    "The seller shall deliver the ordered goods to the consignee within the "
+    "delivery period. Payment will be released by the paying authority after "
+    "receipt and acceptance of goods. All terms of the GeM General Terms and "
+    "Conditions apply to this contract."
+)
+
+
+def doubled(text):
+    """'Seller Details' -> 'SSeelllleerr DDeettaaiillss'"""
+    return " ".join("".join(c * 2 for c in word) for word in text.split(" "))
+
+
+def _maybe_doubled(r, text, p=0.3):
+    return doubled(text) if r.random() < p else text
+
+
+def _money(value):
+    return f"{value:,}"
+
+
+# =========================================================
+# CONTRACT CONTENT
+# =========================================================
+def contract_lines(i, seed=0):
+    """Text lines of synthetic contract `i` (deterministic)."""
+    r = random.Random(seed * 1_000_003 + i)
+    state = r.choice(STATES)
+    city = r.choice(CITIES)
+    product, category, brand = r.choice(PRODUCTS)
+    qty = r.randint(1, 20000)
+    price = r.choice([15, 70, 250, 1250, 4999])
+    total = qty * price
+    day = r.randint(1, 28)
+    month = r.choice(["Jan", "Mar", "Jun", "Sep", "Dec"])
+    year = r.choice([2023, 2024, 2025])
+
+    lines = [
+        "Contract",
+        f"Contract No: GEMC-{511687700000 + seed * 100_000 + i}",
+        f"Generated Date : {day}-{month}-{year}",
+        "Ministry : " + r.choice(["Ministry of Health", "State Government", "-"]),
+        "Department : " + r.choice(DEPARTMENTS),
+        "",
+        _maybe_doubled(r, "Buyer Details"),
+        "Designation : " + r.choice(DESIGNATIONS),
+        f"Contact No. : 0{r.randint(200, 999)}-{r.randint(1000000, 9999999)}",
+        f"Email ID : buyer{i}@gov.in",
+        "Organisation Name : " + r.choice(ORGANISATIONS) + f" {city}",
+        f"Address : Ward {r.randint(1, 40)}, Civil Lines, {city},",
+        f"{state}-{r.randint(110000, 859999)}",
+    ]
+    if r.random() < 0.6:
+        lines.append(f"GSTIN : 27AAAGN{r.randint(1000, 9999)}M1Z5")
+
+    if r.random() < 0.5:
+        lines += [
+            "",
+            "Paying Authority Details",
+            "Role : PAO",
+            f"GSTIN : 27AAAGP{r.randint(1000, 9999)}M1Z6",
+        ]
+    if r.random() < 0.4:
+        lines += ["Financial Approval Detail", "IFD Concurrence : No"]
+
+    lines += [
+        "",
+        _maybe_doubled(r, "Seller Details", p=0.5),
+        _maybe_doubled(r, "GeM Seller ID") + f" : {r.randint(10, 99)}B{r.randint(1000000, 9999999)}P{i:04d}",
+        f"Company Name : {r.choice(['Acme', 'Shree', 'Bharat', 'Om'])} {i} Enterprises Pvt Ltd",
+        f"Contact No. : {r.randint(6000000000, 9999999999)}",
+        f"Email ID : sales{i}@vendor.co.in",
+        f"Address : Plot {r.randint(1, 500)}, Industrial Area, {r.choice(CITIES)},",
+        f"{r.choice(STATES)}-{r.randint(110000, 859999)}",
+        "MSME Registration number : UDYAM-" + str(r.randint(100000, 999999)),
+        f"GSTIN : 27AABCA{r.randint(1000, 9999)}B1Z9",
+        "",
+        _maybe_doubled(r, "Product Details"),
+        _maybe_doubled(r, "Product Name") + f" : {product}",
+        _maybe_doubled(r, "Brand") + f" : {brand}",
+        "Brand Type : OEM",
+        _maybe_doubled(r, "Category Name") + f" & Quadrant : {category}",
+        f"Model : M{r.randint(1, 999)}",
+        f"Ordered Unit : {r.choice(UNITS)}",
+        f"1 {_money(qty)} {r.choice(UNITS)} {_money(price)} NA {_money(total)}",
+        f"Total Order Value (in INR) {_money(total)}",
+        "",
+        "Consignee Details",
+        f"Consignee : {r.choice(DESIGNATIONS)}, {city}",
+        f"Delivery by {day}-{month}-{year}",
+    ]
+
+    # Trailing specification / terms pages vary the page count
+    for _ in range(r.randint(0, 3)):
+        lines.append("<page>")
+        lines.append("Specification")
+        lines += [FILLER] * r.randint(10, 40)
+
+    lines += ["", "Terms and Conditions", FILLER]
+    return lines
+
+
+# =========================================================
+# PDF RENDERING
+# =========================================================
+def _wrap(text, width=95):
+    out = []
+    while len(text) > width:
+        cut = text.rfind(" ", 0, width)
+        cut = cut if cut > 0 else width
+        out.append(text[:cut])
+        text = text[cut:].lstrip()
+    out.append(text)
+    return out
+
+
+def write_contract_pdf(path, lines):
+    c = canvas.Canvas(path, pagesize=A4)
+    _, height = A4
+    margin = 50
+    y = height - margin
+
+    for line in lines:
+        if line == "<page>":
+            c.showPage()
+            y = height - margin
+            continue
+        for part in _wrap(line):
+            if y < margin:
+                c.showPage()
+                y = height - margin
+            c.setFont("Helvetica", 9)
+            c.drawString(margin, y, part)
+            y -= 12
+    c.save()
+
+
+def generate_corpus(out_dir, n=50, seed=0):
+    """Write `n` synthetic contracts to `out_dir`; returns their paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i in range(n):
+        path = os.path.join(out_dir, f"contract_{i:04d}.pdf")
+        write_contract_pdf(path, contract_lines(i, seed))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic GeM contract PDFs")
+    parser.add_argument("out_dir")
+    parser.add_argument("-n", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_corpus(args.out_dir, args.n, args.seed)
+    print(f"{len(paths)} PDFs in {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
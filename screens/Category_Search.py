@@ -1,44 +1,10 @@
 import streamlit as st
-import pandas as pd
 
-from services.file_store import load_saved_excel
-from services.date_filter import apply_date_filter
+from services.prepared_dataset import dataset_categories
+from services.query_engine import open_query
+from services.data_grid import paginated_grid
 
-
-# =========================================================
-# DATE COLUMN DETECTION (ROBUST)
-# =========================================================
-def detect_date_column(df):
-    patterns = ["date", "orderdate", "order_date", "created", "timestamp"]
-
-    for c in df.columns:
-        name = c.lower().replace(" ", "")
-        if any(p in name for p in patterns):
-            df[c] = pd.to_datetime(df[c], errors="coerce")
-            if df[c].dropna().any():
-                return c
-
-    for c in df.columns:
-        sample = df[c].dropna().astype(str).head(15)
-        parsed = pd.to_datetime(sample, errors="coerce")
-        if parsed.notna().mean() >= 0.6:
-            df[c] = pd.to_datetime(df[c], errors="coerce")
-            if df[c].dropna().any():
-                return c
-
-    return None
-
-
-# =========================================================
-# GENERIC COLUMN FINDER
-# =========================================================
-def detect_column(df, keywords):
-    cols = {c.lower(): c for c in df.columns}
-    for key in keywords:
-        for c in cols:
-            if key in c:
-                return cols[c]
-    return None
+CATEGORY_KEY = "category_search_categories"
 
 
 # =========================================================
@@ -49,68 +15,39 @@ def app(search=None, start_date=None, end_date=None, mode=None):
     st.markdown("## 🔍 Category Search")
     st.caption("Filter data dynamically based on uploaded Excel")
 
-    # ---------------- LOAD DATA ----------------
-    df = load_saved_excel()
-    if df is None or df.empty:
+    # ---------------- CATEGORY PARTITIONS ----------------
+    # Categories stored for the period; when some are picked,
+    # only their rows are queried
+    partition_col, stored_categories = dataset_categories(start_date, end_date, mode)
+    picked = None
+    if partition_col is not None:
+        picked = [c for c in st.session_state.get(CATEGORY_KEY, []) if c in stored_categories]
+        st.session_state[CATEGORY_KEY] = picked
+
+    # ---------------- LOAD DATA (PERIOD + SEARCH APPLIED) ----------------
+    query = open_query(search, start_date, end_date, mode, categories=picked or None)
+    if query is None:
         st.warning("⚠ Please upload Excel in **Master Category** first.")
         return
 
-    df = df.copy()
-    df.columns = df.columns.str.strip()
-
-    # ---------------- DATE COLUMN ----------------
-    date_col = detect_date_column(df)
-
-    # ---------------- APPLY DATE FILTER ----------------
-    if date_col and start_date is not None and mode is not None:
-        filtered, label, d1, d2 = apply_date_filter(
-            df,
-            date_col=date_col,
-            from_date=start_date,
-            to_date=end_date,
-            mode=mode
+    if query.label:
+        st.caption(
+            f"📌 Period Applied: **{query.label}** "
+            f"({query.start.strftime('%Y-%m-%d')} → {query.end.strftime('%Y-%m-%d')})"
         )
 
-        if label:
-            st.caption(
-                f"📌 Period Applied: **{label}** "
-                f"({d1.strftime('%Y-%m-%d')} → {d2.strftime('%Y-%m-%d')})"
-            )
-    else:
-        filtered = df.copy()
-
-    # ---------------- GLOBAL SEARCH ----------------
-    if search and search.strip():
-        s = search.lower()
-        filtered = filtered[
-            filtered.apply(
-                lambda r: r.astype(str).str.lower().str.contains(s).any(),
-                axis=1
-            )
-        ]
-
-    if filtered.empty:
+    if query.count() == 0:
         st.info("ℹ️ No records found.")
         return
 
-    # ---------------- AUTO COLUMN DETECTION ----------------
-    category_col = detect_column(filtered, ["category", "brand", "type", "segment"])
-    city_col     = detect_column(filtered, ["city", "state", "district", "location"])
-    name_col     = detect_column(filtered, ["seller", "buyer", "name", "firm"])
-    value_col    = detect_column(filtered, ["amount", "value", "price", "total"])
-
-    text_cols = filtered.select_dtypes(include="object").columns.tolist()
-
-    if not category_col:
-        category_col = text_cols[0]
-    if not city_col:
-        city_col = text_cols[0]
-    if not name_col:
-        name_col = text_cols[0]
+    # ---------------- COLUMN ROLES ----------------
+    text_cols = query.role("text", [])
+    first_text = text_cols[0] if text_cols else None
 
-    if not value_col:
-        filtered["_auto_value"] = 1
-        value_col = "_auto_value"
+    category_col = query.role("category", first_text)
+    city_col     = query.role("location", first_text)
+    name_col     = query.role("name", first_text)
+    value_col    = query.role("value")   # None → row counts
 
     # ---------------- FILTER PANEL ----------------
     left, right = st.columns([1, 3])
@@ -118,60 +55,66 @@ def app(search=None, start_date=None, end_date=None, mode=None):
     with left:
         st.subheader("🎯 Filters")
 
+        if partition_col is not None and category_col == partition_col:
+            category_options = stored_categories
+        else:
+            category_options = query.distinct(category_col)
+
         selected_categories = st.multiselect(
             "Category",
-            sorted(filtered[category_col].dropna().unique())
+            category_options,
+            key=CATEGORY_KEY
         )
 
         selected_city = st.selectbox(
             "City",
-            ["All"] + sorted(filtered[city_col].dropna().unique())
+            ["All"] + query.distinct(city_col)
         )
 
         name_search = st.text_input("Seller / Buyer / Firm")
 
     # ---------------- APPLY FILTERS ----------------
     if selected_categories:
-        filtered = filtered[filtered[category_col].isin(selected_categories)]
+        query = query.where_in(category_col, selected_categories)
 
     if selected_city != "All":
-        filtered = filtered[filtered[city_col] == selected_city]
+        query = query.where_equals(city_col, selected_city)
 
     if name_search.strip():
-        filtered = filtered[
-            filtered[name_col]
-            .astype(str)
-            .str.contains(name_search, case=False, na=False)
-        ]
+        query = query.where_contains(name_col, name_search)
+
+    if value_col:
+        stats = query.summary(value_col)
+        total_records, total_value = stats["rows"], stats["sum"]
+    else:
+        total_records = total_value = query.count()
 
-    if filtered.empty:
+    if total_records == 0:
         st.info("ℹ️ No data after applying filters.")
         return
 
-    # ---------------- ADD S.No (FINAL FIX) ----------------
-    filtered = filtered.reset_index(drop=True)
-    filtered.insert(0, "S.No", range(1, len(filtered) + 1))
+    # ---------------- DOWNLOAD (BUILT ON CLICK) ----------------
+    def export_csv():
+        rows = query.rows().reset_index(drop=True)
+        rows.insert(0, "S.No", range(1, len(rows) + 1))
+        return rows.to_csv(index=False).encode("utf-8")
 
     # ---------------- RESULTS ----------------
     with right:
         st.subheader("📊 Results")
 
         c1, c2 = st.columns(2)
-        c1.metric("Total Records", f"{len(filtered):,}")
-        c2.metric("Total Value", f"{filtered[value_col].sum():,.0f}")
+        c1.metric("Total Records", f"{total_records:,}")
+        c2.metric("Total Value", f"{total_value:,.0f}")
 
         st.markdown("---")
 
-        st.dataframe(
-            filtered,
-            hide_index=True,          # ❌ 0/1/2 index gone
-            use_container_width=True,
-            height=420
-        )
+        # One page at a time; S.No numbers rows within the full result
+        paginated_grid(query, key="category_search_grid", total=total_records)
 
         st.download_button(
             "⬇️ Download Excel",
-            data=filtered.to_csv(index=False).encode("utf-8"),
+            data=export_csv,
             file_name="category_search_output.csv",
             mime="text/csv"
         )
@@ -1,18 +1,33 @@
 # screens/Date_Update.py
 import streamlit as st
 import os
-import pandas as pd
+
+from services.file_store import save_excel_file
 
 def app():
     st.title("Data Update Module")
 
-    st.info("Upload a new Excel file to update dataset. File will overwrite data/gem_orders_clean.xlsx (keep backup!).")
+    st.info(
+        "Upload a new Excel file to update the dataset. Rows are added to earlier uploads; "
+        "rows with a known contract / order number are updated. "
+        "A copy of the file is kept as data/gem_orders_clean.xlsx."
+    )
 
+    replace = st.checkbox("Replace all existing data with this file")
     uploaded = st.file_uploader("Upload Excel", type=["xlsx"])
-    if uploaded is not None:
-        # save uploaded
+    # Saved on click only: reruns / ticking the checkbox never re-write the dataset
+    if uploaded is not None and st.button("💾 Save to dataset"):
+        # keep the uploaded workbook as-is
         save_path = "data/gem_orders_clean.xlsx"
-        df = pd.read_excel(uploaded, engine="openpyxl")
-        df.to_excel(save_path, index=False)
-        st.success("File uploaded and replaced dataset.")
-        st.write("Rows:", len(df))
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        with open(save_path, "wb") as f:
+            f.write(uploaded.getvalue())
+
+        stats = save_excel_file(uploaded, replace=replace)
+        if stats is not None:
+            st.success(
+                "File uploaded and replaced dataset." if replace
+                else "File uploaded and merged into dataset."
+            )
+            st.write("Rows:", stats["rows"])
+            st.write("Added:", stats["added"], "Updated:", stats["updated"])
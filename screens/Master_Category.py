@@ -5,11 +5,52 @@ import sys
 import pandas as pd
 
 from services.category_folder import setup_category
-from services.file_store import load_saved_excel, save_excel_file
+from services.file_store import preview_saved_excel, saved_memory_report, start_excel_ingest
 from services.custom_pdf_extractor import (
-    extract_pdf_structured_data,
+    DEFAULT_BATCH_WORKERS,
+    extract_pdf_structured_data_batch,
     generate_powerbi_tables
 )
+from services.powerbi_store import PowerBIStore
+from services.powerbi_export import export_powerbi_columnar, powerbi_columnar_zip
+
+
+EXCLUDED_EXTRACT_COLS = [
+    "Generated Date",
+    "Ministry",
+    "PDF Name",
+    "Buyer GSTIN"
+]
+
+
+@st.fragment(run_every=0.5)
+def _ingest_progress(job):
+    # Polls the background ingest; one full rerun once it's done
+    if not job.finished:
+        if job.stage == "queued":
+            text = f"{job.filename} waits for earlier uploads to be saved…"
+        elif job.stage != "reading":
+            text = f"Saving {job.filename} ({job.stage})…"
+        elif job.total_rows:
+            text = f"Reading {job.filename}: {job.rows_read:,} / {job.total_rows:,} rows"
+        else:
+            text = f"Reading {job.filename}: {job.rows_read:,} rows"
+        st.progress(job.fraction(), text=text)
+        return
+    st.rerun()
+
+
+def _extracted_display_frame(rows):
+    df = pd.DataFrame(rows)
+
+    df_display = df.drop(
+        columns=[c for c in EXCLUDED_EXTRACT_COLS if c in df.columns],
+        errors="ignore"
+    )
+
+    df_display = df_display.reset_index(drop=True)
+    df_display.insert(0, "S.No", range(1, len(df_display) + 1))
+    return df_display
 
 
 # =========================================================
@@ -113,21 +154,28 @@ def app(search=None, start_date=None, end_date=None, quarter=None):
 
     # ---------------- TAB 1: EXCEL UPLOAD ----------------
     with tab_upload:
+        upload_mode = st.radio(
+            "Upload mode",
+            ["Append / update", "Replace all data"],
+            horizontal=True,
+            help="Append adds the rows to earlier uploads; rows with a known "
+                 "contract / order number are updated in place"
+        )
         excel_file = st.file_uploader("Upload Excel", type=["xls", "xlsx"])
         if excel_file:
-            df = save_excel_file(excel_file)
-            if df is not None:
-                df = df.reset_index(drop=True)
-                df.insert(0, "S.No", range(1, len(df) + 1))
-
-                st.dataframe(
-                    df.head(200),
-                    hide_index=True,
-                    use_container_width=True
+            job = start_excel_ingest(excel_file, replace=upload_mode == "Replace all data")
+            if not job.finished:
+                _ingest_progress(job)
+            elif job.stage == "error":
+                st.error(f"Error while saving Excel file: {job.error}")
+            elif job.stage == "done":
+                st.success(
+                    f"Excel uploaded successfully ({job.rows:,} rows: "
+                    f"{job.stats['added']:,} added, {job.stats['updated']:,} updated)"
                 )
-                st.success("Excel uploaded successfully")
 
-        saved_df = load_saved_excel()
+        # First rows only: the screens hold the dataset, not this preview
+        saved_df = preview_saved_excel(200)
         if saved_df is not None:
             st.subheader("Last Saved Excel")
 
@@ -135,11 +183,30 @@ def app(search=None, start_date=None, end_date=None, quarter=None):
             saved_df.insert(0, "S.No", range(1, len(saved_df) + 1))
 
             st.dataframe(
-                saved_df.head(200),
+                saved_df,
                 hide_index=True,
                 use_container_width=True
             )
 
+            # Load-time compaction: bytes per column before / after (sampled)
+            report = saved_memory_report()
+            if report is not None:
+                with st.expander("🧠 Memory Report"):
+                    before = report["Before (bytes)"].sum()
+                    after = report["After (bytes)"].sum()
+
+                    m1, m2, m3 = st.columns(3)
+                    m1.metric("As Loaded", f"{before / 1e6:,.2f} MB")
+                    m2.metric("Compacted", f"{after / 1e6:,.2f} MB")
+                    m3.metric("Saved", f"{(1 - after / before) * 100 if before else 0:.1f}%")
+                    st.caption("Estimated from a sample of the stored rows, scaled to the full dataset")
+
+                    st.dataframe(
+                        report,
+                        hide_index=True,
+                        use_container_width=True
+                    )
+
     # ---------------- TAB 2: MANUAL PDF EXTRACT ----------------
     with tab_pdf:
         st.subheader("📄 Manual PDF Extract (Final Output)")
@@ -150,49 +217,66 @@ def app(search=None, start_date=None, end_date=None, quarter=None):
             accept_multiple_files=True
         )
 
+        workers = st.number_input(
+            "Parallel workers",
+            min_value=1,
+            max_value=max(1, os.cpu_count() or 1),
+            value=DEFAULT_BATCH_WORKERS,
+            help="PDFs are extracted on this many processes"
+        )
+
         if uploaded_pdfs:
             from io import BytesIO
 
             structured_rows = []
 
-            for idx, pdf_file in enumerate(uploaded_pdfs, start=1):
-                st.markdown(f"### 📘 {idx}. {pdf_file.name}")
-
-                data = extract_pdf_structured_data(pdf_file)
+            st.subheader("📊 Extracted Contract Data")
+            progress = st.progress(0.0, text="Extracting PDFs...")
+            table_slot = st.empty()
+            total = len(uploaded_pdfs)
+
+            for idx, data in extract_pdf_structured_data_batch(
+                uploaded_pdfs, max_workers=int(workers)
+            ):
+                pdf_name = uploaded_pdfs[idx].name
+                progress.progress(
+                    (idx + 1) / total,
+                    text=f"📘 {idx + 1}/{total}. {pdf_name}"
+                )
 
-                if not any(data.values()):
-                    st.warning("No valid data extracted from this PDF")
+                if not data or not any(data.values()):
+                    st.warning(f"No valid data extracted from {pdf_name}")
                     continue
 
                 structured_rows.append(data)
-
-            if structured_rows:
-                powerbi_tables = generate_powerbi_tables(structured_rows)
-
-                df = pd.DataFrame(structured_rows)
-
-                excluded_cols = [
-                    "Generated Date",
-                    "Ministry",
-                    "PDF Name",
-                    "Buyer GSTIN"
-                ]
-
-                df_display = df.drop(
-                    columns=[c for c in excluded_cols if c in df.columns],
-                    errors="ignore"
-                )
-
-                df_display = df_display.reset_index(drop=True)
-                df_display.insert(0, "S.No", range(1, len(df_display) + 1))
-
-                st.subheader("📊 Extracted Contract Data")
-                st.dataframe(
-                    df_display,
+                table_slot.dataframe(
+                    _extracted_display_frame(structured_rows),
                     hide_index=True,
                     use_container_width=True
                 )
 
+            progress.empty()
+
+            if structured_rows:
+                category = st.session_state.selected_category
+                store = PowerBIStore(category) if category else None
+
+                if store is not None and st.checkbox(
+                    f"Add to stored {category} Power BI model",
+                    value=True,
+                    help="Upsert these contracts into the persistent star schema "
+                         "instead of building tables from this upload only"
+                ):
+                    powerbi_tables = generate_powerbi_tables(structured_rows, store=store)
+                    st.caption(
+                        f"Stored model: {len(powerbi_tables['Fact_Contract_Sales'])} contracts "
+                        f"(data/powerbi/{category})"
+                    )
+                else:
+                    powerbi_tables = generate_powerbi_tables(structured_rows)
+
+                df_display = _extracted_display_frame(structured_rows)
+
                 st.subheader("📈 Power BI Ready Tables")
 
                 t1, t2, t3, t4 = st.tabs([
@@ -216,7 +300,7 @@ def app(search=None, start_date=None, end_date=None, quarter=None):
                             use_container_width=True
                         )
 
-                col1, col2 = st.columns(2)
+                col1, col2, col3 = st.columns(3)
 
                 with col1:
                     buffer = BytesIO()
@@ -251,3 +335,23 @@ def app(search=None, start_date=None, end_date=None, quarter=None):
                         file_name="GEM_PowerBI_Tables.xlsx",
                         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                     )
+
+                with col3:
+                    fmt = st.radio(
+                        "Columnar format",
+                        ["parquet", "arrow"],
+                        format_func={"parquet": "Parquet", "arrow": "Arrow IPC"}.get,
+                        horizontal=True
+                    )
+
+                    st.download_button(
+                        "⬇️ Download Power BI Parquet/Arrow (zip)",
+                        data=powerbi_columnar_zip(powerbi_tables, fmt),
+                        file_name=f"GEM_PowerBI_Tables_{fmt}.zip",
+                        mime="application/zip"
+                    )
+
+                    if category and st.button("💾 Save to category folder"):
+                        _, excel_dir = setup_category(category)
+                        paths = export_powerbi_columnar(powerbi_tables, excel_dir, fmt)
+                        st.success(f"Saved {len(paths)} files to {excel_dir}")
@@ -2,44 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-from services.file_store import load_saved_excel
-from services.date_filter import apply_date_filter
-
-
-# =========================================================
-# DATE COLUMN DETECTION (ROBUST)
-# =========================================================
-def detect_date_column(df):
-    patterns = ["date", "orderdate", "order_date", "created", "timestamp"]
-
-    for c in df.columns:
-        name = c.lower().replace(" ", "")
-        if any(p in name for p in patterns):
-            df[c] = pd.to_datetime(df[c], errors="coerce")
-            if df[c].dropna().any():
-                return c
-
-    for c in df.columns:
-        sample = df[c].dropna().astype(str).head(15)
-        parsed = pd.to_datetime(sample, errors="coerce")
-        if parsed.notna().mean() >= 0.6:
-            df[c] = pd.to_datetime(df[c], errors="coerce")
-            if df[c].dropna().any():
-                return c
-
-    return None
-
-
-# =========================================================
-# GENERIC COLUMN FINDER
-# =========================================================
-def detect_column(df, keywords):
-    cols = {c.lower(): c for c in df.columns}
-    for key in keywords:
-        for c in cols:
-            if key in c:
-                return cols[c]
-    return None
+from services.query_engine import open_query
+from services.data_grid import paginated_grid
 
 
 # =========================================================
@@ -50,69 +14,30 @@ def app(search=None, start_date=None, end_date=None, mode=None):
     st.markdown("## 📄 Reports & Insights")
     st.caption("Dynamic reports & charts from any Excel file")
 
-    # ---------------- LOAD DATA ----------------
-    df = load_saved_excel()
-    if df is None or df.empty:
+    # ---------------- LOAD DATA (PERIOD + SEARCH APPLIED) ----------------
+    query = open_query(search, start_date, end_date, mode)
+    if query is None:
         st.warning("⚠ Please upload Excel in **Master Category** first.")
         return
 
-    df = df.copy()
-    df.columns = df.columns.str.strip()
-
-    # ---------------- DATE COLUMN ----------------
-    date_col = detect_date_column(df)
-
-    # ---------------- APPLY DATE FILTER ----------------
-    if date_col and start_date is not None and mode is not None:
-        filtered, label, d1, d2 = apply_date_filter(
-            df,
-            date_col=date_col,
-            from_date=start_date,
-            to_date=end_date,
-            mode=mode
+    if query.label:
+        st.caption(
+            f"📌 Period Applied: **{query.label}** "
+            f"({query.start.strftime('%Y-%m-%d')} → {query.end.strftime('%Y-%m-%d')})"
         )
-        if label:
-            st.caption(
-                f"📌 Period Applied: **{label}** "
-                f"({d1.strftime('%Y-%m-%d')} → {d2.strftime('%Y-%m-%d')})"
-            )
-    else:
-        filtered = df.copy()
-
-    # ---------------- GLOBAL SEARCH ----------------
-    if search and search.strip():
-        s = search.lower()
-        filtered = filtered[
-            filtered.apply(
-                lambda r: r.astype(str).str.lower().str.contains(s).any(),
-                axis=1
-            )
-        ]
 
-    if filtered.empty:
+    if query.count() == 0:
         st.info("ℹ️ No data found for selected filters.")
         return
 
-    # ---------------- SMART COLUMN DETECTION ----------------
-    category_col = detect_column(filtered, ["category", "brand", "type", "segment"])
-    city_col     = detect_column(filtered, ["city", "state", "district", "location"])
-    seller_col   = detect_column(filtered, ["seller", "buyer", "organisation", "organization", "name", "firm"])
-    value_col    = detect_column(filtered, ["value", "amount", "price", "total"])
-
-    text_cols = filtered.select_dtypes(include="object").columns.tolist()
-
-    if not category_col and text_cols:
-        category_col = text_cols[0]
-    if not city_col and text_cols:
-        city_col = text_cols[0]
-    if not seller_col and text_cols:
-        seller_col = text_cols[0]
+    # ---------------- COLUMN ROLES ----------------
+    text_cols = query.role("text", [])
+    first_text = text_cols[0] if text_cols else None
 
-    if not value_col:
-        filtered["_auto_value"] = 1
-        value_col = "_auto_value"
-
-    filtered[value_col] = pd.to_numeric(filtered[value_col], errors="coerce").fillna(0)
+    category_col = query.role("category", first_text)
+    city_col     = query.role("location", first_text)
+    seller_col   = query.role("seller", first_text)
+    value_col    = query.role("value")   # None → row counts
 
     # ---------------- REPORT CONTROLS ----------------
     st.subheader("📝 Report Configuration")
@@ -134,45 +59,34 @@ def app(search=None, start_date=None, end_date=None, mode=None):
 
         selected_columns = st.multiselect(
             "Select Columns (for Detailed / Custom)",
-            filtered.columns.tolist(),
-            default=filtered.columns.tolist()[:6]
+            query.columns,
+            default=query.columns[:6]
         )
 
     # ---------------- GENERATE REPORT ----------------
     if st.button("🚀 Generate Report"):
 
         if report_type in ["Detailed", "Custom Columns"]:
-            report_df = filtered[selected_columns] if selected_columns else filtered
+            report_df = query.rows(selected_columns or None)
 
         elif report_type == "Summary":
+            total_records = query.count()
             report_df = pd.DataFrame({
                 "Metric": ["Total Records", "Total Value"],
-                "Value": [len(filtered), filtered[value_col].sum()]
+                "Value": [
+                    total_records,
+                    query.summary(value_col)["sum"] if value_col else total_records
+                ]
             })
 
         elif report_type == "Category-wise":
-            report_df = (
-                filtered.groupby(category_col)[value_col]
-                .sum()
-                .reset_index(name="Total Value")
-                .sort_values("Total Value", ascending=False)
-            )
+            report_df = query.group_sum(category_col, value_col, "Total Value")
 
         elif report_type == "City-wise":
-            report_df = (
-                filtered.groupby(city_col)[value_col]
-                .sum()
-                .reset_index(name="Total Value")
-                .sort_values("Total Value", ascending=False)
-            )
+            report_df = query.group_sum(city_col, value_col, "Total Value")
 
         elif report_type == "Seller-wise":
-            report_df = (
-                filtered.groupby(seller_col)[value_col]
-                .sum()
-                .reset_index(name="Total Value")
-                .sort_values("Total Value", ascending=False)
-            )
+            report_df = query.group_sum(seller_col, value_col, "Total Value")
 
         st.success("✅ Report generated successfully")
 
@@ -225,12 +139,5 @@ def app(search=None, start_date=None, end_date=None, mode=None):
     st.divider()
     st.subheader("📊 Filtered Data Preview")
 
-    raw_df = filtered.reset_index(drop=True)
-    raw_df.insert(0, "S.No", range(1, len(raw_df) + 1))
-
-    st.dataframe(
-        raw_df,
-        hide_index=True,           # ❌ default index removed
-        use_container_width=True,
-        height=420
-    )
+    # One page at a time; S.No numbers rows within the full result
+    paginated_grid(query, key="reports_preview_grid")
@@ -1,7 +1,5 @@
 # screens/data_Extract_ai_final.py
 import streamlit as st
-import pdfplumber
-from pdf2image import convert_from_bytes
 import pytesseract
 from pytesseract import Output
 import re
@@ -11,6 +9,9 @@ from io import BytesIO
 import zipfile
 import os
 
+from services.ocr_pool import ocr_pages
+from services.pdf_session import PdfSession, open_session
+
 # ---------------- CONFIG ----------------
 DEFAULT_TESSERACT = os.environ.get("TESSERACT_CMD", r"C:\Program Files\Tesseract-OCR\tesseract.exe")
 if os.path.exists(DEFAULT_TESSERACT):
@@ -49,32 +50,28 @@ def first_regex(pattern, text):
     except Exception:
         return m.group(0).strip()
 
-def try_text_layer(pdf_bytes):
+def try_text_layer(pdf_source):
+    # pdf_source: raw bytes or a shared PdfSession
     try:
-        with pdfplumber.open(BytesIO(pdf_bytes)) as doc:
-            parts = []
-            for p in doc.pages:
-                t = p.extract_text()
-                if t:
-                    parts.append(t)
-            return "\n".join(parts)
+        with open_session(pdf_source) as doc:
+            return doc.text("\n")
     except Exception:
         return ""
 
 def ocr_pdf_bytes(pdf_bytes, dpi=300):
-    # convert pages to images and OCR them
-    try:
-        pages = convert_from_bytes(pdf_bytes, dpi=dpi)
-    except Exception:
-        return ""
-    texts = []
-    for img in pages:
+    # rasterize + OCR page by page on the OCR process pool
+    page_count = None
+    if isinstance(pdf_bytes, PdfSession):
         try:
-            t = pytesseract.image_to_string(img, lang='eng')
-            texts.append(t)
+            page_count = pdf_bytes.page_count
         except Exception:
             pass
-    return "\n".join(texts)
+        pdf_bytes = pdf_bytes.pdf_bytes
+    try:
+        texts = ocr_pages(pdf_bytes, dpi=dpi, lang='eng', page_count=page_count)
+    except Exception:
+        return ""
+    return "\n".join(texts[p] for p in sorted(texts))
 
 # ----------------- FIELD EXTRACTORS (tuned) -----------------
 def extract_order_id(text):
@@ -175,13 +172,15 @@ def extract_category(text):
 
 # ----------------- MAIN SINGLE PDF PROCESS -----------------
 def process_single_pdf_bytes(pdf_bytes):
-    # try text-layer first
-    text = try_text_layer(pdf_bytes)
-    used_ocr = False
-    if not text or len(text.strip()) < 50:
-        # fallback to OCR
-        used_ocr = True
-        text = ocr_pdf_bytes(pdf_bytes, dpi=300)
+    # pdf_bytes: raw bytes or a shared PdfSession (parsed once)
+    with open_session(pdf_bytes) as session:
+        # try text-layer first
+        text = try_text_layer(session)
+        used_ocr = False
+        if not text or len(text.strip()) < 50:
+            # fallback to OCR
+            used_ocr = True
+            text = ocr_pdf_bytes(session, dpi=300)
 
     text = clean_text(text)
 
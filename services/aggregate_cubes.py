@@ -0,0 +1,137 @@
+# services/aggregate_cubes.py
+# =====================================================
+# PRE-AGGREGATED QUARTER CUBES (KPIs / TOP-N)
+#
+# - Built once per dataset version (see prepared_dataset)
+# - Row count + value sum per quarter, and per
+#   quarter × dimension (org / city / category / seller)
+# - Dataset-wide, whole-quarter and quarter-aligned
+#   custom ranges are answered from the cubes
+# - Anything else (ranges cutting a quarter, dates with
+#   a time of day, searched subsets) → select() returns
+#   None and callers scan the rows as before
+# =====================================================
+
+import numpy as np
+import pandas as pd
+
+NO_DATE = -1   # quarter key of rows without a date
+
+
+def quarter_key(ts) -> int:
+    """year * 4 + quarter index (0-3)."""
+    ts = pd.Timestamp(ts)
+    return ts.year * 4 + (ts.month - 1) // 3
+
+
+def _quarter_bounds(key: int):
+    year, q = divmod(key, 4)
+    start = pd.Timestamp(year, 3 * q + 1, 1)
+    end = start + pd.offsets.QuarterEnd(startingMonth=3)
+    return start, end
+
+
+class QuarterCubes:
+    """Counts and value sums by quarter (× dimension)."""
+
+    def __init__(self, df: pd.DataFrame, date_col, value_col: str, dims: dict):
+        """
+        Args:
+            df: Source rows
+            date_col: Date column (None → every row is NO_DATE)
+            value_col: Numeric column summed in the cubes
+            dims: {dimension name: column}, e.g. {"org": "organization_name"}
+        """
+        self.value_col = value_col
+        self.dims = {name: col for name, col in dims.items() if col}
+
+        if date_col:
+            dates = df[date_col]
+            keys = dates.dt.year * 4 + (dates.dt.month - 1) // 3
+            keys = keys.fillna(NO_DATE).astype(np.int64)
+            # Filters compare against midnight bounds: only date-only
+            # columns bucket exactly like a quarter range
+            self.exact = bool((dates.dropna() == dates.dropna().dt.normalize()).all())
+        else:
+            keys = pd.Series(NO_DATE, index=df.index, dtype=np.int64)
+            self.exact = False
+
+        values = df[value_col]
+        frame = pd.DataFrame({"_q": keys.to_numpy(), value_col: values.to_numpy()})
+
+        # size: rows, count: non-missing values (for the mean)
+        self.totals = frame.groupby("_q")[value_col].agg(["size", "count", "sum"])
+        self.keys = self.totals.index.to_numpy()
+
+        self.cubes = {}
+        for name, col in self.dims.items():
+            frame[col] = df[col].array
+            self.cubes[name] = (
+                frame.groupby(["_q", col], observed=True)[value_col]
+                .agg(["size", "sum"])
+            )
+            frame = frame.drop(columns=col)
+
+    # =================================================
+    # RANGE → QUARTER KEYS
+    # =================================================
+    def select(self, start=None, end=None):
+        """
+        Quarter keys covering [start, end] exactly, or None when the
+        range can't be answered from the cubes. No range → all rows.
+        """
+        if start is None and end is None:
+            return self.keys
+        if not self.exact or start is None or end is None:
+            return None
+
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        first, last = quarter_key(start), quarter_key(end)
+        if start != _quarter_bounds(first)[0] or end != _quarter_bounds(last)[1]:
+            return None
+        return self.keys[(self.keys >= first) & (self.keys <= last)]
+
+    # =================================================
+    # LOOKUPS
+    # =================================================
+    def summary(self, keys) -> dict:
+        """rows / sum / mean of the value column over the selected quarters."""
+        part = self.totals.loc[self.totals.index.intersection(keys)]
+        count = part["count"].sum()
+        total = part["sum"].sum()
+        return {
+            "rows": int(part["size"].sum()),
+            "sum": total,
+            "mean": total / count if count else float("nan"),
+        }
+
+    def _dimension(self, dim: str, keys) -> pd.DataFrame:
+        cube = self.cubes[dim]
+        part = cube[cube.index.get_level_values(0).isin(keys)]
+        return part.groupby(level=1, observed=True).sum()
+
+    def top_values(self, dim: str, keys, n=None) -> pd.DataFrame:
+        """[column, value_col] by summed value, descending (groupby-sum equivalent)."""
+        col = self.dims[dim]
+        out = (
+            self._dimension(dim, keys)["sum"]
+            .rename(self.value_col)
+            .rename_axis(col)
+            .reset_index()
+            .sort_values(self.value_col, ascending=False)
+        )
+        return out.head(n) if n else out
+
+    def top_counts(self, dim: str, keys, n=None) -> pd.Series:
+        """Row counts per value, descending (value_counts equivalent)."""
+        counts = self._dimension(dim, keys)["size"]
+        counts = counts[counts > 0].sort_values(ascending=False).rename("count")
+        return counts.head(n) if n else counts
+
+    def yearly(self) -> pd.Series:
+        """Value sum per calendar year (rows without a date excluded)."""
+        dated = self.totals[self.totals.index != NO_DATE]
+        return (
+            dated["sum"].groupby(dated.index // 4).sum()
+            .rename(self.value_col).rename_axis("Year")
+        )
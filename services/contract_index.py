@@ -0,0 +1,113 @@
+# services/contract_index.py
+# =====================================================
+# SECTION + LABEL OFFSET INDEX (ONE SCAN PER DOCUMENT)
+#
+# - Records every offset of the GeM section headers and
+#   field labels (incl. doubled-glyph variants) once
+# - Sections resolve to (start, end) spans of the text
+# - Field regexes then run on pattern.search(text, pos, endpos)
+#   bounded slices instead of the whole document
+# =====================================================
+
+from bisect import bisect_left
+
+# =====================================================
+# INDEXED TERMS
+# =====================================================
+SECTION_MARKERS = [
+    "Buyer Details", "Seller Details", "Product Details", "Paying Authority",
+    "Financial", "Consignee", "GST/TAX", "Delivery", "Specification", "Terms",
+    # Doubled-glyph headers from some PDF fonts
+    "BBuuyyeerr DDeettaaiillss", "SSeelllleerr DDeettaaiillss",
+    "PPrroodduucctt DDeettaaiillss",
+]
+
+FIELD_LABELS = [
+    "Contact", "Email", "GSTIN", "Address", "Designation", "Company Name",
+    "GeM", "Ministry", "Department", "Organisation", "Brand", "Product Name",
+    "Category", "Ordered", "Unit", "Total", "INR",
+    # Doubled-glyph labels
+    "GGeemm", "BBrraanndd", "PPrroodduucctt NNaammee", "CCaatteeggoorryy NNaammee",
+    "UUnniitt PPrriiccee",
+]
+
+INDEX_TERMS = SECTION_MARKERS + FIELD_LABELS
+
+
+class ContractIndex:
+    """
+    Offsets of section headers and field labels in one contract text.
+
+    Lookups are case-insensitive (like the re.I section patterns) unless
+    `exact=True`. Terms are found with str.find on the lowered text: in
+    CPython that beats a Python-level Aho-Corasick automaton or a big
+    regex alternation by a wide margin for ~40 short literals.
+    """
+
+    def __init__(self, text: str, terms=INDEX_TERMS):
+        self.text = text
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Unicode case folding changed lengths: offsets would drift
+            lowered = "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+        self.offsets = {}
+        for term in terms:
+            key = term.lower()
+            if key in self.offsets:
+                continue
+            found = []
+            i = lowered.find(key)
+            while i >= 0:
+                found.append(i)
+                i = lowered.find(key, i + 1)
+            self.offsets[key] = found
+
+    # -------------------------------------------------
+    # TERM LOOKUP
+    # -------------------------------------------------
+    def first(self, term: str, start: int = 0, end: int = None, exact: bool = False) -> int:
+        """First offset of `term` in [start, end), or -1."""
+        found = self.offsets.get(term.lower())
+        if found is None:
+            raise KeyError(f"Term not indexed: {term}")
+
+        limit = len(self.text) if end is None else end
+        for pos in found[bisect_left(found, start):]:
+            if pos + len(term) > limit:
+                break
+            if not exact or self.text.startswith(term, pos):
+                return pos
+        return -1
+
+    def iter(self, term: str, start: int = 0, end: int = None):
+        """Every offset of `term` fully inside [start, end), in order."""
+        found = self.offsets.get(term.lower())
+        if found is None:
+            raise KeyError(f"Term not indexed: {term}")
+
+        limit = (len(self.text) if end is None else end) - len(term)
+        for pos in found[bisect_left(found, start):]:
+            if pos > limit:
+                break
+            yield pos
+
+    # -------------------------------------------------
+    # SECTION SPANS
+    # -------------------------------------------------
+    def section(self, start_marker: str, end_markers: list):
+        """
+        Span equivalent to extract_section(): text after the first
+        start marker up to the nearest following end marker.
+        Returns (start, end) or None.
+        """
+        s = self.first(start_marker)
+        if s < 0:
+            return None
+
+        body_start = s + len(start_marker)
+        ends = [self.first(m, body_start) for m in end_markers]
+        ends = [e for e in ends if e >= 0]
+        if not ends:
+            return None
+        return body_start, min(ends)
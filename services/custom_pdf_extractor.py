@@ -1,20 +1,79 @@
 import re
-import pdfplumber
+import os
+import numpy as np
 import pandas as pd
 import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+from services.contract_index import ContractIndex
+from services.extraction_cache import get_extraction_cache, pdf_hash
+from services.field_engine import Derived, FieldEngine, FieldSpec, Probe
+from services.pdf_session import PdfSession, open_session, read_pdf_bytes
+
+
+# =================================================
+# STOP PHRASES / REQUIRED SECTIONS
+# =================================================
+# Everything after these is boilerplate (see clean_extracted_text)
+STOP_PHRASES = [
+    "Terms and Conditions",
+    "SPECIAL TERMS AND CONDITIONS",
+    "General Terms and Conditions",
+    "This is system generated file",
+    "No signature is required",
+    "Print out of this document",
+]
+
+_STOP_PHRASE_RE = re.compile(
+    "|".join(re.escape(p) for p in STOP_PHRASES), re.IGNORECASE
+)
+
+# Once every group has been seen the remaining pages hold only
+# consignee / terms boilerplate
+REQUIRED_SECTIONS = [
+    ("Buyer Details", "BBuuyyeerr DDeettaaiillss"),
+    ("Seller Details", "SSeelllleerr DDeettaaiillss"),
+    ("Product Details", "PPrroodduucctt DDeettaaiillss"),
+    ("Consignee", "CCoonnssiiggnneeee"),
+]
 
 
 # =================================================
 # PDF → RAW TEXT
 # =================================================
-def extract_pdf_to_text(pdf_file) -> str:
-    text = ""
-    with pdfplumber.open(pdf_file) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-    return text
+def extract_pdf_to_text(pdf_file, stop_early=False) -> str:
+    """
+    Extract the text layer page by page (path, bytes, file or PdfSession).
+
+    stop_early: stop opening pages after the page containing a stop
+    phrase (clean_extracted_text drops everything after it anyway) or
+    once all REQUIRED_SECTIONS have been seen.
+    """
+    parts = []
+    pending = [tuple(m.lower() for m in group) for group in REQUIRED_SECTIONS]
+
+    with open_session(pdf_file) as session:
+        for i in range(session.page_count):
+            page_text = session.page_text(i)
+
+            if not page_text:
+                continue
+            parts.append(page_text + "\n")
+
+            if not stop_early:
+                continue
+            if _STOP_PHRASE_RE.search(page_text):
+                break
+
+            lowered = page_text.lower()
+            pending = [
+                group for group in pending
+                if not any(marker in lowered for marker in group)
+            ]
+            if not pending:
+                break
+
+    return "".join(parts)
 
 
 # =================================================
@@ -34,16 +93,7 @@ def clean_extracted_text(text: str) -> str:
     text = re.sub(r"[^\x00-\x7F]+", " ", text)
 
     # Stop phrases - remove everything after these
-    stop_phrases = [
-        "Terms and Conditions",
-        "SPECIAL TERMS AND CONDITIONS",
-        "General Terms and Conditions",
-        "This is system generated file",
-        "No signature is required",
-        "Print out of this document",
-    ]
-
-    for phrase in stop_phrases:
+    for phrase in STOP_PHRASES:
         text = re.sub(
             phrase + r".*",
             " ",
@@ -81,19 +131,37 @@ def fix_doubled_chars(text: str) -> str:
 # =================================================
 # NORMALIZE TEXT
 # =================================================
+_SPACES_RE = re.compile(r"[ \t]+")
+_MULTI_NL_RE = re.compile(r"\n+")
+
+
 def normalize_text(text: str) -> str:
     text = text.replace("\xa0", " ")
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n+", "\n", text)
+    text = _SPACES_RE.sub(" ", text)
+    text = _MULTI_NL_RE.sub("\n", text)
     return text.strip()
 
 
 # =================================================
 # EXTRACT SECTION BETWEEN MARKERS
 # =================================================
+_SECTION_PATTERNS = {}
+
+
+def _section_pattern(start_marker: str, end_markers: list):
+    key = (start_marker, tuple(end_markers))
+    pat = _SECTION_PATTERNS.get(key)
+    if pat is None:
+        pat = re.compile(
+            start_marker + r"(.*?)(" + "|".join(end_markers) + ")",
+            re.S | re.I
+        )
+        _SECTION_PATTERNS[key] = pat
+    return pat
+
+
 def extract_section(text: str, start_marker: str, end_markers: list) -> str:
-    pattern = start_marker + r"(.*?)(" + "|".join(end_markers) + ")"
-    m = re.search(pattern, text, re.S | re.I)
+    m = _section_pattern(start_marker, end_markers).search(text)
     return m.group(1) if m else ""
 
 
@@ -130,663 +198,655 @@ def find_value_after_label(text: str, label: str) -> str:
 # =================================================
 def extract_email(text: str, context: str = "") -> str:
     search_text = context if context else text
-    m = re.search(r"[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}", search_text)
+    m = FIELD_PATTERNS["email"].search(search_text)
     return m.group(0) if m else ""
 
 
 # =================================================
-# STRUCTURED EXTRACTION (COMPLETE)
+# FIELD PATTERN REGISTRY (COMPILED ONCE PER PROCESS)
 # =================================================
-def extract_structured_fields(clean_text: str) -> dict:
-    text = normalize_text(clean_text)
-
-    # --- CONTRACT NO ---
-    contract_no = ""
-    m = re.search(r"GEMC?-?\d{10,}", text)
-    if m:
-        contract_no = m.group(0)
-
-    # --- GENERATED DATE ---
-    generated_date = ""
-    d = re.search(r"\d{1,2}-[A-Za-z]{3}-\d{4}", text)
-    if d:
-        generated_date = d.group(0)
-
-    # --- ORGANISATION NAME ---
-    org_name = ""
-    # Strategy: Look for "Organisation Name" and get the value from the NEXT line (skip address on same line)
-    # Pattern: "Organisation Name" followed by optional address, then newline, then org name
-    m = re.search(r"Organisation\s*Name\s*[:\-]?\s*[^\n]*(?:Behind|Near|Road|Address|Office)[^\n]*\n\s*([A-Za-z][A-Za-z0-9 ,.\-()&]+?)(?:\s*[:\-]|\s*Address|\s*Office|\n)", text, re.I | re.MULTILINE)
-    if m:
-        org_name = m.group(1).strip()
-        # Clean up
-        org_name = re.sub(r"\s+", " ", org_name)
-    # If not found with address pattern, try direct next line
-    if not org_name:
-        m = re.search(r"Organisation\s*Name\s*[:\-]?\s*\n\s*([A-Za-z][A-Za-z0-9 ,.\-()&]+?)(?:\s*[:\-]|\s*Address|\s*Office|\n)", text, re.I | re.MULTILINE)
-        if m:
-            org_name = m.group(1).strip()
-            org_name = re.sub(r"\s+", " ", org_name)
-    
-    # Fallback: Look for common org patterns (these are more reliable and avoid address issues)
-    if not org_name or len(org_name) < 5 or any(keyword in org_name for keyword in ["Behind", "Near", "Road", "Office", "Zone", "Collector"]):
-        org_patterns = [
-            r"(National\s+Rural\s+Health\s+Mission\s*\(?NRHM\)?\s*State\s*Health\s*Society)",
-            r"(National\s+Rural\s+Health\s+Mission\s*\(?NRHM\)?[A-Za-z ]*)",
-            r"(National\s+Health\s+Mission[A-Za-z ]*)",
-            r"(State\s+Health\s+Society[A-Za-z ]*)",
-            r"(PHC\s+ACCOUNTANT)",
-            r"(PHC\s+[A-Za-z ]+)",
-            r"(District\s+Hospital[A-Za-z ]*)",
-            r"(Government\s+Hospital[A-Za-z ]*)",
-            r"(Medical\s+College[A-Za-z ]*)",
-            r"(Primary\s+Health\s+Centre[A-Za-z ]*)",
-            r"(CHC\s+[A-Za-z ]*)",
-        ]
-        for pat in org_patterns:
-            m = re.search(pat, text, re.I)
-            if m:
-                candidate = m.group(1).strip()
-                # Skip if it contains address keywords
-                if not any(keyword in candidate for keyword in ["Behind", "Near", "Road", "Office", "Zone", "Collector", "Barshi"]):
-                    org_name = candidate
-                    break
-
-    # --- MINISTRY ---
-    ministry = ""
-    m = re.search(r"Ministry\s*[:\-]?\s*([A-Za-z0-9 ,.\-/()]+?)(?:\s*Contact|\s*Email|\n)", text, re.I)
-    if m:
-        ministry = m.group(1).strip()
-    if not ministry or ministry.strip() == "-":
-        ministry = "NA"
-
-    # --- DEPARTMENT ---
-    department = ""
-    # List of state names to exclude
-    state_names = [
-        "Gujarat", "Maharashtra", "Uttar Pradesh", "Madhya Pradesh", "Rajasthan",
-        "Karnataka", "Tamil Nadu", "West Bengal", "Bihar", "Odisha", "Assam",
-        "Punjab", "Haryana", "Jharkhand", "Chhattisgarh", "Uttarakhand",
-        "Himachal Pradesh", "Goa", "Delhi", "Jammu", "Kashmir", "Telangana",
-        "Andhra Pradesh", "Uttar", "MP", "UP", "MH", "GJ", "RJ", "KA", "TN", "WB"
+STATE_NAMES = [
+    "Gujarat", "Maharashtra", "Uttar Pradesh", "Madhya Pradesh", "Rajasthan",
+    "Karnataka", "Tamil Nadu", "West Bengal", "Bihar", "Odisha", "Assam",
+    "Punjab", "Haryana", "Jharkhand", "Chhattisgarh", "Uttarakhand",
+    "Himachal Pradesh", "Goa", "Delhi", "Jammu", "Kashmir", "Telangana",
+    "Andhra Pradesh", "Uttar", "MP", "UP", "MH", "GJ", "RJ", "KA", "TN", "WB"
+]
+
+ADDRESS_NOISE = ["Behind", "Near", "Road", "Office", "Zone", "Collector"]
+
+_STATE_ALT = "|".join(re.escape(s) for s in STATE_NAMES)
+
+FIELD_PATTERNS = {
+    # Contract info
+    "contract_no": re.compile(r"GEMC?-?\d{10,}"),
+    "generated_date": re.compile(r"\d{1,2}-[A-Za-z]{3}-\d{4}"),
+    "org_after_address": re.compile(
+        r"Organisation\s*Name\s*[:\-]?\s*[^\n]*(?:Behind|Near|Road|Address|Office)[^\n]*\n\s*([A-Za-z][A-Za-z0-9 ,.\-()&]+?)(?:\s*[:\-]|\s*Address|\s*Office|\n)",
+        re.I | re.MULTILINE
+    ),
+    "org_next_line": re.compile(
+        r"Organisation\s*Name\s*[:\-]?\s*\n\s*([A-Za-z][A-Za-z0-9 ,.\-()&]+?)(?:\s*[:\-]|\s*Address|\s*Office|\n)",
+        re.I | re.MULTILINE
+    ),
+    "ministry": re.compile(
+        r"Ministry\s*[:\-]?\s*([A-Za-z0-9 ,.\-/()]+?)(?:\s*Contact|\s*Email|\n)", re.I
+    ),
+    "department_label": re.compile(
+        r"Department\s*[:\-]?\s*([A-Za-z][A-Za-z0-9 ,.\-/()&]+?)(?:\s*(?:" + _STATE_ALT + r")\b|\s*Organisation|\s*GSTIN|\s*Email|\n)",
+        re.I
+    ),
+    "department_email_tail": re.compile(r"\s*Email\s*ID.*$", re.I),
+
+    # Buyer
+    "designation": re.compile(
+        r"Designation\s*[:\-]?\s*([A-Za-z0-9 ,.\-/()]+?)(?:\s*Contact|\s*Email|\n)", re.I
+    ),
+    "org_name_inline": re.compile(r"Organisation Name\s*[:\-]?\s*([A-Za-z][A-Za-z0-9 ,.\-]+)", re.I),
+    "email": re.compile(r"[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}"),
+    "contact_no": re.compile(r"Contact\s*(?:No\.?)?\s*[:\-]?\s*([0-9\-]+)", re.I),
+    "phone": re.compile(r"\b([6-9]\d{2}[-]?\d{3}[-]?\d{4,5})"),
+    "buyer_address": re.compile(
+        r"Address\s*[:\-]?\s*([A-Za-z0-9 ,.\-/()\n]+?)(?:\s*Office|\s*GSTIN|\s*Zone|Email|Contact|Paying|Financial)",
+        re.I | re.S
+    ),
+    "address_with_pin": re.compile(
+        r"Address\s*[:\-]?\s*([A-Za-z0-9 ,.\-/()\n]+?[A-Z]{2,}\s*[A-Z]{2,}[-]?\d{6})", re.I | re.S
+    ),
+    "gstin": re.compile(r"GSTIN\s*[:\-]?\s*([A-Z0-9]{15})", re.I),
+    "state": re.compile(
+        r"\b(MAHARASHTRA|GUJARAT|UTTAR PRADESH|MADHYA PRADESH|RAJASTHAN|KARNATAKA|TAMIL NADU|WEST BENGAL|BIHAR|ODISHA|ASSAM|PUNJAB|HARYANA|JHARKHAND|CHHATTISGARH|UTTARAKHAND|HIMACHAL PRADESH|GOA|DELHI|JAMMU|KASHMIR|TELANGANA|ANDHRA PRADESH)\b",
+        re.I
+    ),
+
+    # Seller
+    "company_name": re.compile(
+        r"Company Name\s*[:\-]?\s*([A-Za-z0-9 &,.\-/()]+?)(?:\s*Contact|\s*Email|\s*Address|\n)", re.I
+    ),
+    "seller_address": re.compile(
+        r"Address\s*[:\-]?\s*([A-Za-z0-9 ,.\-/()\n]+?)(?:\s*MSME|\s*GSTIN|\s*Registration|Email|Contact|Product)",
+        re.I | re.S
+    ),
+    "gem_seller_id": re.compile(r"GeM\s*Seller\s*ID\s*[:\-]?\s*([A-Z0-9]{10,})", re.I),
+    "gem_seller_id_doubled": re.compile(r"GGeemm\s*SSelleerr\s*IIDD\s*[:\-]?\s*([A-Z0-9]{10,})", re.I),
+
+    # Product
+    "product_name_doubled": re.compile(
+        r"PPrroodduucctt NNaammee\s*[:\-]?\s*:?\s*([A-Za-z0-9 &,.\-/()]+?)(?:\s*BBrraanndd|\s*Brand|\n)"
+    ),
+    "product_name": re.compile(
+        r"Product Name\s*[:\-]?\s*([A-Za-z0-9 &,.\-/()]+?)(?:\s*Brand|\s*Catalogue|\n)", re.I
+    ),
+    "product_trustwell": re.compile(r"(TRUSTwell[A-Za-z0-9 ]+(?:Kit|Test))", re.I),
+    "product_kit": re.compile(r"([A-Za-z]+\s+(?:ELISA|Test|Rapid|Diagnostic)\s+[A-Za-z ]+Kit)", re.I),
+    "product_pratham": re.compile(r"(Pratham[A-Za-z0-9 ]+(?:Kit|Test))", re.I),
+    "category": re.compile(
+        r"Category\s*(?:Name\s*&?\s*Quadrant)?\s*[:\-]?\s*([A-Za-z0-9 &,.\-/()]+?)(?:\s*Model|\s*HSN|\n)", re.I
+    ),
+    "category_doubled": re.compile(
+        r"CCaatteeggoorryy NNaammee.*?([A-Za-z0-9 &,.\-/()]+?)(?:\s*MMooddeell|\n)", re.I
+    ),
+    "brand": re.compile(
+        r"Brand\s*[:\-]?\s*([A-Za-z0-9 &,.\-/()]+?)(?:\s*Brand Type|\s*Catalogue|\n)", re.I
+    ),
+    "brand_doubled": re.compile(
+        r"BBrraanndd\s*[:\-]?\s*:?\s*([A-Za-z0-9 &,.\-/()]+?)(?:\s*BBrraanndd TTyyppee|\n)", re.I
+    ),
+    "unit_in_qty": re.compile(
+        r"\b[\d,]+\s+(Test|Tests|Nos|Units?|Kit|Kits|Box|Boxes|Piece|Pieces|Pack|Packs)\b", re.I
+    ),
+    "ordered_unit": re.compile(r"Ordered\s*Unit\s*[:\-]?\s*([A-Za-z]+)", re.I),
+    "unit_price_row": re.compile(r"\b1\s+[\d,]+\s+(?:Test|Nos)\s+([\d,]+(?:\.\d{2})?)", re.I),
+    "unit_price_label": re.compile(
+        r"Unit\s*Price\s*(?:\(INR\))?\s*[:\-]?\s*([\d,]+(?:\.\d{2})?)", re.I
+    ),
+    "unit_price_doubled": re.compile(r"UUnniitt PPrriiccee.*?([\d,]+(?:\.\d{2})?)", re.I),
+    "unit_price_row_int": re.compile(r"\b1\s+[\d,]+\s+(?:Test|Nos)\s+([\d,]+)", re.I),
+    "quantity_row": re.compile(r"\b1\s+([\d,]+)\s+(?:Test|Nos)", re.I),
+    "quantity_label": re.compile(r"(?:Ordered\s*)?Quantity\s*[:\-]?\s*([\d,]+)", re.I),
+    "total_value": re.compile(
+        r"Total\s*Order\s*Value\s*(?:\(in\s*INR\))?\s*[:\-]?\s*([\d,]+(?:\.\d{2})?)", re.I
+    ),
+    "inr_value": re.compile(r"INR\s*[:\-]?\s*([\d,]+(?:\.\d{2})?)", re.I),
+
+    # Clean-up helpers
+    "whitespace": re.compile(r"\s+"),
+    "newlines": re.compile(r"\n+"),
+    "trailing_comma": re.compile(r",\s*$"),
+    "edge_punct": re.compile(r"^[\s:\-]+|[\s:\-]+$"),
+}
+
+ORG_PATTERNS = [
+    re.compile(p, re.I) for p in [
+        r"(National\s+Rural\s+Health\s+Mission\s*\(?NRHM\)?\s*State\s*Health\s*Society)",
+        r"(National\s+Rural\s+Health\s+Mission\s*\(?NRHM\)?[A-Za-z ]*)",
+        r"(National\s+Health\s+Mission[A-Za-z ]*)",
+        r"(State\s+Health\s+Society[A-Za-z ]*)",
+        r"(PHC\s+ACCOUNTANT)",
+        r"(PHC\s+[A-Za-z ]+)",
+        r"(District\s+Hospital[A-Za-z ]*)",
+        r"(Government\s+Hospital[A-Za-z ]*)",
+        r"(Medical\s+College[A-Za-z ]*)",
+        r"(Primary\s+Health\s+Centre[A-Za-z ]*)",
+        r"(CHC\s+[A-Za-z ]*)",
     ]
-    
-    # Strategy 1: Look for common department patterns first (most reliable)
-    dept_patterns = [
+]
+
+DEPT_PATTERNS = [
+    re.compile(p, re.I) for p in [
         r"(Health\s*&\s*Family\s*Welfare\s*Department)",
         r"(Public\s+Health\s+[A-Za-z ]*Family\s*Welfare\s*Department)",
         r"(Public\s+Health\s+[A-Za-z ]+Department)",
         r"(Family\s*Welfare\s*Department)",
     ]
-    for pat in dept_patterns:
-        m = re.search(pat, text, re.I)
-        if m:
-            department = m.group(1).strip()
-            break
-    
-    # Strategy 2: Extract from "Department :" label, stop before state names
-    if not department:
-        state_pattern = "|".join([re.escape(s) for s in state_names])
-        # Pattern: "Department :" followed by value, stop at state name or next field
-        m = re.search(r"Department\s*[:\-]?\s*([A-Za-z][A-Za-z0-9 ,.\-/()&]+?)(?:\s*(?:" + state_pattern + r")\b|\s*Organisation|\s*GSTIN|\s*Email|\n)", text, re.I)
-        if m:
-            department = m.group(1).strip()
-            # Check if the extracted value is just a state name - if so, set to empty
-            if department in state_names or department in ["Uttar", "Gujarat"]:
-                department = ""
-            else:
-                # Remove any trailing state name if captured
-                for state in state_names:
-                    if department.endswith(state):
-                        department = department.replace(state, "").strip()
-                        break
-    
-    # Remove any trailing "Email ID" if captured
-    department = re.sub(r"\s*Email\s*ID.*$", "", department, flags=re.I)
-    # Final cleanup - remove trailing state names
-    for state in state_names:
-        if department.endswith(state):
-            department = department.replace(state, "").strip()
-            break
-
-    # --- BUYER SECTION ---
-    buyer_section = extract_section(text, r"Buyer Details", 
-                                     ["Seller Details", "Financial", "Product Details", "Consignee"])
-    
-    # --- BUYER NAME (from Designation or Organisation) ---
-    buyer_name = ""
-    buyer_designation = ""
-    m = re.search(r"Designation\s*[:\-]?\s*([A-Za-z0-9 ,.\-/()]+?)(?:\s*Contact|\s*Email|\n)", buyer_section + text, re.I)
-    if m:
-        buyer_designation = m.group(1).strip()
-        buyer_name = buyer_designation  # Use designation as name if available
-    
-    # If no designation, try to get from organisation
-    if not buyer_name:
-        m = re.search(r"Organisation Name\s*[:\-]?\s*([A-Za-z][A-Za-z0-9 ,.\-]+)", text, re.I)
-        if m:
-            buyer_name = m.group(1).strip()
-
-    # --- BUYER EMAIL ---
-    buyer_email = ""
-    # Get the first email (buyer) from the text
-    emails = re.findall(r"[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}", text)
-    if emails:
-        buyer_email = emails[0]
-
-    # --- BUYER PHONE NUMBER ---
-    buyer_phone = ""
-    # Look for Contact No in buyer section
-    m = re.search(r"Contact\s*(?:No\.?)?\s*[:\-]?\s*([0-9\-]+)", buyer_section + text, re.I)
-    if m:
-        buyer_phone = m.group(1).strip()
-    # Fallback: look for phone pattern in buyer section
-    if not buyer_phone:
-        m = re.search(r"\b([6-9]\d{2}[-]?\d{3}[-]?\d{4,5})", buyer_section + text)
-        if m:
-            buyer_phone = m.group(1)
+]
+
+BUYER_SECTION_END = ["Seller Details", "Financial", "Product Details", "Consignee"]
+PAYING_SECTION_END = ["Seller Details", "Product Details"]
+SELLER_SECTION_END = ["Product Details", "Consignee", "GST/TAX", "Delivery"]
+PRODUCT_SECTION_END = ["Consignee", "Specification", "Terms", "Delivery"]
+
+
+# Literal every match of the pattern starts with (see ContractIndex)
+PATTERN_LABELS = {
+    "org_after_address": "Organisation",
+    "org_next_line": "Organisation",
+    "org_name_inline": "Organisation",
+    "ministry": "Ministry",
+    "department_label": "Department",
+    "designation": "Designation",
+    "contact_no": "Contact",
+    "buyer_address": "Address",
+    "seller_address": "Address",
+    "address_with_pin": "Address",
+    "gstin": "GSTIN",
+    "company_name": "Company Name",
+    "gem_seller_id": "GeM",
+    "gem_seller_id_doubled": "GGeemm",
+    "product_name_doubled": "PPrroodduucctt NNaammee",
+    "product_name": "Product Name",
+    "category": "Category",
+    "category_doubled": "CCaatteeggoorryy NNaammee",
+    "brand": "Brand",
+    "brand_doubled": "BBrraanndd",
+    "ordered_unit": "Ordered",
+    "unit_price_label": "Unit",
+    "unit_price_doubled": "UUnniitt PPrriiccee",
+    "total_value": "Total",
+    "inr_value": "INR",
+}
+
+
+def _span_len(span) -> int:
+    return span[1] - span[0] if span else 0
 
-    # --- BUYER ADDRESS ---
-    buyer_address = ""
-    # Look for Address in buyer section - capture multi-line until we hit next field
-    # Try to capture full address including state and PIN
-    m = re.search(r"Address\s*[:\-]?\s*([A-Za-z0-9 ,.\-/()\n]+?)(?:\s*Office|\s*GSTIN|\s*Zone|Email|Contact|Paying|Financial)", buyer_section + text, re.I | re.S)
-    if m:
-        buyer_address = m.group(1).strip()
-        # Clean up - remove extra whitespace and newlines, but keep structure
-        buyer_address = re.sub(r"\n+", ", ", buyer_address)
-        buyer_address = re.sub(r"\s+", " ", buyer_address)
-        # Fix multiple consecutive commas
-        while ",," in buyer_address or ", ," in buyer_address:
-            buyer_address = buyer_address.replace(",,", ",").replace(", ,", ", ")
-        buyer_address = re.sub(r",\s*$", "", buyer_address)  # Remove trailing comma
-        buyer_address = buyer_address.strip()
-    
-    # If address is too short, try to get more context
-    if len(buyer_address) < 20:
-        # Look for address pattern with state and PIN code
-        m = re.search(r"Address\s*[:\-]?\s*([A-Za-z0-9 ,.\-/()\n]+?[A-Z]{2,}\s*[A-Z]{2,}[-]?\d{6})", buyer_section + text, re.I | re.S)
-        if m:
-            buyer_address = m.group(1).strip()
-            buyer_address = re.sub(r"\n+", ", ", buyer_address)
-            buyer_address = re.sub(r"\s+", " ", buyer_address)
-
-    # --- BUYER GSTIN ---
-    buyer_gstin = ""
-    # Only search in buyer section, before seller section
-    if buyer_section:
-        m = re.search(r"GSTIN\s*[:\-]?\s*([A-Z0-9]{15})", buyer_section, re.I)
+
+# =================================================
+# POST-PROCESSORS
+# =================================================
+def _clean_address(address: str) -> str:
+    address = FIELD_PATTERNS["newlines"].sub(", ", address)
+    address = FIELD_PATTERNS["whitespace"].sub(" ", address)
+    # Fix multiple consecutive commas
+    while ",," in address or ", ," in address:
+        address = address.replace(",,", ",").replace(", ,", ", ")
+    address = FIELD_PATTERNS["trailing_comma"].sub("", address)  # Remove trailing comma
+    return address.strip()
+
+
+def _flatten_address(address: str) -> str:
+    address = FIELD_PATTERNS["newlines"].sub(", ", address)
+    return FIELD_PATTERNS["whitespace"].sub(" ", address)
+
+
+def _collapse_spaces(v: str) -> str:
+    return FIELD_PATTERNS["whitespace"].sub(" ", v)
+
+
+def _state_from_address(address: str) -> str:
+    if address:
+        m = FIELD_PATTERNS["state"].search(address)
         if m:
-            buyer_gstin = m.group(1).strip()
-    # Also try in paying authority section (sometimes buyer GSTIN is there)
-    if not buyer_gstin:
-        paying_section = extract_section(text, r"Paying Authority", ["Seller Details", "Product Details"])
-        if paying_section:
-            m = re.search(r"GSTIN\s*[:\-]?\s*([A-Z0-9]{15})", paying_section, re.I)
-            if m:
-                buyer_gstin = m.group(1).strip()
-
-    # --- BUYER STATE ---
-    buyer_state = ""
-    # Extract state from Buyer Address field (state is typically at the end of address)
-    if buyer_address:
-        state_patterns = [
-            r"\b(MAHARASHTRA|GUJARAT|UTTAR PRADESH|MADHYA PRADESH|RAJASTHAN|KARNATAKA|TAMIL NADU|WEST BENGAL|BIHAR|ODISHA|ASSAM|PUNJAB|HARYANA|JHARKHAND|CHHATTISGARH|UTTARAKHAND|HIMACHAL PRADESH|GOA|DELHI|JAMMU|KASHMIR|TELANGANA|ANDHRA PRADESH)\b"
-        ]
-        for pat in state_patterns:
-            m = re.search(pat, buyer_address, re.I)
-            if m:
-                buyer_state = m.group(1).strip().title()
-                break
+            return m.group(1).strip().title()
+    return ""
+
+
+def _strip_trailing_state(v: str) -> str:
+    for state in STATE_NAMES:
+        if v.endswith(state):
+            return v.replace(state, "").strip()
+    return v
+
+
+def _drop_state_name(v: str) -> str:
+    # A bare state name is the next column spilling over, not a department
+    return "" if v in STATE_NAMES else _strip_trailing_state(v)
+
+
+def _drop_email_tail(v: str) -> str:
+    return FIELD_PATTERNS["department_email_tail"].sub("", v)
 
-    # --- SELLER SECTION ---
-    seller_section = extract_section(text, r"Seller Details", 
-                                      ["Product Details", "Consignee", "GST/TAX", "Delivery"])
+
+def _drop_commas(v: str) -> str:
+    return v.replace(",", "")
+
+
+def _short_price(v: str) -> str:
+    # Unit price usually < 1000000
+    v = v.replace(",", "")
+    return v if len(v) <= 6 else ""
+
+
+def _undouble_quantity(v: str) -> str:
+    # Doubled glyphs: 1133,,336600 -> 13,360
+    raw = v.replace(",", "")
+    if len(raw) > 6 and all(raw[i] == raw[i + 1] for i in range(0, len(raw) - 1, 2)):
+        return fix_doubled_chars(raw)
+    return raw
+
+
+def _undouble_total(v: str) -> str:
+    # Doubled glyphs: 993355220000 -> 935200
+    raw = v.replace(",", "")
+    return fix_doubled_chars(raw) if len(raw) > 8 else raw
+
+
+def _is_address_noise(v: str) -> bool:
+    return any(keyword in v for keyword in ADDRESS_NOISE + ["Barshi"])
+
+
+def _other_email(ctx) -> str:
+    # First email in the document that isn't the buyer's
+    buyer_email = ctx.value("Buyer Email")
+    for m in FIELD_PATTERNS["email"].finditer(ctx.text):
+        if m.group(0) != buyer_email:
+            return m.group(0)
+    return ""
+
+
+def clean_value(v):
+    if not v or v.strip() in ["-", "", "NA", "N/A"]:
+        return "NA"
+    # Remove trailing punctuation and clean
+    v = FIELD_PATTERNS["edge_punct"].sub("", str(v))
+    return v.strip() if v.strip() else "NA"
+
+
+# =================================================
+# SECTIONS
+# =================================================
+def _seller_span(index: ContractIndex):
+    span = index.section("Seller Details", SELLER_SECTION_END)
     # Also try doubled pattern
-    seller_idx = text.find("SSeelllleerr DDeettaaiillss")
+    seller_idx = index.first("SSeelllleerr DDeettaaiillss", exact=True)
     if seller_idx < 0:
-        seller_idx = text.lower().find("seller details")
-    
-    if seller_idx > 0:
-        seller_text = text[seller_idx:]
-        if not seller_section:
-            seller_section = seller_text[:2000]  # Limit to avoid too much text
-
-    # --- SELLER NAME (Company Name) / SHOP NAME ---
-    seller_name = ""
-    seller_shop_name = ""
-    m = re.search(r"Company Name\s*[:\-]?\s*([A-Za-z0-9 &,.\-/()]+?)(?:\s*Contact|\s*Email|\s*Address|\n)", seller_section + text, re.I)
-    if m:
-        seller_name = m.group(1).strip()
-        seller_shop_name = seller_name  # Shop name is same as company name
+        seller_idx = index.first("Seller Details")
+    if seller_idx > 0 and not _span_len(span):
+        span = (seller_idx, min(seller_idx + 2000, len(index.text)))  # Limit to avoid too much text
+    return span
 
-    # --- SELLER EMAIL ---
-    seller_email = ""
-    if seller_section:
-        m = re.search(r"[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}", seller_section)
-        if m:
-            seller_email = m.group(0)
-    
-    # If seller email is same as buyer, try to find a different one
-    if seller_email == buyer_email or not seller_email:
-        # Find all unique emails
-        unique_emails = []
-        for e in emails:
-            if e not in unique_emails:
-                unique_emails.append(e)
-        # Seller email should be different from buyer email
-        for e in unique_emails:
-            if e != buyer_email:
-                seller_email = e
-                break
 
-    # --- SELLER PHONE NUMBER ---
-    seller_phone = ""
-    # Look for Contact No in seller section
-    m = re.search(r"Contact\s*(?:No\.?)?\s*[:\-]?\s*([0-9\-]+)", seller_section + text, re.I)
-    if m:
-        seller_phone = m.group(1).strip()
-    # Fallback: look for phone pattern in seller section
-    if not seller_phone:
-        m = re.search(r"\b([6-9]\d{2}[-]?\d{3}[-]?\d{4,5})", seller_section + text)
-        if m:
-            seller_phone = m.group(1)
+CONTRACT_SECTIONS = {
+    "buyer": lambda index: index.section("Buyer Details", BUYER_SECTION_END),
+    "paying": lambda index: index.section("Paying Authority", PAYING_SECTION_END),
+    "seller": _seller_span,
+    "product": lambda index: index.section("Product Details", PRODUCT_SECTION_END),
+}
 
-    # --- SELLER ADDRESS ---
-    seller_address = ""
-    # Look for Address in seller section - capture multi-line until we hit next field
-    m = re.search(r"Address\s*[:\-]?\s*([A-Za-z0-9 ,.\-/()\n]+?)(?:\s*MSME|\s*GSTIN|\s*Registration|Email|Contact|Product)", seller_section + text, re.I | re.S)
-    if m:
-        seller_address = m.group(1).strip()
-        # Clean up - remove extra whitespace and newlines, but keep structure
-        seller_address = re.sub(r"\n+", ", ", seller_address)
-        seller_address = re.sub(r"\s+", " ", seller_address)
-        # Fix multiple consecutive commas
-        while ",," in seller_address or ", ," in seller_address:
-            seller_address = seller_address.replace(",,", ",").replace(", ,", ", ")
-        seller_address = re.sub(r",\s*$", "", seller_address)  # Remove trailing comma
-        seller_address = seller_address.strip()
-    
-    # If address is too short, try to get more context
-    if len(seller_address) < 20:
-        # Look for address pattern with state and PIN code
-        m = re.search(r"Address\s*[:\-]?\s*([A-Za-z0-9 ,.\-/()\n]+?[A-Z]{2,}\s*[A-Z]{2,}[-]?\d{6})", seller_section + text, re.I | re.S)
-        if m:
-            seller_address = m.group(1).strip()
-            seller_address = re.sub(r"\n+", ", ", seller_address)
-            seller_address = re.sub(r"\s+", " ", seller_address)
 
-    # --- SELLER GSTIN ---
-    seller_gstin = ""
-    m = re.search(r"GSTIN\s*[:\-]?\s*([A-Z0-9]{15})", seller_section + text, re.I)
-    if m:
-        seller_gstin = m.group(1).strip()
-
-    # --- SELLER STATE ---
-    seller_state = ""
-    # Extract state from Seller Address field (state is typically at the end of address)
-    if seller_address:
-        state_patterns = [
-            r"\b(MAHARASHTRA|GUJARAT|UTTAR PRADESH|MADHYA PRADESH|RAJASTHAN|KARNATAKA|TAMIL NADU|WEST BENGAL|BIHAR|ODISHA|ASSAM|PUNJAB|HARYANA|JHARKHAND|CHHATTISGARH|UTTARAKHAND|HIMACHAL PRADESH|GOA|DELHI|JAMMU|KASHMIR|TELANGANA|ANDHRA PRADESH)\b"
-        ]
-        for pat in state_patterns:
-            m = re.search(pat, seller_address, re.I)
-            if m:
-                seller_state = m.group(1).strip().title()
-                break
+# =================================================
+# FIELD SPECS (ONE PER COLUMN, IN OUTPUT ORDER)
+# =================================================
+CONTRACT_FIELD_SPECS = [
+    # Contract Info
+    FieldSpec("Contract No", Probe("contract_no", group=0)),
+    FieldSpec(
+        "Organisation Name",
+        # Value on the line after the label (skip address on the same line)
+        Probe("org_after_address", "org_next_line", post=[_collapse_spaces]),
+        # Known org names are more reliable than a noisy label value
+        Probe(*ORG_PATTERNS, reject=_is_address_noise),
+        accept=lambda v, ctx: len(v) >= 5 and not any(k in v for k in ADDRESS_NOISE),
+    ),
+    FieldSpec(
+        "Department",
+        Probe(*DEPT_PATTERNS),
+        # "Department :" label, stopping before state names
+        Probe("department_label", post=[_drop_state_name]),
+        post=[_drop_email_tail, _strip_trailing_state],
+    ),
+
+    # Buyer Details
+    FieldSpec(
+        "Buyer Name",
+        Probe("designation", section="buyer"),
+        Probe("org_name_inline"),
+    ),
+    FieldSpec("Buyer Designation", Probe("designation", section="buyer")),
+    FieldSpec("Buyer Email", Probe("email", group=0)),
+    FieldSpec("Buyer Phone Number", Probe("contact_no", "phone", section="buyer")),
+    FieldSpec(
+        "Buyer Address",
+        Probe("buyer_address", section="buyer", post=[_clean_address]),
+        Probe("address_with_pin", section="buyer", post=[_flatten_address]),
+        accept=lambda v, ctx: len(v) >= 20,
+    ),
+    FieldSpec("Buyer State", Derived("Buyer Address", _state_from_address)),
+
+    # Seller Details
+    FieldSpec("Seller Name", Probe("company_name", section="seller")),
+    FieldSpec("Seller Shop Name", Derived("Seller Name")),
+    FieldSpec(
+        "Seller Email",
+        Probe("email", section="seller", section_only=True, group=0),
+        _other_email,
+        accept=lambda v, ctx: v != ctx.value("Buyer Email"),
+    ),
+    FieldSpec("Seller Phone Number", Probe("contact_no", "phone", section="seller")),
+    FieldSpec(
+        "Seller Address",
+        Probe("seller_address", section="seller", post=[_clean_address]),
+        Probe("address_with_pin", section="seller", post=[_flatten_address]),
+        accept=lambda v, ctx: len(v) >= 20,
+    ),
+    FieldSpec("Seller GSTIN", Probe("gstin", section="seller")),
+    FieldSpec("Seller State", Derived("Seller Address", _state_from_address)),
+    FieldSpec(
+        "GeM Seller ID",
+        Probe("gem_seller_id", section="seller"),
+        Probe("gem_seller_id_doubled"),
+    ),
+
+    # Product Details
+    FieldSpec(
+        "Product Name",
+        Probe("product_name_doubled", "product_name", "product_trustwell",
+              "product_kit", "product_pratham", section="product"),
+    ),
+    FieldSpec("Product Category", Probe("category", "category_doubled", section="product")),
+    FieldSpec("Brand", Probe("brand", "brand_doubled", section="product")),
+    # Unit in the quantity column (e.g. "13,360 Test"), then Ordered Unit
+    FieldSpec("Unit", Probe("unit_in_qty", "ordered_unit", section="product")),
+    FieldSpec(
+        "Quantity",
+        Probe("quantity_row", post=[_undouble_quantity]),
+        Probe("quantity_label", post=[_drop_commas]),
+    ),
+    FieldSpec(
+        "Unit Price",
+        Probe("unit_price_row", "unit_price_label", "unit_price_doubled",
+              section="product", post=[_drop_commas]),
+        # "1 13,360 Test 70 NA 935,200" - 70 is unit price
+        Probe("unit_price_row_int", section="product", post=[_short_price]),
+    ),
+    FieldSpec(
+        "Total Order Value (INR)",
+        Probe("total_value", "inr_value", post=[_undouble_total]),
+    ),
+
+    # Evaluated on request only (EXCLUDED from the default output)
+    FieldSpec("Generated Date", Probe("generated_date", group=0), output=False),
+    FieldSpec("Ministry", Probe("ministry"), output=False),
+    FieldSpec(
+        "Buyer GSTIN",
+        # Buyer section, else the paying authority section
+        Probe("gstin", section="buyer", section_only=True),
+        Probe("gstin", section="paying", section_only=True),
+        output=False,
+    ),
+]
+
+CONTRACT_FIELDS = FieldEngine(
+    CONTRACT_FIELD_SPECS,
+    patterns=FIELD_PATTERNS,
+    labels=PATTERN_LABELS,
+    sections=CONTRACT_SECTIONS,
+    prepare=normalize_text,
+    finalize=clean_value,
+)
 
-    # --- GEM SELLER ID ---
-    gem_seller_id = ""
-    # GeM Seller ID can be alphanumeric like "2B2418000012P123" - capture full ID
-    m = re.search(r"GeM\s*Seller\s*ID\s*[:\-]?\s*([A-Z0-9]{10,})", seller_section + text, re.I)
-    if m:
-        gem_seller_id = m.group(1).strip()
-    # Try doubled pattern if not found
-    if not gem_seller_id:
-        m = re.search(r"GGeemm\s*SSelleerr\s*IIDD\s*[:\-]?\s*([A-Z0-9]{10,})", text, re.I)
-        if m:
-            gem_seller_id = m.group(1).strip()
 
-    # --- PRODUCT SECTION ---
-    product_section = extract_section(text, r"Product Details", 
-                                       ["Consignee", "Specification", "Terms", "Delivery"])
+# =================================================
+# STRUCTURED EXTRACTION (COMPLETE)
+# =================================================
+def extract_structured_fields(clean_text: str, fields=None) -> dict:
+    """
+    Extract contract fields from cleaned PDF text.
 
-    # --- PRODUCT NAME ---
-    product_name = ""
-    # Look for doubled label pattern PPrroodduucctt NNaammee
-    m = re.search(r"PPrroodduucctt NNaammee\s*[:\-]?\s*:?\s*([A-Za-z0-9 &,.\-/()]+?)(?:\s*BBrraanndd|\s*Brand|\n)", product_section + text)
-    if m:
-        product_name = m.group(1).strip()
-    # Try normal pattern
-    if not product_name:
-        m = re.search(r"Product Name\s*[:\-]?\s*([A-Za-z0-9 &,.\-/()]+?)(?:\s*Brand|\s*Catalogue|\n)", product_section + text, re.I)
-        if m:
-            product_name = m.group(1).strip()
-    # Try finding common product patterns
-    if not product_name:
-        m = re.search(r"(TRUSTwell[A-Za-z0-9 ]+(?:Kit|Test))", product_section + text, re.I)
-        if m:
-            product_name = m.group(1).strip()
-        else:
-            m = re.search(r"([A-Za-z]+\s+(?:ELISA|Test|Rapid|Diagnostic)\s+[A-Za-z ]+Kit)", product_section + text, re.I)
-            if m:
-                product_name = m.group(1).strip()
-        # Try Pratham pattern
-        if not product_name:
-            m = re.search(r"(Pratham[A-Za-z0-9 ]+(?:Kit|Test))", product_section + text, re.I)
-            if m:
-                product_name = m.group(1).strip()
-
-    # --- PRODUCT CATEGORY ---
-    product_category = ""
-    # Look for Category Name & Quadrant
-    m = re.search(r"Category\s*(?:Name\s*&?\s*Quadrant)?\s*[:\-]?\s*([A-Za-z0-9 &,.\-/()]+?)(?:\s*Model|\s*HSN|\n)", product_section + text, re.I)
-    if m:
-        product_category = m.group(1).strip()
-    # Try doubled pattern
-    if not product_category:
-        m = re.search(r"CCaatteeggoorryy NNaammee.*?([A-Za-z0-9 &,.\-/()]+?)(?:\s*MMooddeell|\n)", product_section + text, re.I)
-        if m:
-            product_category = m.group(1).strip()
+    Args:
+        clean_text: Output of clean_extracted_text()
+        fields: Column names to evaluate (default: all output columns)
 
-    # --- BRAND ---
-    brand = ""
-    # Look for Brand field
-    m = re.search(r"Brand\s*[:\-]?\s*([A-Za-z0-9 &,.\-/()]+?)(?:\s*Brand Type|\s*Catalogue|\n)", product_section + text, re.I)
-    if m:
-        brand = m.group(1).strip()
-    # Try doubled pattern
-    if not brand:
-        m = re.search(r"BBrraanndd\s*[:\-]?\s*:?\s*([A-Za-z0-9 &,.\-/()]+?)(?:\s*BBrraanndd TTyyppee|\n)", product_section + text, re.I)
-        if m:
-            brand = m.group(1).strip()
+    Returns:
+        {column: value or "NA"}
+    """
+    return CONTRACT_FIELDS.extract(clean_text, fields)
 
-    # --- UNIT ---
-    unit = ""
-    # Look for Unit in quantity field (e.g., "13,360 Test")
-    m = re.search(r"\b[\d,]+\s+(Test|Tests|Nos|Units?|Kit|Kits|Box|Boxes|Piece|Pieces|Pack|Packs)\b", product_section + text, re.I)
-    if m:
-        unit = m.group(1).strip()
-    # Try Ordered Unit column
-    if not unit:
-        m = re.search(r"Ordered\s*Unit\s*[:\-]?\s*([A-Za-z]+)", product_section + text, re.I)
-        if m:
-            unit = m.group(1).strip()
 
-    # --- UNIT PRICE ---
-    unit_price = ""
-    # Look for Unit Price pattern - try to find in table row
-    # Pattern: number after quantity, before tax
-    m = re.search(r"\b1\s+[\d,]+\s+(?:Test|Nos)\s+([\d,]+(?:\.\d{2})?)", product_section + text, re.I)
-    if m:
-        unit_price = m.group(1).replace(",", "")
-    # Try explicit Unit Price label
-    if not unit_price:
-        m = re.search(r"Unit\s*Price\s*(?:\(INR\))?\s*[:\-]?\s*([\d,]+(?:\.\d{2})?)", product_section + text, re.I)
-        if m:
-            unit_price = m.group(1).replace(",", "")
-    # Try doubled pattern
-    if not unit_price:
-        m = re.search(r"UUnniitt PPrriiccee.*?([\d,]+(?:\.\d{2})?)", product_section + text, re.I)
-        if m:
-            unit_price = m.group(1).replace(",", "")
-    # Try to find price in table: "1 13,360 Test 70 NA 935,200" - 70 is unit price
-    if not unit_price:
-        m = re.search(r"\b1\s+[\d,]+\s+(?:Test|Nos)\s+([\d,]+)", product_section + text, re.I)
-        if m:
-            # Check if this looks like a unit price (reasonable range)
-            potential_price = m.group(1).replace(",", "")
-            if potential_price and len(potential_price) <= 6:  # Unit price usually < 1000000
-                unit_price = potential_price
-
-    # --- QUANTITY ---
-    quantity = ""
-    # Look for patterns like "13,360 Test" - but handle doubled digits
-    m = re.search(r"\b1\s+([\d,]+)\s+(?:Test|Nos)", text, re.I)
-    if m:
-        raw_qty = m.group(1).replace(",", "")
-        # Check if it's doubled (e.g., 1133,,336600 -> 13,360)
-        if len(raw_qty) > 6 and all(raw_qty[i] == raw_qty[i+1] for i in range(0, len(raw_qty)-1, 2) if i+1 < len(raw_qty)):
-            quantity = fix_doubled_chars(raw_qty)
-        else:
-            quantity = raw_qty
-    if not quantity:
-        m = re.search(r"(?:Ordered\s*)?Quantity\s*[:\-]?\s*([\d,]+)", text, re.I)
-        if m:
-            quantity = m.group(1).replace(",", "")
+# =================================================
+# ONE-CALL HELPER (IMPORT THIS)
+# =================================================
+def extract_pdf_structured_data(pdf_file, use_cache=True) -> dict:
+    if not use_cache:
+        raw_text = extract_pdf_to_text(pdf_file, stop_early=True)
+        cleaned_text = clean_extracted_text(raw_text)
+        return extract_structured_fields(cleaned_text)
 
-    # --- TOTAL ORDER VALUE (INR) ---
-    total_value = ""
-    m = re.search(r"Total\s*Order\s*Value\s*(?:\(in\s*INR\))?\s*[:\-]?\s*([\d,]+(?:\.\d{2})?)", text, re.I)
-    if m:
-        raw_val = m.group(1).replace(",", "")
-        # Check if doubled (993355220000 -> 935200)
-        if len(raw_val) > 8:
-            total_value = fix_doubled_chars(raw_val)
-        else:
-            total_value = raw_val
-    if not total_value:
-        m = re.search(r"INR\s*[:\-]?\s*([\d,]+(?:\.\d{2})?)", text, re.I)
-        if m:
-            raw_val = m.group(1).replace(",", "")
-            if len(raw_val) > 8:
-                total_value = fix_doubled_chars(raw_val)
-            else:
-                total_value = raw_val
-
-    # --- CLEAN UP EMPTY VALUES ---
-    def clean_value(v):
-        if not v or v.strip() in ["-", "", "NA", "N/A"]:
-            return "NA"
-        # Remove trailing punctuation and clean
-        v = re.sub(r"^[\s:\-]+|[\s:\-]+$", "", v)
-        return v.strip() if v.strip() else "NA"
+    with open_session(pdf_file) as session:
+        cache = get_extraction_cache()
+        key = session.sha256
 
-    return {
-        # Contract Info (EXCLUDED: Generated Date, Ministry, PDF Name)
-        "Contract No": clean_value(contract_no),
-        "Organisation Name": clean_value(org_name),
-        "Department": clean_value(department),
-        
-        # Buyer Details (EXCLUDED: Buyer GSTIN)
-        "Buyer Name": clean_value(buyer_name),
-        "Buyer Designation": clean_value(buyer_designation),
-        "Buyer Email": clean_value(buyer_email),
-        "Buyer Phone Number": clean_value(buyer_phone),
-        "Buyer Address": clean_value(buyer_address),
-        "Buyer State": clean_value(buyer_state),
-        
-        # Seller Details
-        "Seller Name": clean_value(seller_name),
-        "Seller Shop Name": clean_value(seller_shop_name),
-        "Seller Email": clean_value(seller_email),
-        "Seller Phone Number": clean_value(seller_phone),
-        "Seller Address": clean_value(seller_address),
-        "Seller GSTIN": clean_value(seller_gstin),
-        "Seller State": clean_value(seller_state),
-        "GeM Seller ID": clean_value(gem_seller_id),
-        
-        # Product Details
-        "Product Name": clean_value(product_name),
-        "Product Category": clean_value(product_category),
-        "Brand": clean_value(brand),
-        "Unit": clean_value(unit),
-        "Quantity": clean_value(quantity),
-        "Unit Price": clean_value(unit_price),
-        "Total Order Value (INR)": clean_value(total_value),
-    }
+        data = cache.get(key)
+        if data is None:
+            data = extract_pdf_structured_data(session, use_cache=False)
+            cache.put(key, data)
+        return data
 
 
 # =================================================
-# ONE-CALL HELPER (IMPORT THIS)
+# BATCH EXTRACTION (PROCESS POOL)
 # =================================================
-def extract_pdf_structured_data(pdf_file) -> dict:
-    raw_text = extract_pdf_to_text(pdf_file)
-    cleaned_text = clean_extracted_text(raw_text)
-    return extract_structured_fields(cleaned_text)
+DEFAULT_BATCH_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+
+def _extract_pdf_bytes(pdf_bytes: bytes):
+    """Pool worker: never raise, a bad PDF must not kill the batch."""
+    try:
+        with PdfSession(pdf_bytes) as session:
+            return extract_pdf_structured_data(session, use_cache=False)
+    except Exception:
+        return None
+
+
+def extract_pdf_structured_data_batch(pdf_files, max_workers=None):
+    """
+    Extract many contract PDFs on a process pool.
+
+    Args:
+        pdf_files: Iterable of paths, bytes or file-like objects
+        max_workers: Worker processes (default: CPU count - 1, 1 = inline)
+
+    Yields:
+        (index, data) in upload order, as soon as that PDF and all PDFs
+        before it are done. `data` is None when the PDF could not be read.
+        Cached PDFs (same bytes, same extractor version) skip the pool.
+    """
+    payloads = [read_pdf_bytes(f) for f in pdf_files]
+    if not payloads:
+        return
+
+    cache = get_extraction_cache()
+    keys = [pdf_hash(b) for b in payloads]
+    results = [cache.get(k) for k in keys]
+    misses = [i for i, r in enumerate(results) if r is None]
+
+    workers = max(1, min(max_workers or DEFAULT_BATCH_WORKERS, len(misses) or 1))
+
+    if workers == 1:
+        for idx, pdf_bytes in enumerate(payloads):
+            if results[idx] is None:
+                results[idx] = _extract_pdf_bytes(pdf_bytes)
+                if results[idx] is not None:
+                    cache.put(keys[idx], results[idx])
+            yield idx, results[idx]
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = {i: pool.submit(_extract_pdf_bytes, payloads[i]) for i in misses}
+        for idx in range(len(payloads)):
+            if idx in futures:
+                results[idx] = futures[idx].result()
+                if results[idx] is not None:
+                    cache.put(keys[idx], results[idx])
+            yield idx, results[idx]
+    finally:
+        # A Streamlit rerun abandons the generator: drop queued PDFs
+        pool.shutdown(wait=False, cancel_futures=True)
 
 
 # =================================================
 # POWER BI TABLE GENERATOR
 # =================================================
-def generate_powerbi_tables(extracted_data_list: list) -> dict:
+# Extracted columns feeding the star schema (cleaned once, column-wise)
+POWERBI_SOURCE_COLUMNS = [
+    "Contract No",
+    "Buyer Designation", "Buyer Email", "Buyer Phone Number", "Buyer State",
+    "Seller Name", "Seller Email", "Seller Phone Number", "Seller GSTIN",
+    "Seller State", "GeM Seller ID",
+    "Product Name", "Brand", "Unit",
+    "Quantity", "Unit Price", "Total Order Value (INR)",
+]
+
+_EMPTY_VALUES = ["-", "", "NA", "N/A"]
+
+
+def _clean_column(values: pd.Series) -> np.ndarray:
+    """clean_value() over a whole column, run once per distinct value."""
+    codes, uniques = pd.factorize(values.fillna("").to_numpy(dtype=object))
+    if not len(uniques):
+        return np.full(len(values), "NA", dtype=object)
+
+    u = pd.Series(uniques, dtype=object)
+    blank = u.str.strip().isin(_EMPTY_VALUES)
+    cleaned = u.str.replace(FIELD_PATTERNS["edge_punct"], "", regex=True).str.strip()
+    cleaned[blank | (cleaned == "")] = "NA"
+    return cleaned.to_numpy()[codes]
+
+
+def _to_float(v: str) -> float:
+    if v == "NA":
+        return 0.0
+    try:
+        return float(v)
+    except ValueError:
+        return 0.0
+
+
+def _float_column(values: np.ndarray) -> np.ndarray:
+    """Cleaned strings → float64 (unparseable / NA → 0.0), once per distinct value."""
+    codes, uniques = pd.factorize(values)
+    parsed = np.array([_to_float(v) for v in uniques], dtype="float64")
+    return parsed[codes]
+
+
+def _hash_ids(frame: pd.DataFrame, columns: list, prefix: str) -> np.ndarray:
+    """
+    Per-row ID: prefix + md5(str(key tuple))[:8], the key tuple being
+    `columns`. Hashed once per distinct key, in first-seen order.
+    """
+    group_no = frame.groupby(columns, sort=False).ngroup().to_numpy()
+    keys = frame.drop_duplicates(columns)
+    ids = np.array(
+        [
+            f"{prefix}{hashlib.md5(str(key).encode()).hexdigest()[:8].upper()}"
+            for key in zip(*(keys[c].tolist() for c in columns))
+        ],
+        dtype=object
+    )
+    return ids[group_no]
+
+
+def generate_powerbi_tables(extracted_data_list: list, store=None) -> dict:
     """
     Generate Power BI-ready dimension and fact tables from extracted PDF data.
     
     Args:
         extracted_data_list: List of dictionaries from extract_pdf_structured_data()
+        store: Optional PowerBIStore; the tables built from this list are
+            upserted into it and the full stored schema is returned
     
     Returns:
         Dictionary with keys: 'Dim_Buyer', 'Dim_Seller', 'Dim_Product', 'Fact_Contract_Sales'
     """
-    
-    def clean_value(v):
-        if not v or v.strip() in ["-", "", "NA", "N/A"]:
-            return "NA"
-        v = re.sub(r"^[\s:\-]+|[\s:\-]+$", "", str(v))
-        return v.strip() if v.strip() else "NA"
-    
-    def generate_id(value, prefix=""):
-        """Generate unique ID from value"""
-        if value and value != "NA":
-            # Create hash-based ID
-            hash_obj = hashlib.md5(str(value).encode())
-            return f"{prefix}{hash_obj.hexdigest()[:8].upper()}"
-        return f"{prefix}UNKNOWN"
-    
-    # Collect all unique buyers
-    buyers_dict = {}
-    for data in extracted_data_list:
-        buyer_key = (
-            clean_value(data.get("Buyer Designation", "")),
-            clean_value(data.get("Buyer Email", "")),
-            clean_value(data.get("Buyer Phone Number", ""))
-        )
-        if buyer_key not in buyers_dict:
-            buyer_id = generate_id(str(buyer_key), "BUYER_")
-            buyers_dict[buyer_key] = {
-                "Buyer_ID": buyer_id,
-                "Buyer Designation": clean_value(data.get("Buyer Designation", "")),
-                "Buyer Contact Number": clean_value(data.get("Buyer Phone Number", "")),
-                "Buyer Email ID": clean_value(data.get("Buyer Email", "")),
-                # Buyer GSTIN excluded as per requirements
-                "Buyer State": clean_value(data.get("Buyer State", "")),
-            }
-    
-    # Collect all unique sellers
-    sellers_dict = {}
-    for data in extracted_data_list:
-        seller_id = clean_value(data.get("GeM Seller ID", ""))
-        if seller_id == "NA" or not seller_id:
-            # Fallback: use seller name + email
-            seller_key = (
-                clean_value(data.get("Seller Name", "")),
-                clean_value(data.get("Seller Email", ""))
-            )
-            seller_id = generate_id(str(seller_key), "SELLER_")
-        
-        if seller_id not in sellers_dict:
-            sellers_dict[seller_id] = {
-                "Seller_ID": seller_id,
-                "Seller Name": clean_value(data.get("Seller Name", "")),
-                "Seller Contact Number": clean_value(data.get("Seller Phone Number", "")),
-                "Seller Email ID": clean_value(data.get("Seller Email", "")),
-                "Seller GSTIN": clean_value(data.get("Seller GSTIN", "")),
-                "Seller State": clean_value(data.get("Seller State", "")),
-            }
-    
-    # Collect all unique products
-    products_dict = {}
-    for data in extracted_data_list:
-        product_key = (
-            clean_value(data.get("Product Name", "")),
-            clean_value(data.get("Brand", "")),
-            clean_value(data.get("Unit", ""))
-        )
-        if product_key not in products_dict:
-            product_id = generate_id(str(product_key), "PROD_")
-            products_dict[product_key] = {
-                "Product_ID": product_id,
-                "Product Name": clean_value(data.get("Product Name", "")),
-                "Brand": clean_value(data.get("Brand", "")),
-                "Unit": clean_value(data.get("Unit", "")),
-            }
-    
-    # Create fact table
-    fact_rows = []
-    for data in extracted_data_list:
-        # Find buyer ID
-        buyer_key = (
-            clean_value(data.get("Buyer Designation", "")),
-            clean_value(data.get("Buyer Email", "")),
-            clean_value(data.get("Buyer Phone Number", ""))
-        )
-        buyer_id = buyers_dict.get(buyer_key, {}).get("Buyer_ID", "NA")
-        
-        # Find seller ID
-        seller_id = clean_value(data.get("GeM Seller ID", ""))
-        if seller_id == "NA" or not seller_id:
-            seller_key = (
-                clean_value(data.get("Seller Name", "")),
-                clean_value(data.get("Seller Email", ""))
-            )
-            seller_id = generate_id(str(seller_key), "SELLER_")
-            if seller_id not in sellers_dict:
-                sellers_dict[seller_id] = {
-                    "Seller_ID": seller_id,
-                    "Seller Name": clean_value(data.get("Seller Name", "")),
-                    "Seller Contact Number": clean_value(data.get("Seller Phone Number", "")),
-                    "Seller Email ID": clean_value(data.get("Seller Email", "")),
-                    "Seller GSTIN": clean_value(data.get("Seller GSTIN", "")),
-                    "Seller State": clean_value(data.get("Seller State", "")),
-                }
-        
-        # Find product ID
-        product_key = (
-            clean_value(data.get("Product Name", "")),
-            clean_value(data.get("Brand", "")),
-            clean_value(data.get("Unit", ""))
+    if store is not None:
+        return store.upsert(generate_powerbi_tables(extracted_data_list))
+
+    if not extracted_data_list:
+        return {
+            "Dim_Buyer": pd.DataFrame(),
+            "Dim_Seller": pd.DataFrame(),
+            "Dim_Product": pd.DataFrame(),
+            "Fact_Contract_Sales": pd.DataFrame(),
+        }
+
+    # Only the columns the star schema uses, cleaned column-wise
+    df = pd.DataFrame({
+        col: _clean_column(pd.Series(
+            [data.get(col, "") for data in extracted_data_list], dtype=object
+        ))
+        for col in POWERBI_SOURCE_COLUMNS
+    })
+
+    # Buyers: one per (designation, email, phone)
+    df["Buyer_ID"] = _hash_ids(
+        df, ["Buyer Designation", "Buyer Email", "Buyer Phone Number"], "BUYER_"
+    )
+    dim_buyer = df.drop_duplicates(
+        ["Buyer Designation", "Buyer Email", "Buyer Phone Number"]
+    ).rename(columns={
+        "Buyer Phone Number": "Buyer Contact Number",
+        "Buyer Email": "Buyer Email ID",
+    })[[
+        "Buyer_ID", "Buyer Designation", "Buyer Contact Number",
+        # Buyer GSTIN excluded as per requirements
+        "Buyer Email ID", "Buyer State",
+    ]]
+
+    # Sellers: GeM Seller ID, else a hash of (name, email)
+    df["Seller_ID"] = df["GeM Seller ID"]
+    no_gem_id = (df["GeM Seller ID"] == "NA").to_numpy()
+    if no_gem_id.any():
+        df.loc[no_gem_id, "Seller_ID"] = _hash_ids(
+            df[no_gem_id], ["Seller Name", "Seller Email"], "SELLER_"
         )
-        product_id = products_dict.get(product_key, {}).get("Product_ID", "NA")
-        
-        # Get numeric values
-        quantity = clean_value(data.get("Quantity", ""))
-        try:
-            quantity_num = float(quantity) if quantity != "NA" else 0.0
-        except:
-            quantity_num = 0.0
-        
-        unit_price = clean_value(data.get("Unit Price", ""))
-        try:
-            unit_price_num = float(unit_price) if unit_price != "NA" else 0.0
-        except:
-            unit_price_num = 0.0
-        
-        total_value = clean_value(data.get("Total Order Value (INR)", ""))
-        try:
-            total_value_num = float(total_value) if total_value != "NA" else 0.0
-        except:
-            total_value_num = 0.0
-        
-        fact_rows.append({
-            "Contract Number": clean_value(data.get("Contract No", "")),
-            "Buyer_ID": buyer_id,
-            "Seller_ID": seller_id,
-            "Product_ID": product_id,
-            "Ordered Quantity": quantity_num,
-            "Unit Price (INR)": unit_price_num,
-            "Total Order Value (INR)": total_value_num,
-        })
-    
-    # Create DataFrames
-    dim_buyer = pd.DataFrame(list(buyers_dict.values()))
-    dim_seller = pd.DataFrame(list(sellers_dict.values()))
-    dim_product = pd.DataFrame(list(products_dict.values()))
-    fact_contract_sales = pd.DataFrame(fact_rows)
-    
+    dim_seller = df.drop_duplicates("Seller_ID").rename(columns={
+        "Seller Phone Number": "Seller Contact Number",
+        "Seller Email": "Seller Email ID",
+    })[[
+        "Seller_ID", "Seller Name", "Seller Contact Number", "Seller Email ID",
+        "Seller GSTIN", "Seller State",
+    ]]
+
+    # Products: one per (name, brand, unit)
+    df["Product_ID"] = _hash_ids(df, ["Product Name", "Brand", "Unit"], "PROD_")
+    dim_product = df.drop_duplicates(["Product Name", "Brand", "Unit"])[
+        ["Product_ID", "Product Name", "Brand", "Unit"]
+    ]
+
+    fact_contract_sales = pd.DataFrame({
+        "Contract Number": df["Contract No"],
+        "Buyer_ID": df["Buyer_ID"],
+        "Seller_ID": df["Seller_ID"],
+        "Product_ID": df["Product_ID"],
+        "Ordered Quantity": _float_column(df["Quantity"].to_numpy()),
+        "Unit Price (INR)": _float_column(df["Unit Price"].to_numpy()),
+        "Total Order Value (INR)": _float_column(df["Total Order Value (INR)"].to_numpy()),
+    })
+
     return {
-        "Dim_Buyer": dim_buyer,
-        "Dim_Seller": dim_seller,
-        "Dim_Product": dim_product,
+        "Dim_Buyer": dim_buyer.reset_index(drop=True),
+        "Dim_Seller": dim_seller.reset_index(drop=True),
+        "Dim_Product": dim_product.reset_index(drop=True),
         "Fact_Contract_Sales": fact_contract_sales,
     }
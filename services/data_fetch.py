@@ -4,6 +4,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from services.data_loader import load_excel_file
+from services.aggregate_cubes import NO_DATE, QuarterCubes
 
 def load_sales_data():
     """
@@ -57,20 +58,37 @@ def load_sales_data():
         return None, str(e)
 
 
+def build_sales_cubes(df):
+    """Quarter cubes over load_sales_data() output (seller / city / category)."""
+    return QuarterCubes(df, "Date", "Value", {
+        "seller": "Seller Name",
+        "city": "City",
+        "category": "Category",
+    })
+
+
 # KPI helpers (used by Dashboard)
-def top_n_sellers(df, n=5):
+# Pass `cubes` (build_sales_cubes of the same df) to answer from the cubes
+def top_n_sellers(df, n=5, cubes=None):
+    if cubes is not None:
+        return cubes.top_values("seller", cubes.select(), n)
     if "Value" in df.columns and "Seller Name" in df.columns:
         tmp = df.groupby("Seller Name", as_index=False)["Value"].sum()
         return tmp.sort_values("Value", ascending=False).head(n)
     return pd.DataFrame()
 
-def city_performance(df):
+def city_performance(df, cubes=None):
+    if cubes is not None:
+        return cubes.top_values("city", cubes.select())
     if "Value" in df.columns and "City" in df.columns:
         tmp = df.groupby("City", as_index=False)["Value"].sum()
         return tmp.sort_values("Value", ascending=False)
     return pd.DataFrame()
 
-def yearly_summary(df):
+def yearly_summary(df, cubes=None):
+    # Undated rows are counted in today's year there: cubes only if none
+    if cubes is not None and NO_DATE not in cubes.keys:
+        return cubes.yearly().reset_index()
     if "Year" in df.columns and "Value" in df.columns:
         tmp = df.groupby("Year", as_index=False)["Value"].sum()
         return tmp.sort_values("Year")
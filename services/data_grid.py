@@ -0,0 +1,85 @@
+# services/data_grid.py
+# =====================================================
+# PAGINATED RESULT GRID (SERVER-SIDE PAGES)
+#
+# - Renders one page of a query_engine query: only the
+#   visible rows + the total count reach the browser
+# - Page size, sort column and direction picked by the
+#   user; sorting runs on the query backend (cached
+#   sort orders / SQL ORDER BY … LIMIT … OFFSET)
+# - S.No numbers the page rows within the full result
+# - Back to page 1 when the sort, page size or result
+#   size changes
+# =====================================================
+
+import math
+
+import streamlit as st
+
+PAGE_SIZES = [25, 50, 100, 250, 500]
+DEFAULT_PAGE_SIZE = 50
+
+DATASET_ORDER = "(dataset order)"
+
+
+def paginated_grid(query, key: str, columns=None, total=None, height=420):
+    """
+    Page through the rows of `query`.
+
+    Args:
+        query: FrameQuery / SqlQuery (see query_engine.open_query)
+        key: Unique widget key prefix for this grid
+        columns: Columns to show (None → all)
+        total: Row count of `query` when the caller already has it
+        height: Grid height in pixels
+    """
+    columns = columns or query.columns
+    total = query.count() if total is None else total
+
+    c1, c2, c3, c4 = st.columns([2, 1, 1, 1])
+
+    with c1:
+        sort_col = st.selectbox("Sort by", [DATASET_ORDER] + list(columns), key=f"{key}_sort")
+    with c2:
+        direction = st.selectbox("Order", ["Ascending", "Descending"], key=f"{key}_order")
+    with c3:
+        page_size = st.selectbox(
+            "Rows per page",
+            PAGE_SIZES,
+            index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
+            key=f"{key}_size"
+        )
+
+    pages = max(1, math.ceil(total / page_size))
+
+    # New sort / page size / result → first page
+    page_key, view_key = f"{key}_page", f"{key}_view"
+    view = (sort_col, direction, page_size, total)
+    if st.session_state.get(view_key) != view:
+        st.session_state[view_key] = view
+        st.session_state[page_key] = 1
+    st.session_state[page_key] = min(max(1, st.session_state.get(page_key, 1)), pages)
+
+    with c4:
+        page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+
+    offset = (int(page) - 1) * page_size
+    page_df = query.rows(
+        columns,
+        limit=page_size,
+        offset=offset,
+        order_by=None if sort_col == DATASET_ORDER else sort_col,
+        ascending=direction == "Ascending",
+    ).reset_index(drop=True)
+    page_df.insert(0, "S.No", range(offset + 1, offset + len(page_df) + 1))
+
+    st.dataframe(
+        page_df,
+        hide_index=True,
+        use_container_width=True,
+        height=height
+    )
+    st.caption(
+        f"Rows {offset + 1 if total else 0:,}–{offset + len(page_df):,} of {total:,} "
+        f"· page {int(page)} of {pages}"
+    )
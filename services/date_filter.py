@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 # =================================================
@@ -40,33 +41,54 @@ def get_quarter_range(from_date):
 
 
 # =================================================
-# APPLY DATE FILTER (FINAL – GEM BEHAVIOUR)
+# SORTED DATE INDEX (BINARY-SEARCH RANGES)
 # =================================================
-def apply_date_filter(
-    df,
-    date_col,
-    from_date=None,
-    to_date=None,
-    mode="quarter"   # "quarter" | "custom"
-):
+class SortedDates:
     """
-    FINAL GEM RULES:
-    ----------------
-    1. Default = QUARTER
-    2. Custom ONLY if mode="custom"
-    3. If from_date missing → dataset MIN date
-    4. To date optional for quarter
+    Date column of a frame kept sorted ascending (NaT last).
+    Ranges resolve to row positions with searchsorted.
     """
 
-    # ---------- BASIC SAFETY ----------
-    if df is None or df.empty or date_col not in df.columns:
-        return df, None, None, None
+    def __init__(self, values):
+        values = np.asarray(values)
+        valid = len(values) - int(np.isnat(values).sum())
+        self.values = values[:valid]
 
-    df = df.copy()
-    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+    @property
+    def empty(self) -> bool:
+        return len(self.values) == 0
+
+    def min(self):
+        return pd.Timestamp(self.values[0])
+
+    def bounds(self, start, end):
+        """[lo, hi) positions of rows with start <= date <= end."""
+        start = pd.Timestamp(start).to_datetime64().astype(self.values.dtype)
+        end = pd.Timestamp(end).to_datetime64().astype(self.values.dtype)
+        lo = int(np.searchsorted(self.values, start, side="left"))
+        hi = int(np.searchsorted(self.values, end, side="right"))
+        return lo, max(lo, hi)
+
+
+def sort_by_date(df, date_col):
+    """
+    Rows ordered by `date_col` (NaT last) + the matching SortedDates.
+    Index is None (callers fall back to parse + mask) unless the
+    column is naive datetime64.
+    """
+    values = df[date_col].to_numpy()
+    if not np.issubdtype(values.dtype, np.datetime64):
+        return df, None
+
+    df = df.sort_values(date_col, kind="stable", na_position="last", ignore_index=True)
+    return df, SortedDates(df[date_col].to_numpy())
 
-    if df[date_col].dropna().empty:
-        return df, None, None, None
+
+# =================================================
+# RANGE RESOLUTION (QUARTER / CUSTOM)
+# =================================================
+def resolve_date_range(mode, from_date, to_date, min_date):
+    """(start, end, label) for the GEM rules, or None."""
 
     # ---------- NORMALIZE MODE ----------
     mode = (mode or "quarter").lower().strip()
@@ -77,15 +99,14 @@ def apply_date_filter(
     if mode == "quarter":
 
         if from_date is None or _to_timestamp(from_date) is None:
-            from_date = df[date_col].min()
+            from_date = min_date
 
         q_start, q_end, q_label = get_quarter_range(from_date)
 
         if q_start is None:
-            return df, None, None, None
+            return None
 
-        mask = (df[date_col] >= q_start) & (df[date_col] <= q_end)
-        return df.loc[mask], q_label, q_start, q_end
+        return q_start, q_end, q_label
 
     # =================================================
     # CUSTOM MODE (USER OVERRIDE)
@@ -94,11 +115,66 @@ def apply_date_filter(
     end_ts   = _to_timestamp(to_date)
 
     if start_ts is None or end_ts is None:
-        return df, None, None, None
+        return None
 
     # 🔒 SAFETY: swap if user gives wrong order
     if end_ts < start_ts:
         start_ts, end_ts = end_ts, start_ts
 
-    mask = (df[date_col] >= start_ts) & (df[date_col] <= end_ts)
-    return df.loc[mask], "Custom Period", start_ts, end_ts
+    return start_ts, end_ts, "Custom Period"
+
+
+# =================================================
+# APPLY DATE FILTER (FINAL – GEM BEHAVIOUR)
+# =================================================
+def apply_date_filter(
+    df,
+    date_col,
+    from_date=None,
+    to_date=None,
+    mode="quarter",   # "quarter" | "custom"
+    date_index=None
+):
+    """
+    FINAL GEM RULES:
+    ----------------
+    1. Default = QUARTER
+    2. Custom ONLY if mode="custom"
+    3. If from_date missing → dataset MIN date
+    4. To date optional for quarter
+
+    With `date_index` (SortedDates of df, see sort_by_date) the
+    range is a searchsorted slice: no copy, no re-parse, no mask.
+    """
+
+    # ---------- BASIC SAFETY ----------
+    if df is None or df.empty or date_col not in df.columns:
+        return df, None, None, None
+
+    # ---------- SORTED: BINARY SEARCH ----------
+    if date_index is not None:
+        if date_index.empty:
+            return df, None, None, None
+
+        resolved = resolve_date_range(mode, from_date, to_date, date_index.min())
+        if resolved is None:
+            return df, None, None, None
+
+        start, end, label = resolved
+        lo, hi = date_index.bounds(start, end)
+        return df.iloc[lo:hi], label, start, end
+
+    # ---------- UNSORTED: PARSE + MASK ----------
+    df = df.copy()
+    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+
+    if df[date_col].dropna().empty:
+        return df, None, None, None
+
+    resolved = resolve_date_range(mode, from_date, to_date, df[date_col].min())
+    if resolved is None:
+        return df, None, None, None
+
+    start, end, label = resolved
+    mask = (df[date_col] >= start) & (df[date_col] <= end)
+    return df.loc[mask], label, start, end
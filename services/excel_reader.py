@@ -0,0 +1,170 @@
+# services/excel_reader.py
+# =====================================================
+# STREAMING EXCEL READER
+#
+# - python-calamine (Rust) when installed, otherwise
+#   openpyxl in read-only mode: rows are streamed, the
+#   workbook is never loaded as a cell tree
+# - Rows grouped into DataFrame chunks of CHUNK_ROWS
+# - Progress callback per chunk: (rows_read, total_rows)
+# - Output matches pd.read_excel for plain sheets:
+#   first row is the header, blank / "NA" cells → NaN,
+#   trailing blank rows/columns dropped, integral
+#   numbers → int
+# =====================================================
+
+import io
+import os
+from datetime import date, datetime, time
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+try:
+    import python_calamine
+except ImportError:   # optional: openpyxl streaming fallback
+    python_calamine = None
+
+CHUNK_ROWS = int(os.environ.get("GEM_EXCEL_CHUNK_ROWS", "10000"))
+
+# Cells pd.read_excel reads as missing (its default na_values)
+NA_STRINGS = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+]
+
+
+# =====================================================
+# ROW SOURCES → (row iterator, total rows or None)
+# =====================================================
+def _calamine_rows(data: bytes):
+    sheet = python_calamine.CalamineWorkbook.from_filelike(io.BytesIO(data)).get_sheet_by_index(0)
+    return sheet.iter_rows(), sheet.height
+
+
+def _openpyxl_rows(data: bytes):
+    import openpyxl
+
+    wb = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    ws = wb.worksheets[0]
+    return ws.iter_rows(values_only=True), ws.max_row
+
+
+def reader_name(filename: str = "") -> str:
+    if python_calamine is not None:
+        return "calamine"
+    if filename.lower().endswith(".xls"):
+        return "xlrd"
+    return "openpyxl"
+
+
+# =====================================================
+# HEADER / CHUNKS
+# =====================================================
+def _header(row):
+    names, seen = [], {}
+    for i, v in enumerate(row):
+        if v is None or v == "":
+            name = f"Unnamed: {i}"
+        elif isinstance(v, float) and v.is_integer():
+            name = str(int(v))
+        else:
+            name = str(v)
+
+        # Duplicates → name.1, name.2 … like pandas
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _trim(row):
+    """Row without trailing blank cells (openpyxl pads to the sheet width)."""
+    end = len(row)
+    while end and (row[end - 1] is None or row[end - 1] == ""):
+        end -= 1
+    return row[:end]
+
+
+def _chunk_frame(rows, header):
+    rows = [_trim(r) for r in rows]
+    width = max([len(header)] + [len(r) for r in rows])
+    columns = _header(list(header) + [None] * (width - len(header)))
+
+    rows = [tuple(r) + (None,) * (width - len(r)) for r in rows]
+    frame = pd.DataFrame(rows, columns=columns, dtype=object)
+    return frame.where(~frame.isin(NA_STRINGS) & frame.notna())
+
+
+def _cell(v):
+    # As openpyxl / pd.read_excel hand them out
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    if isinstance(v, date) and not isinstance(v, datetime):
+        return datetime.combine(v, time())
+    return v
+
+
+def _finalize(df):
+    # Blank rows inside the sheet are kept, trailing ones dropped
+    filled = np.flatnonzero(df.notna().any(axis=1).to_numpy())
+    df = df.iloc[: filled[-1] + 1 if len(filled) else 0]
+
+    df = df.infer_objects()
+    for c in df.columns:
+        col = df[c]
+        if col.dtype == np.float64 and col.notna().all() and (col % 1 == 0).all():
+            df[c] = col.astype(np.int64)
+        elif col.dtype == object:
+            # Mixed cells (9.0 → 9) and calamine dates → datetimes
+            cells = pd.Series([_cell(v) for v in col.to_numpy()], index=df.index, dtype=object)
+            df[c] = cells.infer_objects()
+    return df.reset_index(drop=True)
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
+def read_excel_chunked(data: bytes, filename: str = "", progress=None) -> pd.DataFrame:
+    """
+    First sheet of an .xlsx/.xls workbook, streamed in chunks.
+
+    Args:
+        data: Workbook bytes (as uploaded)
+        filename: Used to pick a reader for legacy .xls
+        progress: Optional callback(rows_read, total_rows or None)
+    """
+    engine = reader_name(filename)
+    if engine == "xlrd":
+        # No streaming reader for legacy .xls without calamine
+        df = pd.read_excel(io.BytesIO(data))
+        if progress:
+            progress(len(df), len(df))
+        return df
+
+    rows, total = _calamine_rows(data) if engine == "calamine" else _openpyxl_rows(data)
+    total = total - 1 if total else None   # header row
+
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    header = _trim(header)
+
+    chunks, done = [], 0
+    while True:
+        block = list(islice(rows, CHUNK_ROWS))
+        if not block:
+            break
+        done += len(block)
+        chunks.append(_chunk_frame(block, header))
+        if progress:
+            progress(done, total)
+
+    if not chunks:
+        return pd.DataFrame(columns=_header(header))
+    return _finalize(pd.concat(chunks, ignore_index=True))
@@ -0,0 +1,259 @@
+# services/extraction_cache.py
+# =====================================================
+# PERSISTENT EXTRACTION CACHES (SQLITE)
+#
+# - Structured results keyed by SHA-256 of the PDF bytes,
+#   stamped with the extractor version (hash of the rule
+#   sources and regex guard settings); old versions
+#   dropped automatically on open
+# - OCR text keyed by (PDF hash, page, DPI, lang, config)
+# - Size cap with LRU eviction
+# =====================================================
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import contextmanager
+from functools import lru_cache
+
+# =====================================================
+# BASE PATHS
+# =====================================================
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+CACHE_PATH = os.path.join(DATA_DIR, "extraction_cache.sqlite")
+OCR_CACHE_PATH = os.path.join(DATA_DIR, "ocr_cache.sqlite")
+
+# Stored JSON payload cap (~1 KB per contract → ~60k contracts)
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# OCR text is ~3 KB per page → ~80k pages
+MAX_OCR_CACHE_BYTES = 256 * 1024 * 1024
+
+# Any edit to these files changes the extractor version
+RULE_SOURCES = [
+    os.path.join(BASE_DIR, "services", "custom_pdf_extractor.py"),
+    os.path.join(BASE_DIR, "services", "contract_index.py"),
+    os.path.join(BASE_DIR, "services", "field_engine.py"),
+    os.path.join(BASE_DIR, "services", "pdf_session.py"),
+]
+
+# ...and so does any change to these (field_engine regex guard)
+GUARD_SETTINGS = ["GEM_MAX_FIELD_MATCH_CHARS", "GEM_MAX_FIELD_SEARCH_CHARS"]
+
+
+# =====================================================
+# KEYS
+# =====================================================
+@lru_cache(maxsize=1)
+def extractor_version() -> str:
+    """Fingerprint of the extraction rules (changes on any rule edit)."""
+    h = hashlib.sha256()
+    # Regex guard budgets decide which fields fall back to NA
+    for var in GUARD_SETTINGS:
+        h.update(f"{var}={os.environ.get(var, '')};".encode())
+    for path in RULE_SOURCES:
+        try:
+            with open(path, "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(path.encode())
+    return h.hexdigest()[:16]
+
+
+def pdf_hash(pdf_bytes: bytes) -> str:
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+# =====================================================
+# SQLITE LRU STORE
+# =====================================================
+class _LruStore:
+    """
+    Key → text payload table with last-used timestamps.
+
+    Every public method swallows SQLite errors and behaves like a miss,
+    so a locked or corrupt cache never breaks extraction.
+    """
+
+    TABLE = None
+    KEY_COLUMNS = ()
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        try:
+            self._init_db()
+        except sqlite3.Error as e:
+            print(f"{self.TABLE} disabled:", e)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        keys = ", ".join(f"{c} NOT NULL" for c in self.KEY_COLUMNS)
+        with self._connect() as conn:
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                    {keys},
+                    payload   TEXT NOT NULL,
+                    size      INTEGER NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY ({", ".join(self.KEY_COLUMNS)})
+                )
+                """
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.TABLE}_lru "
+                f"ON {self.TABLE} (last_used)"
+            )
+
+    def _where(self):
+        return " AND ".join(f"{c} = ?" for c in self.KEY_COLUMNS)
+
+    def _get(self, key: tuple):
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    f"SELECT payload FROM {self.TABLE} WHERE {self._where()}",
+                    key
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute(
+                    f"UPDATE {self.TABLE} SET last_used = ? WHERE {self._where()}",
+                    (time.time(), *key)
+                )
+            return row[0]
+        except sqlite3.Error:
+            return None
+
+    def _put(self, key: tuple, payload: str):
+        columns = ", ".join(self.KEY_COLUMNS)
+        marks = ", ".join("?" for _ in self.KEY_COLUMNS)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.TABLE} "
+                    f"({columns}, payload, size, last_used) "
+                    f"VALUES ({marks}, ?, ?, ?)",
+                    (*key, payload, len(payload), time.time())
+                )
+                self._evict(conn)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn):
+        total = conn.execute(
+            f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE}"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Free down to 90% of the cap so we don't evict on every put
+        to_free = total - int(self.max_bytes * 0.9)
+        stale = []
+        for row in conn.execute(
+            f"SELECT {', '.join(self.KEY_COLUMNS)}, size FROM {self.TABLE} "
+            "ORDER BY last_used ASC"
+        ):
+            stale.append(row[:-1])
+            to_free -= row[-1]
+            if to_free <= 0:
+                break
+
+        conn.executemany(
+            f"DELETE FROM {self.TABLE} WHERE {self._where()}",
+            stale
+        )
+
+    def clear(self):
+        try:
+            with self._connect() as conn:
+                conn.execute(f"DELETE FROM {self.TABLE}")
+        except sqlite3.Error:
+            pass
+
+
+# =====================================================
+# STRUCTURED EXTRACTION CACHE
+# =====================================================
+class ExtractionCache(_LruStore):
+    """Structured 24-field results per (PDF hash, extractor version)."""
+
+    TABLE = "extraction_cache"
+    KEY_COLUMNS = ("pdf_hash", "version")
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_CACHE_BYTES, version=None):
+        self.version = version or extractor_version()
+        super().__init__(path, max_bytes)
+
+    def _init_db(self):
+        super()._init_db()
+        with self._connect() as conn:
+            # Extraction rules changed → old results are stale
+            conn.execute(
+                "DELETE FROM extraction_cache WHERE version != ?",
+                (self.version,)
+            )
+
+    def get(self, key: str):
+        payload = self._get((key, self.version))
+        try:
+            return json.loads(payload) if payload is not None else None
+        except ValueError:
+            return None
+
+    def put(self, key: str, value: dict):
+        self._put((key, self.version), json.dumps(value))
+
+
+# =====================================================
+# OCR TEXT CACHE
+# =====================================================
+class OcrCache(_LruStore):
+    """OCR text per (PDF hash, page, DPI, tesseract lang, config)."""
+
+    TABLE = "ocr_cache"
+    KEY_COLUMNS = ("pdf_hash", "page_no", "dpi", "lang", "config")
+
+    def __init__(self, path=OCR_CACHE_PATH, max_bytes=MAX_OCR_CACHE_BYTES):
+        super().__init__(path, max_bytes)
+
+    def get(self, key: str, page_no: int, dpi: int, lang: str, config: str):
+        return self._get((key, page_no, dpi, lang, config))
+
+    def put(self, key: str, page_no: int, dpi: int, lang: str, config: str, text: str):
+        self._put((key, page_no, dpi, lang, config), text)
+
+
+_CACHE = None
+_OCR_CACHE = None
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Process-wide cache instance (created on first use)."""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = ExtractionCache()
+    return _CACHE
+
+
+def get_ocr_cache() -> OcrCache:
+    """Process-wide OCR cache instance (created on first use)."""
+    global _OCR_CACHE
+    if _OCR_CACHE is None:
+        _OCR_CACHE = OcrCache()
+    return _OCR_CACHE
@@ -0,0 +1,142 @@
+# services/extraction_profile.py
+# =====================================================
+# OPT-IN FIELD / PATTERN TIMING FOR THE PDF EXTRACTOR
+#
+# - Off by default: extraction only pays a None check
+# - `with profiling() as prof:` records wall time per
+#   output field and per FIELD_PATTERNS regex
+# - Guard trips (field searches cut short) are counted
+# - prof.report() → slowest fields / patterns, sorted
+# =====================================================
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+_ACTIVE = None
+
+
+class FieldProfiler:
+    """Accumulates timings over any number of documents."""
+
+    def __init__(self):
+        self.docs = 0
+        self.fields = defaultdict(lambda: [0.0, 0, 0.0])    # total, calls, max
+        self.patterns = defaultdict(lambda: [0.0, 0, 0.0])
+        self.guard_trips = defaultdict(int)
+
+    # -------------------------------------------------
+    # RECORDING
+    # -------------------------------------------------
+    @staticmethod
+    def _add(table, name, seconds):
+        row = table[name]
+        row[0] += seconds
+        row[1] += 1
+        row[2] = max(row[2], seconds)
+
+    def add_field(self, name, seconds):
+        self._add(self.fields, name, seconds)
+
+    def add_pattern(self, name, seconds):
+        self._add(self.patterns, name, seconds)
+
+    def add_guard_trip(self, name):
+        self.guard_trips[name] += 1
+
+    # -------------------------------------------------
+    # REPORT
+    # -------------------------------------------------
+    @staticmethod
+    def _rows(table, top):
+        rows = sorted(table.items(), key=lambda kv: kv[1][0], reverse=True)
+        return rows[:top] if top else rows
+
+    def report(self, top=20) -> str:
+        lines = [f"Documents: {self.docs}", ""]
+        for title, table in (("FIELD", self.fields), ("PATTERN", self.patterns)):
+            lines.append(
+                f"{title:<28} {'total ms':>10} {'calls':>7} {'mean ms':>9} {'max ms':>9}"
+            )
+            for name, (total, calls, worst) in self._rows(table, top):
+                lines.append(
+                    f"{name:<28} {total * 1000:10.2f} {calls:7d} "
+                    f"{total * 1000 / calls:9.3f} {worst * 1000:9.3f}"
+                )
+            lines.append("")
+
+        if self.guard_trips:
+            lines.append("GUARD TRIPS (search abandoned → NA)")
+            for name, count in sorted(self.guard_trips.items(), key=lambda kv: -kv[1]):
+                lines.append(f"{name:<28} {count:7d}")
+        return "\n".join(lines)
+
+    def write_report(self, path, top=None):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.report(top) + "\n")
+
+
+class FieldTimer:
+    """
+    Lap timer for one document: start("Brand") closes the previous
+    field and opens the next one; stop() closes the last.
+    """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.field = None
+        self.t0 = 0.0
+
+    def start(self, field):
+        now = time.perf_counter()
+        if self.field is not None:
+            self.profiler.add_field(self.field, now - self.t0)
+        self.field = field
+        self.t0 = now
+
+    def stop(self):
+        self.start(None)
+        self.profiler.docs += 1
+
+
+class _NullTimer:
+    def start(self, field):
+        pass
+
+    def stop(self):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+# =====================================================
+# ACTIVATION
+# =====================================================
+def active_profiler():
+    return _ACTIVE
+
+
+def field_timer():
+    """Timer for the current document (no-op unless profiling)."""
+    return FieldTimer(_ACTIVE) if _ACTIVE is not None else _NULL_TIMER
+
+
+@contextmanager
+def profiling(profiler=None):
+    """
+    Profile every extraction in this process inside the block.
+
+    Example:
+        with profiling() as prof:
+            for text in texts:
+                extract_structured_fields(text)
+        print(prof.report())
+    """
+    global _ACTIVE
+    previous = _ACTIVE
+    _ACTIVE = profiler or FieldProfiler()
+    try:
+        yield _ACTIVE
+    finally:
+        _ACTIVE = previous
@@ -0,0 +1,270 @@
+# services/field_engine.py
+# =====================================================
+# DECLARATIVE FIELD-SPEC ENGINE
+#
+# - Each output column is a FieldSpec: ordered probes
+#   (patterns tried over a section, post-processors),
+#   an optional accept rule and field post-processors
+# - Specs compile once: pattern names resolve to the
+#   compiled regex and its index label at import
+# - Per document: one ContractIndex; section spans and
+#   pattern matches are memoized and shared by fields
+# - Only the requested fields (and the fields they
+#   derive from) are evaluated
+# - Regex guard: labelled patterns only tried at their
+#   label offsets, capped in match length and in
+#   characters scanned per search
+# =====================================================
+
+import os
+import time
+
+from services.contract_index import ContractIndex
+from services.extraction_profile import active_profiler, field_timer
+
+# Regex guard: one labelled match may span at most this many characters,
+# and one field search may offer at most this many characters to the
+# regex in total before giving up (→ "NA"). Character budgets, not time:
+# the same PDF extracts the same way on any machine / load (results are
+# cached), and both settings are part of the extractor version
+MAX_FIELD_MATCH_CHARS = int(os.environ.get("GEM_MAX_FIELD_MATCH_CHARS", "3000"))
+MAX_FIELD_SEARCH_CHARS = int(os.environ.get("GEM_MAX_FIELD_SEARCH_CHARS", "300000"))
+
+
+# =====================================================
+# GUARDED, PROFILED REGEX SEARCH
+# =====================================================
+def timed_search(name, pat, text, pos=0, endpos=None):
+    prof = active_profiler()
+    t0 = time.perf_counter() if prof else 0.0
+
+    m = pat.search(text, pos) if endpos is None else pat.search(text, pos, endpos)
+
+    if prof:
+        prof.add_pattern(name, time.perf_counter() - t0)
+    return m
+
+
+def match_at_labels(name, pat, label, index: ContractIndex, start, end):
+    """
+    Leftmost match starting at an offset of `label` in [start, end):
+    same result as pat.search(text, start, end) since every match
+    starts with the label, but each attempt is capped at
+    MAX_FIELD_MATCH_CHARS and the whole search at MAX_FIELD_SEARCH_CHARS
+    characters scanned.
+    """
+    prof = active_profiler()
+    t0 = time.perf_counter() if prof else 0.0
+    budget = MAX_FIELD_SEARCH_CHARS
+
+    m = None
+    for pos in index.iter(label, start, end):
+        stop = min(end, pos + MAX_FIELD_MATCH_CHARS)
+        m = pat.match(index.text, pos, stop)
+        if m:
+            break
+        budget -= stop - pos
+        if budget <= 0:
+            if prof:
+                prof.add_guard_trip(name)
+            break
+
+    if prof:
+        prof.add_pattern(name, time.perf_counter() - t0)
+    return m
+
+
+# =====================================================
+# SPEC BUILDING BLOCKS
+# =====================================================
+class Probe:
+    """
+    Ordered patterns tried over one section; the first non-empty value
+    (group stripped, then `post` applied, not rejected) wins.
+
+    Args:
+        *patterns: Registry names or compiled regexes
+        section: Section name; searched first, then the whole text
+        section_only: Never fall back to the whole text
+        group: Match group holding the value
+        post: Callables str → str applied in order
+        reject: Predicate dropping a candidate (try the next pattern)
+    """
+
+    def __init__(self, *patterns, section=None, section_only=False,
+                 group=1, post=(), reject=None):
+        self.patterns = patterns
+        self.section = section
+        self.section_only = section_only
+        self.group = group
+        self.post = tuple(post)
+        self.reject = reject
+        self.steps = ()
+
+    def compile(self, registry, labels, owner):
+        steps = []
+        for i, p in enumerate(self.patterns):
+            if isinstance(p, str):
+                steps.append((p, registry[p], labels.get(p)))
+            else:
+                steps.append((f"{owner}[{i}]", p, None))
+        self.steps = tuple(steps)
+
+    def __call__(self, ctx):
+        for step in self.steps:
+            m = ctx.match(step, self.section, self.section_only)
+            if not m:
+                continue
+            value = m.group(self.group).strip()
+            for fn in self.post:
+                value = fn(value)
+            if value and not (self.reject and self.reject(value)):
+                return value
+        return ""
+
+
+class Derived:
+    """Probe computing a value from another field's (raw) value."""
+
+    def __init__(self, field, fn=None):
+        self.field = field
+        self.fn = fn
+
+    def __call__(self, ctx):
+        value = ctx.value(self.field)
+        return self.fn(value) if self.fn else value
+
+
+class FieldSpec:
+    """
+    One output column.
+
+    Probes run in order; a non-empty probe result replaces the current
+    value, and evaluation stops once the value is non-empty and passes
+    `accept(value, ctx)` (if given). Field-level `post` runs last.
+    Probes are Probe / Derived objects or any callable(ctx) → str.
+    """
+
+    def __init__(self, name, *probes, accept=None, post=(), output=True):
+        self.name = name
+        self.probes = probes
+        self.accept = accept
+        self.post = tuple(post)
+        self.output = output
+
+    def evaluate(self, ctx):
+        value = ""
+        for probe in self.probes:
+            found = probe(ctx)
+            if found:
+                value = found
+            if value and (self.accept is None or self.accept(value, ctx)):
+                break
+        for fn in self.post:
+            value = fn(value)
+        return value
+
+
+# =====================================================
+# PER-DOCUMENT STATE
+# =====================================================
+class FieldContext:
+    """Index, section spans, matches and field values for one text."""
+
+    def __init__(self, engine, text):
+        self.engine = engine
+        self.text = text
+        self.index = ContractIndex(text)
+        self._spans = {}
+        self._matches = {}
+        self._values = {}
+
+    def span(self, section):
+        if section not in self._spans:
+            self._spans[section] = self.engine.sections[section](self.index)
+        return self._spans[section]
+
+    def value(self, field):
+        """Raw (pre-finalize) value of `field`, evaluated at most once."""
+        if field not in self._values:
+            self._values[field] = self.engine.specs[field].evaluate(self)
+        return self._values[field]
+
+    def match(self, step, section=None, section_only=False):
+        key = (step[0], section, section_only)
+        if key not in self._matches:
+            self._matches[key] = self._find(step, section, section_only)
+        return self._matches[key]
+
+    def _find(self, step, section, section_only):
+        """
+        Search the section span first, then (unless `section_only`)
+        the whole text. First hit wins; None when neither matches.
+        """
+        name, pat, label = step
+        span = self.span(section) if section else None
+
+        if span and span[1] > span[0]:
+            start, end = span
+            if label:
+                m = match_at_labels(name, pat, label, self.index, start, end)
+            else:
+                m = timed_search(name, pat, self.text, start, end)
+            if m or section_only:
+                return m
+        elif section_only:
+            return None
+
+        if label:
+            return match_at_labels(name, pat, label, self.index, 0, len(self.text))
+        return timed_search(name, pat, self.text)
+
+
+# =====================================================
+# ENGINE
+# =====================================================
+class FieldEngine:
+    """
+    Compiled set of FieldSpecs.
+
+    Args:
+        specs: FieldSpecs in output order
+        patterns: Registry name → compiled regex
+        labels: Registry name → literal every match starts with
+        sections: Section name → callable(ContractIndex) → (start, end) | None
+        prepare: Text normalization run before indexing
+        finalize: Applied to every returned value (e.g. "" → "NA")
+    """
+
+    def __init__(self, specs, patterns, labels, sections, prepare=None, finalize=None):
+        self.specs = {}
+        for spec in specs:
+            for probe in spec.probes:
+                if isinstance(probe, Probe):
+                    probe.compile(patterns, labels, spec.name)
+            self.specs[spec.name] = spec
+
+        self.sections = sections
+        self.prepare = prepare
+        self.finalize = finalize
+        self.default_fields = [s.name for s in specs if s.output]
+
+    def extract(self, text, fields=None) -> dict:
+        fields = self.default_fields if fields is None else list(fields)
+        unknown = [f for f in fields if f not in self.specs]
+        if unknown:
+            raise KeyError(f"Unknown field(s): {', '.join(unknown)}")
+
+        timer = field_timer()
+        timer.start("NORMALIZE + INDEX")
+        if self.prepare:
+            text = self.prepare(text)
+        ctx = FieldContext(self, text)
+
+        out = {}
+        for field in fields:
+            timer.start(field)
+            value = ctx.value(field)
+            out[field] = self.finalize(value) if self.finalize else value
+        timer.stop()
+        return out
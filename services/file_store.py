@@ -1,29 +1,61 @@
 # services/file_store.py
 # =====================================================
-# CENTRAL FILE STORE (EXCEL / CSV ONLY)
+# CENTRAL FILE STORE (EXCEL → TYPED PARQUET DATASET)
 #
 # - Streamlit safe
-# - Cached CSV loading
-# - Excel upload handling
+# - Dtypes resolved once at save time: dates →
+#   datetime64, numeric text → numbers,
+#   city/state/brand/category → categorical
+# - Uploads are appended / upserted into the partitioned
+#   dataset (partitioned_store), or replace it on request
+# - Column projection and category / date range pruning
+#   on load; loaded frames memory-compacted (frame_memory)
+# - Cached loading, Excel upload handling; the preview
+#   and memory report read only a few rows
+# - Upload bytes kept as-is as the backup (no re-encode)
+# - Workbook streamed in chunks (excel_reader); typing and
+#   the Parquet write run in a background thread with
+#   progress (start_excel_ingest / current_ingest), one
+#   job per session; jobs write in upload order
+# - Legacy single-file Parquet / CSV store migrated on
+#   first load
 # - No PDF logic
 # - No folder creation
 # =====================================================
 
 import os
+import threading
+
 import pandas as pd
 import streamlit as st
 
+from services.excel_reader import read_excel_chunked
+from services.frame_memory import MAX_CATEGORY_RATIO, compact_frame, memory_report
+from services.partitioned_store import DATE_HINTS, DatasetStore
+
 # =====================================================
 # BASE PATHS
 # =====================================================
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 
-CSV_PATH = os.path.join(DATA_DIR, "uploaded_file.csv")
 EXCEL_PATH = os.path.join(DATA_DIR, "uploaded_file.xlsx")
 
+# Single-file stores of earlier versions (migrated on first load)
+PARQUET_PATH = os.path.join(DATA_DIR, "uploaded_file.parquet")
+CSV_PATH = os.path.join(DATA_DIR, "uploaded_file.csv")
+
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# All uploads: data/dataset/category=…/quarter=…/
+DATASET = DatasetStore()
+
+# Rows read to estimate the memory report (scaled to the whole store)
+REPORT_SAMPLE_ROWS = 50_000
+
+# Low-cardinality text stored as categoricals (up to MAX_CATEGORY_RATIO)
+CATEGORY_HINTS = ["city", "state", "brand", "category"]
+
 # =====================================================
 # CACHE INVALIDATION
 # =====================================================
@@ -32,58 +64,337 @@ def _cache_buster(ts: float):
     return ts
 
 
+# =====================================================
+# DTYPE RESOLUTION (ONCE, AT SAVE TIME)
+# =====================================================
+def _is_text(s: pd.Series) -> bool:
+    return s.dtype == object or pd.api.types.is_string_dtype(s.dtype)
+
+
+def _as_numeric(s: pd.Series):
+    """Numbers if every non-empty value parses (commas allowed), else None."""
+    values = s.dropna().astype(str).str.strip()
+    values = values[values != ""]
+    if values.empty:
+        return None
+
+    parsed = pd.to_numeric(values.str.replace(",", "", regex=False), errors="coerce")
+    if parsed.isna().any():
+        return None
+    # Blanks / missing → NaN; everything else is known to parse
+    return pd.to_numeric(
+        s.astype(str).str.strip().str.replace(",", "", regex=False),
+        errors="coerce"
+    )
+
+
+def type_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Resolve column dtypes once so loads never re-infer or re-parse.
+    """
+    df = df.copy()
+    df.columns = df.columns.astype(str).str.strip()
+
+    for c in df.columns:
+        col = df[c]
+        name = c.lower().replace(" ", "")
+
+        if any(h in name for h in DATE_HINTS) and not pd.api.types.is_datetime64_any_dtype(col):
+            parsed = pd.to_datetime(col, errors="coerce")
+            if parsed.notna().any():
+                df[c] = parsed
+                continue
+
+        if not _is_text(col):
+            continue
+
+        numeric = _as_numeric(col)
+        if numeric is not None:
+            df[c] = numeric
+            continue
+
+        df[c] = col.where(col.isna(), col.astype(str).str.strip())
+        if any(h in name for h in CATEGORY_HINTS):
+            if df[c].nunique() <= max(1, len(df) * MAX_CATEGORY_RATIO):
+                df[c] = df[c].astype("category")
+
+    return df
+
+
+def _write_dataset(df: pd.DataFrame, replace: bool = False) -> dict:
+    """Upsert (or replace with) a typed upload; {"added", "updated", ...}."""
+    return DATASET.replace(df) if replace else DATASET.upsert(df)
+
+
+def _backup_path(filename: str) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return EXCEL_PATH if ext in ("", ".xlsx") else os.path.join(DATA_DIR, "uploaded_file" + ext)
+
+
+def _write_backup(data: bytes, filename: str):
+    # Original bytes: no parse → re-encode round trip
+    path = _backup_path(filename)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _bust_cache():
+    ts = DATASET.version()
+    _cache_buster.clear()
+    _cache_buster(ts)
+
+
 # =====================================================
 # SAVE EXCEL FILE (UPLOAD)
 # =====================================================
-def save_excel_file(uploaded_file):
+def save_excel_file(uploaded_file, replace: bool = False):
     """
-    Save uploaded Excel file safely.
-    - Excel backup
-    - CSV for fast load
+    Save uploaded Excel file safely (synchronous).
+    - Excel backup (uploaded bytes)
+    - Typed rows upserted into the dataset (replace=True: the
+      upload becomes the whole dataset)
     - Cache invalidation
+
+    Returns:
+        {"rows", "added", "updated", "partitions"}, or None on failure
     """
     try:
         if uploaded_file is None:
             return None
 
-        df = pd.read_excel(uploaded_file)
+        data = uploaded_file.getvalue()
+        df = read_excel_chunked(data, uploaded_file.name)
 
         if df.empty:
             st.warning("Uploaded Excel file is empty.")
             return None
 
-        df.to_excel(EXCEL_PATH, index=False)
-        df.to_csv(CSV_PATH, index=False)
+        _write_backup(data, uploaded_file.name)
 
-        ts = os.path.getmtime(CSV_PATH)
-        _cache_buster.clear()
-        _cache_buster(ts)
+        df = type_dataset(df)
+        stats = _write_dataset(df, replace)
+        _bust_cache()
 
-        return df
+        return {"rows": len(df), **stats}
 
     except Exception as e:
         st.error(f"Error while saving Excel file: {e}")
         return None
 
 
+# =====================================================
+# BACKGROUND INGEST (UPLOAD → DATASET OFF THE PAGE)
+# =====================================================
+class IngestJob:
+    """One upload being parsed, typed and written in a worker thread."""
+
+    def __init__(self, source_id: str, filename: str, data: bytes, replace: bool = False):
+        self.source_id = source_id
+        self.filename = filename
+        self.replace = replace
+        self.stage = "reading"   # reading → typing → queued → writing → done | error
+        self.rows_read = 0
+        self.total_rows = None
+        self.rows = None
+        self.stats = None        # {"added", "updated", "partitions"} once written
+        self.error = None
+        self._data = data
+        self._thread = threading.Thread(target=self._run, name="excel-ingest", daemon=True)
+
+        # Write turn: uploads reach the store in the order they arrived
+        global _ingest_seq
+        with _WRITE_TURN:
+            self._seq = _ingest_seq
+            _ingest_seq += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    @property
+    def finished(self) -> bool:
+        return self.stage in ("done", "error")
+
+    def fraction(self) -> float:
+        """Progress in [0, 1] for st.progress."""
+        if self.finished:
+            return 1.0
+        if self.stage != "reading":
+            return 0.95
+        if not self.total_rows:
+            return 0.0
+        return min(0.9, 0.9 * self.rows_read / self.total_rows)
+
+    def _progress(self, rows_read, total_rows):
+        self.rows_read, self.total_rows = rows_read, total_rows
+
+    def _wait_turn(self):
+        with _WRITE_TURN:
+            _WRITE_TURN.wait_for(lambda: _next_write == self._seq)
+
+    def _release_turn(self):
+        # Written or failed: the next upload in line may write
+        global _next_write
+        with _WRITE_TURN:
+            _released.add(self._seq)
+            while _next_write in _released:
+                _released.discard(_next_write)
+                _next_write += 1
+            _WRITE_TURN.notify_all()
+
+    def _run(self):
+        try:
+            df = read_excel_chunked(self._data, self.filename, self._progress)
+            if df.empty:
+                raise ValueError("Uploaded Excel file is empty.")
+
+            self.stage = "typing"
+            df = type_dataset(df)
+
+            # Earlier uploads (any session) write first; none is dropped
+            self.stage = "queued"
+            self._wait_turn()
+            self.stage = "writing"
+            self.stats = _write_dataset(df, self.replace)
+
+            _bust_cache()
+            self.rows = len(df)
+            self.stage = "done"
+
+        except Exception as e:
+            self.error = str(e)
+            self.stage = "error"
+
+        finally:
+            self._data = None
+            self._release_turn()
+
+
+# Upload order across sessions (the dataset lock serialises the writes)
+_WRITE_TURN = threading.Condition()
+_ingest_seq = 0
+_next_write = 0
+_released = set()
+
+SESSION_KEY = "excel_ingest_job"
+
+
+def _source_id(uploaded_file) -> str:
+    file_id = getattr(uploaded_file, "file_id", None)
+    return file_id or f"{uploaded_file.name}:{uploaded_file.size}"
+
+
+def start_excel_ingest(uploaded_file, replace: bool = False):
+    """
+    Back up the upload and add it to the dataset in the background.
+    Streamlit reruns re-send the same upload: that returns this
+    session's running (or finished) job instead of starting a new
+    one, unless the upload mode changed.
+
+    Args:
+        uploaded_file: Streamlit UploadedFile
+        replace: Drop previously uploaded rows instead of upserting
+
+    Returns:
+        IngestJob
+    """
+    source_id = _source_id(uploaded_file)
+    job = st.session_state.get(SESSION_KEY)
+    if job is not None and job.source_id == source_id and job.replace == replace:
+        return job
+
+    data = uploaded_file.getvalue()
+    _write_backup(data, uploaded_file.name)
+    job = IngestJob(source_id, uploaded_file.name, data, replace)
+    st.session_state[SESSION_KEY] = job
+
+    return job.start()
+
+
+def current_ingest():
+    """This session's latest IngestJob, or None."""
+    return st.session_state.get(SESSION_KEY)
+
+
 # =====================================================
 # LOAD SAVED EXCEL DATA (CACHED)
 # =====================================================
 @st.cache_data
-def _load_csv_cached(ts: float):
-    return pd.read_csv(CSV_PATH)
+def _load_dataset_cached(ts: float, columns: tuple = None, categories: tuple = None,
+                         start=None, end=None):
+    df = DATASET.load(
+        categories=list(categories) if categories else None,
+        start=start,
+        end=end,
+        columns=list(columns) if columns else None,
+    )
+    return None if df is None else compact_frame(df)
+
+
+@st.cache_data
+def _preview_cached(ts: float, rows: int):
+    return DATASET.head(rows)
+
+
+@st.cache_data
+def _memory_report_cached(ts: float, rows: int):
+    sample = DATASET.sample(rows)
+    if sample is None or sample.empty:
+        return None
+    report = memory_report(sample, compact_frame(sample))
+
+    # Sample bytes scaled to the whole store
+    scale = DATASET.row_count() / len(sample)
+    for c in ("Before (bytes)", "After (bytes)"):
+        report[c] = (report[c] * scale).round().astype("int64")
+    return report
+
+
+def _migrate_legacy():
+    # Store written before the partitioned dataset: load it once
+    if os.path.exists(PARQUET_PATH):
+        DATASET.replace(pd.read_parquet(PARQUET_PATH))
+    elif os.path.exists(CSV_PATH):
+        DATASET.replace(type_dataset(pd.read_csv(CSV_PATH)))
+
+
+def dataset_version():
+    """Changes on every upload; None when nothing has been uploaded."""
+    if not DATASET.exists():
+        _migrate_legacy()
+    return DATASET.version()
+
 
+def saved_columns():
+    """Column names of the saved dataset (schema only, no data read)."""
+    if dataset_version() is None:
+        return []
+    return DATASET.columns()
 
-def load_saved_excel():
+
+def load_saved_excel(columns=None, categories=None, start=None, end=None):
     """
-    Load last saved Excel data.
+    Load the saved dataset (all uploads).
+
+    Args:
+        columns: Optional list of columns to read (others never leave disk)
+        categories: Only these category partitions (None → all)
+        start, end: Only quarter partitions overlapping this date range
     """
     try:
-        if not os.path.exists(CSV_PATH):
+        ts = dataset_version()
+        if ts is None:
             return None
 
-        ts = os.path.getmtime(CSV_PATH)
-        df = _load_csv_cached(ts)
+        df = _load_dataset_cached(
+            ts,
+            tuple(columns) if columns else None,
+            tuple(sorted(categories)) if categories else None,
+            start,
+            end,
+        )
 
         if df is None or df.empty:
             return None
@@ -93,3 +404,36 @@ def load_saved_excel():
     except Exception as e:
         st.error(f"Error while loading saved data: {e}")
         return None
+
+
+def preview_saved_excel(rows: int = 200):
+    """
+    First `rows` rows of the saved dataset, reading only the part
+    files they come from.
+    """
+    try:
+        ts = dataset_version()
+        if ts is None:
+            return None
+        df = _preview_cached(ts, rows)
+        return None if df is None or df.empty else df
+
+    except Exception as e:
+        st.error(f"Error while loading saved data: {e}")
+        return None
+
+
+def saved_memory_report(sample_rows: int = REPORT_SAMPLE_ROWS):
+    """
+    Bytes per column of the saved dataset as read from disk vs after
+    load-time compaction (see frame_memory.memory_report), estimated
+    from a sample spread over the part files and scaled to the stored
+    row count. Only the report is cached, never the frame.
+
+    Returns:
+        DataFrame, or None when nothing has been uploaded
+    """
+    ts = dataset_version()
+    if ts is None:
+        return None
+    return _memory_report_cached(ts, sample_rows)
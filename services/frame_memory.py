@@ -0,0 +1,87 @@
+# services/frame_memory.py
+# =====================================================
+# LOAD-TIME MEMORY COMPACTION
+#
+# - Repetitive text (distinct values / rows at most
+#   MAX_CATEGORY_RATIO: organisation, buyer, seller,
+#   brand, category, city, state …) → categorical: each
+#   distinct string stored once + small integer codes
+# - Unused categories dropped (partition loads keep the
+#   categories of every file)
+# - Integer columns (quantity, value, …) downcast to the
+#   smallest integer dtype holding them; sums still
+#   accumulate in int64
+# - Strings left in object columns interned: equal
+#   values share one Python object
+# - memory_report: bytes per column before / after
+# =====================================================
+
+import os
+import sys
+
+import pandas as pd
+
+# Distinct values / rows at or below which text becomes categorical
+MAX_CATEGORY_RATIO = float(os.environ.get("GEM_CATEGORY_RATIO", "0.5"))
+
+
+def _is_plain_text(s: pd.Series) -> bool:
+    return s.dtype == object or pd.api.types.is_string_dtype(s.dtype)
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Same values, smaller dtypes (see module header).
+
+    Args:
+        df: Loaded frame (not modified)
+    """
+    df = df.copy(deep=False)
+    rows = max(1, len(df))
+
+    for c in df.columns:
+        col = df[c]
+
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            df[c] = col.cat.remove_unused_categories()
+
+        elif pd.api.types.is_bool_dtype(col.dtype):
+            continue
+
+        elif pd.api.types.is_integer_dtype(col.dtype) and not pd.api.types.is_extension_array_dtype(col.dtype):
+            df[c] = pd.to_numeric(col, downcast="integer")
+
+        elif _is_plain_text(col):
+            if col.nunique(dropna=True) <= rows * MAX_CATEGORY_RATIO:
+                df[c] = col.astype("category")
+            elif col.dtype == object:
+                df[c] = col.map(_intern)
+
+    return df
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    Bytes per column of the same data before / after compaction.
+
+    Returns:
+        DataFrame: Column, Before dtype, After dtype, Before (bytes),
+        After (bytes), Saved %
+    """
+    size_before = before.memory_usage(deep=True, index=False)
+    size_after = after.memory_usage(deep=True, index=False)
+
+    report = pd.DataFrame({
+        "Column": [str(c) for c in before.columns],
+        "Before dtype": [str(before[c].dtype) for c in before.columns],
+        "After dtype": [str(after[c].dtype) for c in before.columns],
+        "Before (bytes)": size_before.to_numpy(),
+        "After (bytes)": size_after.reindex(before.columns).to_numpy(),
+    })
+    saved = 1 - report["After (bytes)"] / report["Before (bytes)"].where(report["Before (bytes)"] > 0)
+    report["Saved %"] = (saved * 100).round(1).fillna(0)
+    return report
@@ -1,9 +1,7 @@
-import pdfplumber
-import pytesseract
-from pdf2image import convert_from_path
 import re
-import tempfile
-import os
+
+from services.ocr_pool import ocr_pages
+from services.pdf_session import open_session
 
 def has_bad_encoding(text):
     return "(cid:" in text or re.search(r'[\u0900-\u097F]', text)
@@ -16,26 +14,32 @@ def clean_text(text):
     return text
 
 def extract_pdf(pdf_file):
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(pdf_file.read())
-        pdf_path = tmp.name
-
-    text = ""
-
-    # Try pdfplumber
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-    except:
-        pass
-
-    # OCR fallback
-    if not text or has_bad_encoding(text):
-        images = convert_from_path(pdf_path, dpi=300)
-        text = ""
-        for img in images:
-            text += pytesseract.image_to_string(img, lang="eng")
-
-    os.remove(pdf_path)
-    return clean_text(text)
+    # pdf_file: uploaded file, path, bytes or a shared PdfSession
+    with open_session(pdf_file) as session:
+        try:
+            page_count = session.page_count
+        except:
+            page_count = 0
+
+        # Text layer unreadable: OCR the whole document
+        if not page_count:
+            ocr = ocr_pages(session.pdf_bytes, dpi=300)
+            return clean_text("".join(ocr[p] for p in sorted(ocr)))
+
+        # Per page: keep good text-layer pages, OCR only the bad ones
+        texts = []
+        for i in range(page_count):
+            try:
+                page_text = session.page_text(i)
+            except:
+                page_text = ""
+
+            texts.append(None if not page_text or has_bad_encoding(page_text) else page_text)
+
+        bad_pages = [i for i, t in enumerate(texts) if t is None]
+        if bad_pages:
+            # Bad pages go to the OCR process pool together
+            ocr = ocr_pages(session.pdf_bytes, bad_pages, dpi=300)
+            texts = [ocr[i] if t is None else t for i, t in enumerate(texts)]
+
+    return clean_text("".join(texts))
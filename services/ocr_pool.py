@@ -0,0 +1,230 @@
+# services/ocr_pool.py
+# =====================================================
+# STREAMING OCR – PROCESS POOL, BOUNDED MEMORY
+#
+# - One process pool per app process, created on first
+#   use and shared by every document / session (no pool
+#   start-up per PDF; rebuilt if a worker dies)
+# - PDF bytes written to ONE temp file, shared by workers
+# - Each task rasterizes a single page and OCRs it, so a
+#   page image never leaves (or outlives) its worker
+# - Tesseract pinned to one thread per worker (the app
+#   process's own environment is never changed)
+# - At most `max_in_flight` pages rasterizing at once
+# - Page text cached per (PDF hash, page, DPI, lang, config):
+#   re-extracting a batch never re-runs tesseract; the cache
+#   is checked before the temp file / pdfinfo, so a fully
+#   cached document never touches disk
+# =====================================================
+
+import os
+import tempfile
+import threading
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import pytesseract
+from pdf2image import convert_from_path, pdfinfo_from_path
+from pypdf import PdfReader
+
+from services.extraction_cache import get_ocr_cache, pdf_hash
+
+DEFAULT_OCR_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+_POOL = None
+_POOL_KEY = None
+_POOL_LOCK = threading.Lock()
+
+
+# =====================================================
+# WORKER
+# =====================================================
+def _init_worker(tesseract_cmd):
+    # One tesseract thread per process: the pool is the parallelism
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def _ocr_one_page(pdf_path, page_no, dpi, lang, config):
+    """Page text, or None when the page can't be rasterized / OCR'd."""
+    try:
+        images = convert_from_path(
+            pdf_path, dpi=dpi, first_page=page_no + 1, last_page=page_no + 1
+        )
+    except Exception:
+        return None
+    try:
+        return "".join(
+            pytesseract.image_to_string(img, lang=lang, config=config)
+            for img in images
+        )
+    except Exception:
+        return None
+    finally:
+        for img in images:
+            img.close()
+
+
+def _count_pages(pdf_bytes):
+    # Page count without a temp file; None → ask pdfinfo
+    try:
+        return len(PdfReader(BytesIO(pdf_bytes)).pages)
+    except Exception:
+        return None
+
+
+# =====================================================
+# SHARED POOL
+# =====================================================
+def _shared_pool(workers):
+    """
+    The process-wide OCR pool, with at least `workers` processes.
+    Grown (never shrunk) on demand; replaced when the tesseract
+    binary changes or a worker died.
+    """
+    global _POOL, _POOL_KEY
+    tesseract_cmd = pytesseract.pytesseract.tesseract_cmd
+    with _POOL_LOCK:
+        if _POOL is not None:
+            size, cmd = _POOL_KEY
+            if size >= workers and cmd == tesseract_cmd:
+                return _POOL
+            workers = max(workers, size)
+            # Pages already submitted to the old pool still finish
+            _POOL.shutdown(wait=False)
+        _POOL = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(tesseract_cmd,)
+        )
+        _POOL_KEY = (workers, tesseract_cmd)
+        return _POOL
+
+
+def _discard_pool(pool):
+    # A broken pool refuses new work: the next page gets a fresh one
+    global _POOL, _POOL_KEY
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL, _POOL_KEY = None, None
+    pool.shutdown(wait=False)
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
+def ocr_pages(
+    pdf_bytes,
+    page_numbers=None,
+    dpi=300,
+    lang="eng",
+    config="",
+    max_workers=None,
+    max_in_flight=None,
+    use_cache=True,
+    page_count=None
+):
+    """
+    OCR selected pages of a PDF.
+
+    Args:
+        pdf_bytes: Raw PDF bytes
+        page_numbers: 0-based pages to OCR (default: all)
+        max_workers: Pages OCR'd in parallel on the shared pool
+        max_in_flight: Pages rasterized concurrently (default: workers)
+        use_cache: Serve / store page text in the persistent OCR cache
+        page_count: Pages in the PDF when the caller knows it
+            (only used when page_numbers is None)
+
+    Returns:
+        {page_no: text} ("" for pages that failed; those aren't cached)
+    """
+    if page_numbers is None and page_count is None:
+        page_count = _count_pages(pdf_bytes)
+    if page_numbers is None and page_count is not None:
+        page_numbers = range(page_count)
+
+    results = {}
+    cache = get_ocr_cache() if use_cache else None
+    key = pdf_hash(pdf_bytes) if use_cache else None
+
+    def uncached(pages):
+        if cache is not None:
+            for p in pages:
+                text = cache.get(key, p, dpi, lang, config)
+                if text is not None:
+                    results[p] = text
+        return [p for p in pages if p not in results]
+
+    # Cache first: a fully cached document never touches disk
+    pending = None if page_numbers is None else uncached(page_numbers)
+    if pending == []:
+        return results
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        tmp.write(pdf_bytes)
+        pdf_path = tmp.name
+
+    try:
+        if pending is None:
+            pending = uncached(range(pdfinfo_from_path(pdf_path)["Pages"]))
+            if not pending:
+                return results
+
+        def page_done(p, text):
+            # Failed pages come back empty and are retried next time
+            if text is not None and cache is not None:
+                cache.put(key, p, dpi, lang, config, text)
+            results[p] = text or ""
+
+        workers = max(1, max_workers or DEFAULT_OCR_WORKERS)
+        cap = max(1, min(max_in_flight or workers, workers))
+        _ocr_on_pool(pdf_path, pending, dpi, lang, config, workers, cap, page_done)
+
+        return results
+
+    finally:
+        os.remove(pdf_path)
+
+
+def _submit(workers, *args):
+    # (pool, future); a pool broken / replaced meanwhile is retried once
+    for _ in range(2):
+        pool = _shared_pool(workers)
+        try:
+            return pool, pool.submit(_ocr_one_page, *args)
+        except (BrokenProcessPool, RuntimeError):
+            _discard_pool(pool)
+    return None
+
+
+def _ocr_on_pool(pdf_path, pending, dpi, lang, config, workers, cap, page_done):
+    # All pages wait for their result: the temp file outlives every task
+    pending = list(pending)
+    in_flight = {}
+    while pending or in_flight:
+        while pending and len(in_flight) < cap:
+            p = pending.pop(0)
+            submitted = _submit(workers, pdf_path, p, dpi, lang, config)
+            if submitted is None:
+                page_done(p, None)
+                continue
+            pool, future = submitted
+            in_flight[future] = (p, pool)
+
+        if not in_flight:
+            continue
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            p, pool = in_flight.pop(future)
+            try:
+                text = future.result()
+            except BrokenProcessPool:
+                # Worker died on this page: skip only the page
+                _discard_pool(pool)
+                text = None
+            except Exception:
+                text = None
+            page_done(p, text)
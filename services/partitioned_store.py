@@ -0,0 +1,452 @@
+# services/partitioned_store.py
+# =====================================================
+# PARTITIONED MULTI-UPLOAD DATASET (APPEND / UPSERT)
+#
+# - data/dataset/category=<Category>/quarter=<YYYYQn>/
+#   part-<id>.parquet (category / quarter from the
+#   typed upload; "__none__" / "none" when missing)
+# - Rows keyed by contract / order number (number-
+#   style name, mostly distinct values), or by row
+#   hash + occurrence when the sheet has none; a
+#   re-upload replaces rows with the same key wherever
+#   they live (the key manifest _keys.parquet knows
+#   their partition)
+# - Pure appends add a part file; partitions holding
+#   replaced rows are rewritten
+# - Partitions with more than MAX_PARTS files are
+#   compacted into one
+# - Loads read only partitions overlapping the
+#   requested categories / date range
+# - head / sample / row_count read only the rows (or
+#   Parquet footers) they need
+# =====================================================
+
+import os
+import re
+import shutil
+import threading
+import uuid
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_DIR = os.path.join(BASE_DIR, "data", "dataset")
+
+MANIFEST = "_keys.parquet"
+ROW_KEY = "_row_key"
+
+# Key column: "<contract|order> <no|number|num|id>" ("Contract No.",
+# "order_id", "OrderNumber"), never "Contract Date" / "Contract Value"
+KEY_NAME = re.compile(r"\b(?:contract|order)\s*(?:no|number|num|id)\b")
+# Distinct share of the key values a column needs to be trusted as the key
+MIN_KEY_UNIQUE = 0.95
+# Same name hints the screens use to find their date column
+DATE_HINTS = ["date", "orderdate", "order_date", "created", "timestamp"]
+CATEGORY_HINT = "category"
+
+NO_CATEGORY = "__none__"
+NO_QUARTER = "none"
+
+MAX_PARTS = int(os.environ.get("GEM_DATASET_MAX_PARTS", "8"))
+
+
+# =====================================================
+# COLUMN ROLES (BY NAME, LIKE THE SCREENS)
+# =====================================================
+def _squash(name) -> str:
+    return str(name).lower().replace(" ", "")
+
+
+def _is_key_name(name) -> bool:
+    words = re.sub(r"[^a-z0-9]+", " ", str(name).lower())
+    return bool(KEY_NAME.search(words))
+
+
+def _usable_key(s: pd.Series) -> bool:
+    # Dates and amounts repeat across contracts: never a key
+    if pd.api.types.is_datetime64_any_dtype(s.dtype) or pd.api.types.is_bool_dtype(s.dtype):
+        return False
+    values = s.dropna()
+    if pd.api.types.is_float_dtype(s.dtype) and (values % 1 != 0).any():
+        return False
+    if values.empty:
+        return False
+    return values.nunique() >= MIN_KEY_UNIQUE * len(values)
+
+
+def key_column(df: pd.DataFrame):
+    """
+    Contract / order number column of an upload, or None (rows are
+    then keyed by content). A number-style name is required, and the
+    column must hold mostly distinct values.
+    """
+    return next((c for c in df.columns if _is_key_name(c) and _usable_key(df[c])), None)
+
+
+def category_column(columns):
+    return next((c for c in columns if CATEGORY_HINT in _squash(c)), None)
+
+
+def date_column(df):
+    return next(
+        (c for c in df.columns
+         if any(h in _squash(c) for h in DATE_HINTS)
+         and pd.api.types.is_datetime64_any_dtype(df[c])),
+        None
+    )
+
+
+# =====================================================
+# PARTITION NAMES
+# =====================================================
+def quarter_bounds(label: str):
+    """(first day, last day) of a "2024Q1" label."""
+    start = pd.Period(label, freq="Q").start_time
+    return start, (start + pd.offsets.QuarterEnd(startingMonth=3)).normalize()
+
+
+def _parse_partition(part: str):
+    cat, quarter = part.split("/")
+    return unquote(cat.split("=", 1)[1]), quarter.split("=", 1)[1]
+
+
+# =====================================================
+# STORE
+# =====================================================
+class DatasetStore:
+    """All uploads, partitioned by category × quarter, deduped by key."""
+
+    # One writer per store directory (uploads run in threads)
+    _locks = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, root: str = STORE_DIR):
+        self.root = root
+        with self._locks_guard:
+            self._lock = self._locks.setdefault(os.path.abspath(root), threading.RLock())
+
+    # ---------------- paths / listing ----------------
+    def _dir(self, part: str) -> str:
+        return os.path.join(self.root, *part.split("/"))
+
+    def _files(self, part: str):
+        d = self._dir(part)
+        if not os.path.isdir(d):
+            return []
+        return sorted(
+            os.path.join(d, f) for f in os.listdir(d) if f.endswith(".parquet")
+        )
+
+    def partitions(self):
+        """[(category, quarter, relative dir)] of every stored partition."""
+        out = []
+        if not os.path.isdir(self.root):
+            return out
+        for cat_dir in sorted(os.listdir(self.root)):
+            if not cat_dir.startswith("category="):
+                continue
+            for q_dir in sorted(os.listdir(os.path.join(self.root, cat_dir))):
+                part = f"{cat_dir}/{q_dir}"
+                if q_dir.startswith("quarter=") and self._files(part):
+                    out.append((*_parse_partition(part), part))
+        return out
+
+    def categories(self):
+        return sorted({c for c, _, _ in self.partitions() if c != NO_CATEGORY})
+
+    def min_date(self):
+        """First day of the earliest stored quarter, or None."""
+        quarters = [q for _, q, _ in self.partitions() if q != NO_QUARTER]
+        return quarter_bounds(min(quarters))[0] if quarters else None
+
+    def version(self):
+        """Changes on every write; None when the store is empty."""
+        path = os.path.join(self.root, MANIFEST)
+        return os.path.getmtime(path) if os.path.exists(path) else None
+
+    def exists(self) -> bool:
+        return self.version() is not None
+
+    # ---------------- keys / partitions of a batch ----------------
+    def _row_keys(self, df: pd.DataFrame) -> pd.Series:
+        # Identical rows stay distinct (nth copy → "#n"), and the
+        # same sheet uploaded twice maps onto the same keys
+        hashed = pd.util.hash_pandas_object(df, index=False).astype(str)
+        hashed = "h:" + hashed + "#" + hashed.groupby(hashed).cumcount().astype(str)
+
+        col = key_column(df)
+        if col is None:
+            return hashed
+        keys = df[col].astype(str).str.strip()
+        if pd.api.types.is_float_dtype(df[col]):
+            # 1234.0 and 1234 are the same contract
+            keys = keys.str.replace(r"\.0$", "", regex=True)
+        missing = df[col].isna() | (keys == "")
+        return ("k:" + keys).where(~missing, hashed)
+
+    def _row_partitions(self, df: pd.DataFrame) -> pd.Series:
+        cat_col = category_column(df.columns)
+        if cat_col is None:
+            cats = pd.Series(NO_CATEGORY, index=df.index)
+        else:
+            cats = df[cat_col].astype(str).str.strip()
+            cats = cats.where(df[cat_col].notna() & (cats != ""), NO_CATEGORY)
+
+        date_col = date_column(df)
+        if date_col is None:
+            quarters = pd.Series(NO_QUARTER, index=df.index)
+        else:
+            dates = df[date_col]
+            quarters = (
+                dates.dt.year.astype("Int64").astype(str) + "Q"
+                + dates.dt.quarter.astype("Int64").astype(str)
+            ).where(dates.notna(), NO_QUARTER)
+
+        # Quote each distinct category once
+        names = {c: f"category={quote(c, safe='')}" for c in cats.unique()}
+        return cats.map(names) + "/quarter=" + quarters
+
+    # ---------------- manifest ----------------
+    def _manifest(self) -> pd.DataFrame:
+        path = os.path.join(self.root, MANIFEST)
+        if not os.path.exists(path):
+            return pd.DataFrame({"key": pd.Series(dtype=str), "partition": pd.Series(dtype=str)})
+        return pd.read_parquet(path)
+
+    def _write_manifest(self, manifest: pd.DataFrame):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, MANIFEST)
+        tmp = path + ".tmp"
+        manifest.reset_index(drop=True).to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+
+    # ---------------- part files ----------------
+    def _write_part(self, part: str, df: pd.DataFrame) -> str:
+        d = self._dir(part)
+        os.makedirs(d, exist_ok=True)
+        path = os.path.join(d, f"part-{uuid.uuid4().hex}.parquet")
+        tmp = path + ".tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        return path
+
+    def _read_files(self, files, columns=None) -> pd.DataFrame:
+        frames = []
+        for path in files:
+            if columns is not None:
+                names = pq.read_schema(path).names
+                frames.append(pd.read_parquet(path, columns=[c for c in columns if c in names]))
+            else:
+                frames.append(pd.read_parquet(path))
+        return _concat(frames)
+
+    def _rewrite(self, part: str, df: pd.DataFrame):
+        old = self._files(part)
+        if len(df):
+            self._write_part(part, df)
+        for path in old:
+            os.remove(path)
+        if not len(df):
+            shutil.rmtree(self._dir(part), ignore_errors=True)
+
+    # =================================================
+    # WRITES
+    # =================================================
+    def upsert(self, df: pd.DataFrame) -> dict:
+        """
+        Add a typed upload (file_store.type_dataset output).
+        Rows whose key is already stored replace the stored row.
+
+        Returns:
+            {"added": n, "updated": n, "partitions": n}
+        """
+        if df is None or df.empty:
+            return {"added": 0, "updated": 0, "partitions": 0}
+
+        with self._lock:
+            df = df.reset_index(drop=True).copy()
+            keys = self._row_keys(df)
+
+            # Same key twice in one upload: the later row wins
+            latest = ~keys.duplicated(keep="last").to_numpy()
+            df, keys = df[latest].reset_index(drop=True), keys[latest].reset_index(drop=True)
+            df[ROW_KEY] = keys.to_numpy()
+            parts = self._row_partitions(df.drop(columns=ROW_KEY))
+
+            manifest = self._manifest()
+            replaced = manifest[manifest["key"].isin(set(keys))]
+            dirty = set(replaced["partition"])
+            replaced_keys = set(replaced["key"])
+
+            rows_of = parts.groupby(parts.to_numpy()).indices
+            touched = sorted(dirty | set(rows_of))
+            for part in touched:
+                new_rows = df.take(rows_of.get(part, []))
+                if part in dirty:
+                    kept = self._read_files(self._files(part))
+                    kept = kept[~kept[ROW_KEY].isin(replaced_keys)]
+                    self._rewrite(part, _concat([kept, new_rows]))
+                else:
+                    self._write_part(part, new_rows)
+
+            manifest = pd.concat([
+                manifest[~manifest["key"].isin(replaced_keys)],
+                pd.DataFrame({"key": keys.to_numpy(), "partition": parts.to_numpy()}),
+            ], ignore_index=True)
+            self._write_manifest(manifest)
+
+            self.compact(touched)
+
+        return {
+            "added": int(len(df) - len(replaced_keys)),
+            "updated": int(len(replaced_keys)),
+            "partitions": len(touched),
+        }
+
+    def replace(self, df: pd.DataFrame) -> dict:
+        """Drop everything stored, then load `df`."""
+        with self._lock:
+            self.clear()
+            return self.upsert(df)
+
+    def compact(self, partitions=None) -> int:
+        """
+        Merge partitions holding more than MAX_PARTS files into one file.
+
+        Returns:
+            Number of partitions compacted
+        """
+        with self._lock:
+            if partitions is None:
+                partitions = [p for _, _, p in self.partitions()]
+            done = 0
+            for part in partitions:
+                files = self._files(part)
+                if len(files) > MAX_PARTS:
+                    self._rewrite(part, self._read_files(files))
+                    done += 1
+            return done
+
+    def clear(self):
+        with self._lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    # =================================================
+    # READS
+    # =================================================
+    def select(self, categories=None, start=None, end=None):
+        """Relative dirs of partitions overlapping categories × [start, end]."""
+        wanted = set(categories) if categories else None
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+
+        chosen = []
+        for cat, quarter, part in self.partitions():
+            if wanted is not None and cat not in wanted:
+                continue
+            if start is not None or end is not None:
+                # Undated rows never fall inside a date range
+                if quarter == NO_QUARTER:
+                    continue
+                q_start, q_end = quarter_bounds(quarter)
+                if (end is not None and q_start > end) or (start is not None and q_end < start.normalize()):
+                    continue
+            chosen.append(part)
+        return chosen
+
+    def load(self, categories=None, start=None, end=None, columns=None):
+        """
+        Rows from the overlapping partitions only (None when empty).
+
+        Args:
+            categories: Category values to read (None → all)
+            start, end: Date range (None → unbounded)
+            columns: Optional column projection
+        """
+        return self.load_partitions(self.select(categories, start, end), columns)
+
+    def files(self, partitions):
+        """Part files of the given select() partitions, in load order."""
+        return [f for part in partitions for f in self._files(part)]
+
+    def load_partitions(self, partitions, columns=None):
+        """Rows of the given select() partitions (None when empty)."""
+        with self._lock:
+            files = self.files(partitions)
+            if not files:
+                return None
+            df = self._read_files(files, columns)
+        return df.drop(columns=ROW_KEY, errors="ignore")
+
+    def row_count(self) -> int:
+        """Stored rows (Parquet footers only, no data read)."""
+        with self._lock:
+            return sum(pq.ParquetFile(f).metadata.num_rows for f in self.files(self.select()))
+
+    def head(self, n: int, columns=None):
+        """First `n` rows in load order, reading only the files needed."""
+        return self._read_rows(self.files(self.select()), n, columns)
+
+    def sample(self, n: int, columns=None):
+        """
+        About `n` rows spread over every part file (each file's share
+        taken from its start), for estimates on large stores.
+        """
+        with self._lock:
+            files = self.files(self.select())
+            counts = [pq.ParquetFile(f).metadata.num_rows for f in files]
+        total = sum(counts)
+        if not total:
+            return None
+        shares = [max(1, round(n * c / total)) if c else 0 for c in counts]
+        return _concat([
+            self._read_rows([f], share, columns) for f, share in zip(files, shares) if share
+        ]).drop(columns=ROW_KEY, errors="ignore")
+
+    def _read_rows(self, files, n: int, columns=None):
+        batches = []
+        left = n
+        with self._lock:
+            for path in files:
+                pf = pq.ParquetFile(path)
+                cols = None if columns is None else [c for c in columns if c in pf.schema_arrow.names]
+                for batch in pf.iter_batches(batch_size=min(left, 65536), columns=cols):
+                    batches.append(batch.slice(0, left).to_pandas())
+                    left -= len(batches[-1])
+                    if left <= 0:
+                        break
+                if left <= 0:
+                    break
+        if not batches:
+            return None
+        return _concat(batches).drop(columns=ROW_KEY, errors="ignore")
+
+    def category_column(self):
+        """Column the category partitions come from, or None."""
+        return category_column(self.columns())
+
+    def columns(self):
+        """Column names across the stored files (schema only)."""
+        names = []
+        for _, _, part in self.partitions():
+            for path in self._files(part):
+                names += [n for n in pq.read_schema(path).names if n not in names and n != ROW_KEY]
+        return names
+
+
+def _concat(frames) -> pd.DataFrame:
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+
+    # Per-file categoricals have different categories: re-categorize
+    categorical = {c for f in frames for c in f.columns if isinstance(f[c].dtype, pd.CategoricalDtype)}
+    df = pd.concat(frames, ignore_index=True)
+    for c in categorical:
+        if not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype("category")
+    return df
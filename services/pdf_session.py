@@ -0,0 +1,135 @@
+# services/pdf_session.py
+# =====================================================
+# SHARED PDF DOCUMENT SESSION
+#
+# - Reads the PDF bytes once
+# - Opens pdfplumber lazily, one parse per page
+# - Memoizes per-page text / table: extractors handed
+#   the same session (data_Extract: text layer, then
+#   the OCR page count) never re-read a page
+# - Each page's parsed layout is released once read
+# =====================================================
+
+import os
+import hashlib
+from io import BytesIO
+from contextlib import contextmanager
+
+import pdfplumber
+
+
+def read_pdf_bytes(pdf_file) -> bytes:
+    """Return raw bytes for a path, bytes or (Streamlit) file-like object."""
+    if isinstance(pdf_file, PdfSession):
+        return pdf_file.pdf_bytes
+    if isinstance(pdf_file, (bytes, bytearray)):
+        return bytes(pdf_file)
+    if isinstance(pdf_file, (str, os.PathLike)):
+        with open(pdf_file, "rb") as f:
+            return f.read()
+    if hasattr(pdf_file, "getvalue"):
+        return pdf_file.getvalue()
+    pdf_file.seek(0)
+    return pdf_file.read()
+
+
+class PdfSession:
+    """
+    One uploaded PDF, parsed at most once.
+
+    pdfplumber keeps each page's parsed layout on the page object. That
+    layout is dropped as soon as a read is memoized, so a long contract
+    never holds more than one parsed page.
+    """
+
+    def __init__(self, source, name=None):
+        self.pdf_bytes = read_pdf_bytes(source)
+        self.name = name or getattr(source, "name", None)
+        self._pdf = None
+        self._pages = {}
+        self._text = {}
+        self._table = {}
+        self._sha256 = None
+
+    # -------------------------------------------------
+    # LIFECYCLE
+    # -------------------------------------------------
+    @property
+    def pdf(self):
+        if self._pdf is None:
+            self._pdf = pdfplumber.open(BytesIO(self.pdf_bytes))
+        return self._pdf
+
+    def close(self):
+        if self._pdf is not None:
+            self._pdf.close()
+        self._pdf = None
+        self._pages.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------------------------------------------------
+    # DOCUMENT
+    # -------------------------------------------------
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.pdf_bytes).hexdigest()
+        return self._sha256
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf.pages)
+
+    def page(self, i: int):
+        if i not in self._pages:
+            self._pages[i] = self.pdf.pages[i]
+        return self._pages[i]
+
+    def _release(self, i: int):
+        # Parsed layout freed right after the read
+        page = self._pages.pop(i, None)
+        if page is not None and hasattr(page, "close"):
+            page.close()
+
+    # -------------------------------------------------
+    # PER-PAGE CONTENT (MEMOIZED)
+    # -------------------------------------------------
+    def page_text(self, i: int) -> str:
+        if i not in self._text:
+            self._text[i] = self.page(i).extract_text() or ""
+            self._release(i)
+        return self._text[i]
+
+    def page_table(self, i: int):
+        """Largest table on the page (pdfplumber extract_table)."""
+        if i not in self._table:
+            self._table[i] = self.page(i).extract_table()
+            self._release(i)
+        return self._table[i]
+
+    def text(self, sep: str = "\n") -> str:
+        """All non-empty page texts joined with `sep`."""
+        texts = (self.page_text(i) for i in range(self.page_count))
+        return sep.join(t for t in texts if t)
+
+
+@contextmanager
+def open_session(source):
+    """
+    Yield a PdfSession for `source`. An existing session is passed
+    through untouched; one created here is closed on exit.
+    """
+    if isinstance(source, PdfSession):
+        yield source
+        return
+
+    session = PdfSession(source)
+    try:
+        yield session
+    finally:
+        session.close()
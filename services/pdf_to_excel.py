@@ -4,9 +4,10 @@ import os
 import shutil
 from datetime import datetime
 
-import pdfplumber
 import pandas as pd
 
+from services.pdf_session import open_session
+
 
 # =========================================================
 # STEP 1: Downloads folder se latest PDF uthana
@@ -79,9 +80,9 @@ def convert_pdfs_to_excel(pdf_dir, excel_dir, category):
     final_headers = None
 
     try:
-        with pdfplumber.open(final_pdf_path) as pdf:
-            for page in pdf.pages:
-                table = page.extract_table()
+        with open_session(final_pdf_path) as pdf:
+            for i in range(pdf.page_count):
+                table = pdf.page_table(i)
                 if not table or len(table) < 2:
                     continue
 
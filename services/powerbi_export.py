@@ -0,0 +1,122 @@
+# services/powerbi_export.py
+# =====================================================
+# COLUMNAR POWER BI EXPORT (PARQUET / ARROW IPC)
+#
+# - Explicit Arrow schema per star-schema table
+# - Repeating strings (states, units, foreign keys)
+#   dictionary-encoded → categoricals in pandas,
+#   compact columns in Power BI
+# - Files: downloads/<Category>/excel/GEM_PowerBI_<Table>.*
+# - Or one in-memory zip for st.download_button
+# =====================================================
+
+import io
+import os
+import zipfile
+
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+TEXT = pa.string()
+CODED = pa.dictionary(pa.int32(), pa.string())
+NUMBER = pa.float64()
+
+POWERBI_SCHEMAS = {
+    "Dim_Buyer": pa.schema([
+        ("Buyer_ID", TEXT),
+        ("Buyer Designation", CODED),
+        ("Buyer Contact Number", TEXT),
+        ("Buyer Email ID", TEXT),
+        ("Buyer State", CODED),
+    ]),
+    "Dim_Seller": pa.schema([
+        ("Seller_ID", TEXT),
+        ("Seller Name", TEXT),
+        ("Seller Contact Number", TEXT),
+        ("Seller Email ID", TEXT),
+        ("Seller GSTIN", TEXT),
+        ("Seller State", CODED),
+    ]),
+    "Dim_Product": pa.schema([
+        ("Product_ID", TEXT),
+        ("Product Name", CODED),
+        ("Brand", CODED),
+        ("Unit", CODED),
+    ]),
+    "Fact_Contract_Sales": pa.schema([
+        ("Contract Number", TEXT),
+        ("Buyer_ID", CODED),
+        ("Seller_ID", CODED),
+        ("Product_ID", CODED),
+        ("Ordered Quantity", NUMBER),
+        ("Unit Price (INR)", NUMBER),
+        ("Total Order Value (INR)", NUMBER),
+    ]),
+}
+
+FORMATS = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+
+# =====================================================
+# PANDAS → ARROW
+# =====================================================
+def to_arrow_tables(tables: dict) -> dict:
+    """generate_powerbi_tables() output → {name: pyarrow.Table} with fixed schemas."""
+    out = {}
+    for name, schema in POWERBI_SCHEMAS.items():
+        df = tables.get(name)
+        if df is None or df.empty:
+            out[name] = schema.empty_table()
+            continue
+        out[name] = pa.Table.from_pandas(
+            df[schema.names], schema=schema, preserve_index=False
+        )
+    return out
+
+
+def _write_table(table: pa.Table, sink, fmt: str):
+    if fmt == "parquet":
+        # Dictionary pages for every column; zstd keeps files small
+        pq.write_table(table, sink, compression="zstd", use_dictionary=True)
+    elif fmt == "arrow":
+        feather.write_feather(table, sink, compression="uncompressed")
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+# =====================================================
+# EXPORTS
+# =====================================================
+def export_powerbi_columnar(tables: dict, out_dir: str, fmt: str = "parquet") -> list:
+    """
+    Write each table to `out_dir` (e.g. downloads/<Category>/excel).
+
+    Returns:
+        List of written file paths
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for name, table in to_arrow_tables(tables).items():
+        path = os.path.join(out_dir, f"GEM_PowerBI_{name}{FORMATS[fmt]}")
+        tmp = path + ".tmp"
+        _write_table(table, tmp, fmt)
+        os.replace(tmp, path)
+        paths.append(path)
+    return paths
+
+
+def powerbi_columnar_zip(tables: dict, fmt: str = "parquet") -> io.BytesIO:
+    """All tables in one zip, ready for st.download_button."""
+    buffer = io.BytesIO()
+    # Parquet is already compressed: store, don't deflate again
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name, table in to_arrow_tables(tables).items():
+            sink = pa.BufferOutputStream()
+            _write_table(table, sink, fmt)
+            zf.writestr(f"GEM_PowerBI_{name}{FORMATS[fmt]}", sink.getvalue().to_pybytes())
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,128 @@
+# services/powerbi_store.py
+# =====================================================
+# PERSISTENT POWER BI STAR SCHEMA (PER CATEGORY)
+#
+# - data/powerbi/<Category>/<Table>.csv
+# - Dimensions upserted by their surrogate key; the keys
+#   are content hashes, so IDs are stable across runs
+# - A known attribute is never overwritten by "NA"
+# - Fact_Contract_Sales deduped by Contract Number
+#   (latest wins; "NA" contracts by full row)
+# - Only the new contracts are processed per upload
+# =====================================================
+
+import os
+import shutil
+import pandas as pd
+
+# =====================================================
+# BASE PATHS
+# =====================================================
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_DIR = os.path.join(BASE_DIR, "data", "powerbi")
+
+DIMENSION_KEYS = {
+    "Dim_Buyer": "Buyer_ID",
+    "Dim_Seller": "Seller_ID",
+    "Dim_Product": "Product_ID",
+}
+FACT_TABLE = "Fact_Contract_Sales"
+TABLES = list(DIMENSION_KEYS) + [FACT_TABLE]
+
+FACT_NUMERIC_COLUMNS = [
+    "Ordered Quantity",
+    "Unit Price (INR)",
+    "Total Order Value (INR)",
+]
+
+
+# =====================================================
+# MERGE RULES
+# =====================================================
+def _upsert_dimension(old: pd.DataFrame, new: pd.DataFrame, key: str) -> pd.DataFrame:
+    if old.empty:
+        return new.drop_duplicates(key, keep="last").reset_index(drop=True)
+
+    old = old.set_index(key)
+    new = new.drop_duplicates(key, keep="last").set_index(key)[old.columns]
+
+    known = new.index.intersection(old.index)
+    if len(known):
+        patch = new.loc[known]
+        old.loc[known] = patch.mask(patch == "NA", old.loc[known])
+
+    return pd.concat([old, new.drop(known)]).reset_index()
+
+
+def _append_facts(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    combined = pd.concat([old, new], ignore_index=True)
+    has_number = combined["Contract Number"] != "NA"
+
+    stale = has_number & combined.duplicated("Contract Number", keep="last")
+    stale |= ~has_number & combined.duplicated(keep="last")
+    return combined[~stale].reset_index(drop=True)
+
+
+# =====================================================
+# STORE
+# =====================================================
+class PowerBIStore:
+    """Star schema for one category, grown one upload at a time."""
+
+    def __init__(self, category: str, root: str = STORE_DIR):
+        self.category = category.strip()
+        self.dir = os.path.join(root, self.category)
+
+    def _path(self, table: str) -> str:
+        return os.path.join(self.dir, f"{table}.csv")
+
+    def exists(self) -> bool:
+        return os.path.exists(self._path(FACT_TABLE))
+
+    def load(self) -> dict:
+        """All four tables; empty DataFrames when nothing is stored yet."""
+        tables = {}
+        for table in TABLES:
+            path = self._path(table)
+            if not os.path.exists(path):
+                tables[table] = pd.DataFrame()
+                continue
+
+            # IDs and "NA" must come back exactly as written
+            df = pd.read_csv(path, dtype=str, keep_default_na=False)
+            if table == FACT_TABLE:
+                df[FACT_NUMERIC_COLUMNS] = df[FACT_NUMERIC_COLUMNS].astype("float64")
+            tables[table] = df
+        return tables
+
+    def upsert(self, delta: dict) -> dict:
+        """
+        Merge freshly generated tables (generate_powerbi_tables output)
+        into the stored schema and return the full schema.
+        """
+        current = self.load()
+        if delta[FACT_TABLE].empty:
+            return current
+
+        merged = {
+            table: _upsert_dimension(current[table], delta[table], key)
+            for table, key in DIMENSION_KEYS.items()
+        }
+        merged[FACT_TABLE] = _append_facts(current[FACT_TABLE], delta[FACT_TABLE])
+
+        # Streamlit reruns re-send the same upload: skip no-op writes
+        changed = [t for t in TABLES if not merged[t].equals(current[t])]
+        if changed:
+            self._write({t: merged[t] for t in changed})
+        return merged
+
+    def _write(self, tables: dict):
+        os.makedirs(self.dir, exist_ok=True)
+        for table, df in tables.items():
+            path = self._path(table)
+            tmp = path + ".tmp"
+            df.to_csv(tmp, index=False)
+            os.replace(tmp, path)
+
+    def clear(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
@@ -0,0 +1,285 @@
+# services/prepared_dataset.py
+# =====================================================
+# PREPARED DATASET (SHARED BY ALL SCREENS)
+#
+# - Normalized once per dataset version (last upload),
+#   not once per screen per rerun; every period and
+#   category selection is a slice of the same frame,
+#   index and cubes (query_engine)
+# - Column names stripped, text stripped, date column
+#   resolved to datetime64, value column numeric, then
+#   memory-compacted (categoricals, downcast ints)
+# - Detected column roles stored alongside the frame
+# - Rows kept sorted by the date column: date ranges
+#   are searchsorted slices (date_index)
+# - Global search index built with it (search_index)
+# - Quarter aggregate cubes for KPIs / top-N (cubes)
+# - Per-column sort orders cached for paginated grids
+# - Screens get a shallow, read-only view: filtering
+#   and adding columns never touch the shared frame
+# =====================================================
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from services.file_store import DATASET, DATE_HINTS, dataset_version
+from services.partitioned_store import NO_CATEGORY
+from services.aggregate_cubes import QuarterCubes
+from services.frame_memory import compact_frame
+from services.date_filter import resolve_date_range, sort_by_date
+from services.search_index import SearchIndex
+
+# Role → keywords, in priority order (first keyword found wins)
+ROLE_KEYWORDS = {
+    "value":    ["value", "amount", "price", "total"],
+    "category": ["category", "brand", "type", "segment"],
+    "location": ["city", "state", "district", "location"],
+    "city":     ["city"],
+    "seller":   ["seller", "buyer", "organisation", "organization", "name", "firm"],
+    "name":     ["seller", "buyer", "name", "firm"],
+    "org":      ["organisation", "organization", "seller", "buyer", "company", "name"],
+}
+
+# Roles that must point at a text column
+TEXT_ROLES = {"city", "org"}
+
+# Sort orders kept per dataset (paginated grids)
+SORTED_ORDERS = 4
+
+DATE_SAMPLE_ROWS = 15
+DATE_SAMPLE_RATIO = 0.6
+
+
+# =====================================================
+# DETECTION
+# =====================================================
+def _find_column(columns, keywords):
+    lowered = {c.lower(): c for c in columns}
+    for key in keywords:
+        for c in lowered:
+            if key in c:
+                return lowered[c]
+    return None
+
+
+def _detect_date_column(df):
+    # Name hints first (already datetime64 when typed at upload)
+    for c in df.columns:
+        name = c.lower().replace(" ", "")
+        if any(h in name for h in DATE_HINTS):
+            parsed = df[c]
+            if not pd.api.types.is_datetime64_any_dtype(parsed):
+                parsed = pd.to_datetime(parsed, errors="coerce")
+            if parsed.notna().any():
+                df[c] = parsed
+                return c
+
+    # Otherwise any text column whose head parses as dates
+    for c in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[c]):
+            return c
+        if not _is_text(df[c]):
+            continue
+        sample = df[c].dropna().astype(str).head(DATE_SAMPLE_ROWS)
+        if pd.to_datetime(sample, errors="coerce").notna().mean() >= DATE_SAMPLE_RATIO:
+            parsed = pd.to_datetime(df[c], errors="coerce")
+            if parsed.notna().any():
+                df[c] = parsed
+                return c
+
+    return None
+
+
+def _is_text(s: pd.Series) -> bool:
+    return (
+        s.dtype == object
+        or isinstance(s.dtype, pd.CategoricalDtype)
+        or pd.api.types.is_string_dtype(s.dtype)
+    )
+
+
+def detect_roles(df: pd.DataFrame) -> dict:
+    """
+    Column roles of `df` ("date", "text", "numeric" + ROLE_KEYWORDS).
+    Normalizes `df` in place: text stripped, date column parsed,
+    value column numeric (missing → 0).
+    """
+    for c in df.columns:
+        col = df[c]
+        if col.dtype == object or pd.api.types.is_string_dtype(col.dtype):
+            df[c] = col.where(col.isna(), col.astype(str).str.strip())
+
+    text_cols = [c for c in df.columns if _is_text(df[c])]
+    date_col = _detect_date_column(df)
+    text_cols = [c for c in text_cols if c != date_col]
+    numeric_cols = df.select_dtypes(include="number").columns.tolist()
+
+    roles = {
+        "date": date_col,
+        "text": text_cols,
+        "numeric": numeric_cols,
+    }
+    for role, keywords in ROLE_KEYWORDS.items():
+        pool = text_cols if role in TEXT_ROLES else df.columns
+        roles[role] = _find_column(pool, keywords)
+
+    value_col = roles["value"]
+    if value_col:
+        df[value_col] = pd.to_numeric(df[value_col], errors="coerce").fillna(0)
+        if value_col not in numeric_cols:
+            numeric_cols.append(value_col)
+        if value_col in text_cols:
+            text_cols.remove(value_col)
+
+    return roles
+
+
+# =====================================================
+# PREPARED DATASET
+# =====================================================
+class PreparedDataset:
+    """Normalized frame + column roles for one dataset version."""
+
+    def __init__(self, df: pd.DataFrame, version: float):
+        self.version = version
+        # Row labels double as positions for the search index
+        df = df.reset_index(drop=True)
+        df.columns = df.columns.astype(str).str.strip()
+        roles = detect_roles(df)
+        date_col, value_col = roles["date"], roles["value"]
+        # Repetitive text → categoricals, ints downcast (frame_memory)
+        df = compact_frame(df)
+
+        self.date_index = None
+        if date_col:
+            df, self.date_index = sort_by_date(df, date_col)
+
+        self._frame = df
+        self.roles = roles
+        # Shared across Streamlit sessions (cache_resource)
+        self._orders = OrderedDict()
+        self._lock = threading.Lock()
+        # Built on the final row order: positions must match
+        self.search_index = SearchIndex(df)
+
+        self.cubes = None
+        if value_col:
+            self.cubes = QuarterCubes(df, date_col, value_col, {
+                role: roles[role] for role in ("org", "city", "category", "seller")
+            })
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Shallow view: cheap, and writes to it never reach the cache."""
+        return self._frame.copy(deep=False)
+
+    def role(self, name: str, fallback=None):
+        """Column for a role, or `fallback` when none was detected."""
+        return self.roles.get(name) or fallback
+
+    def sorted_positions(self, col: str, ascending: bool = True) -> np.ndarray:
+        """Row positions ordered by `col` (stable, missing last); last few cached."""
+        key = (col, ascending)
+        with self._lock:
+            if key in self._orders:
+                self._orders.move_to_end(key)
+                return self._orders[key]
+
+        values = self._frame[col]
+        if isinstance(values.dtype, pd.CategoricalDtype) and not values.cat.categories.is_monotonic_increasing:
+            # Categories in file order: sort by the values themselves
+            values = values.cat.reorder_categories(values.cat.categories.sort_values())
+        order = (
+            values.sort_values(ascending=ascending, na_position="last", kind="stable")
+            .index.to_numpy()
+        )
+        order.flags.writeable = False
+        with self._lock:
+            self._orders[key] = order
+            if len(self._orders) > SORTED_ORDERS:
+                self._orders.popitem(last=False)
+        return order
+
+    def search(self, df: pd.DataFrame, term: str) -> pd.DataFrame:
+        """Rows of `df` (this frame or a filtered view of it) matching `term`."""
+        return self.search_index.filter(df, term)
+
+    def __len__(self):
+        return len(self._frame)
+
+
+# =====================================================
+# CACHED ACCESS
+# =====================================================
+@st.cache_resource(max_entries=2)
+def _prepare(version: float):
+    # All partitions: a new period / category never rebuilds the index or cubes
+    df = DATASET.load()
+    if df is None or df.empty:
+        return None
+    return PreparedDataset(df, version)
+
+
+def _period(start_date, end_date, mode):
+    """(start, end) the screen will filter to, or (None, None)."""
+    if start_date is None or mode is None:
+        return None, None
+    resolved = resolve_date_range(mode, start_date, end_date, DATASET.min_date())
+    if resolved is None:
+        return None, None
+    return resolved[0], resolved[1]
+
+
+def dataset_categories(start_date=None, end_date=None, mode=None):
+    """
+    Category values stored for the period (partition names only,
+    no rows read).
+
+    Returns:
+        (category column, sorted values), or (None, []) when the
+        dataset has no category column
+    """
+    if dataset_version() is None:
+        return None, []
+    col = DATASET.category_column()
+    if col is None:
+        return None, []
+    start, end = _period(start_date, end_date, mode)
+    parts = DATASET.partitions()
+    chosen = set(DATASET.select(None, start, end))
+    return col, sorted({c for c, _, p in parts if p in chosen and c != NO_CATEGORY})
+
+
+def select_partitions(start_date=None, end_date=None, mode=None, categories=None):
+    """
+    Stored partitions a screen with this period / categories reads
+    (SQL engine; the pandas engine slices the prepared dataset).
+
+    Returns:
+        Tuple of partition dirs (never empty when data exists)
+    """
+    start, end = _period(start_date, end_date, mode)
+    partitions = DATASET.select(categories, start, end)
+    if not partitions:
+        # Nothing stored in the period: the screen's filters come up empty
+        partitions = DATASET.select(categories) or DATASET.select()
+    return tuple(partitions)
+
+
+def get_prepared_dataset():
+    """
+    Prepared dataset for the uploaded data (all periods / categories;
+    screens narrow it with date_index and the category column).
+
+    Returns:
+        PreparedDataset, or None when no data has been uploaded
+    """
+    # First call may migrate the legacy single-file store
+    version = dataset_version()
+    if version is None:
+        return None
+    return _prepare(version)
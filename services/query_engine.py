@@ -0,0 +1,440 @@
+# services/query_engine.py
+# =====================================================
+# DATASET QUERIES FOR THE SCREENS
+#
+# - One query API (period, search, column filters,
+#   counts, sums, groupby-sum, distinct values, rows)
+#   with two backends:
+#   pandas  the shared PreparedDataset frame (sorted
+#           date slices, search index, quarter cubes)
+#   duckdb  SQL straight over the stored Parquet
+#           partitions; only result sets (KPIs, grouped
+#           tables, the rows asked for) reach Python
+# - GEM_QUERY_ENGINE=duckdb selects the SQL backend
+#   (pandas otherwise, or when duckdb isn't installed)
+# - Queries are immutable: every filter returns a new
+#   query, the cached dataset / connection is shared
+# =====================================================
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+try:
+    import duckdb
+except ImportError:   # optional: pandas backend only
+    duckdb = None
+
+from services.date_filter import apply_date_filter, resolve_date_range
+from services.file_store import DATASET, dataset_version
+from services.prepared_dataset import (
+    detect_roles,
+    get_prepared_dataset,
+    select_partitions,
+)
+from services.search_index import DATE_FORMAT, DATETIME_FORMAT
+
+ENGINE = os.environ.get("GEM_QUERY_ENGINE", "pandas").strip().lower()
+
+# Rows read to detect column roles for the SQL backend
+ROLE_SAMPLE_ROWS = 2000
+
+# Characters in the text of numbers / dates (search skips the column otherwise)
+NUMBER_CHARS = set("0123456789.-+einfa")
+DATE_CHARS = set("0123456789-: ")
+
+
+def sql_enabled() -> bool:
+    return ENGINE == "duckdb" and duckdb is not None
+
+
+# =====================================================
+# PANDAS BACKEND (PREPARED FRAME)
+# =====================================================
+def _largest_first(out: pd.DataFrame, col: str, name: str) -> pd.DataFrame:
+    # Ties ordered by the group value, as the SQL backend does
+    def plain(s):
+        return s.astype(s.cat.categories.dtype) if isinstance(s.dtype, pd.CategoricalDtype) else s
+    return out.sort_values([name, col], ascending=[False, True], key=plain)
+
+
+class FrameQuery:
+    """Filters over the shared prepared frame."""
+
+    def __init__(self, data, df, label=None, start=None, end=None, keys=None):
+        self.data = data
+        self.df = df
+        self.label, self.start, self.end = label, start, end
+        # Quarter keys answering this query from the cubes (None → scan)
+        self._keys = keys
+
+    @classmethod
+    def open(cls, data, search=None, start_date=None, end_date=None, mode=None):
+        df = data.frame
+        label = start = end = None
+
+        date_col = data.role("date")
+        if date_col and start_date is not None and mode is not None:
+            df, label, start, end = apply_date_filter(
+                df,
+                date_col=date_col,
+                from_date=start_date,
+                to_date=end_date,
+                mode=mode,
+                date_index=data.date_index
+            )
+
+        keys = None
+        if data.cubes is not None and not (search or "").strip():
+            keys = data.cubes.select(start, end) if label else data.cubes.select()
+
+        df = data.search(df, search)
+        return cls(data, df, label, start, end, keys)
+
+    # ---------------- roles / schema ----------------
+    def role(self, name: str, fallback=None):
+        return self.data.role(name, fallback)
+
+    @property
+    def columns(self):
+        return self.df.columns.tolist()
+
+    # ---------------- filters ----------------
+    def _narrow(self, mask):
+        return FrameQuery(self.data, self.df[mask], self.label, self.start, self.end)
+
+    def where_in(self, col: str, values):
+        return self._narrow(self.df[col].isin(values))
+
+    def where_equals(self, col: str, value):
+        return self._narrow(self.df[col] == value)
+
+    def where_contains(self, col: str, pattern: str):
+        """Case-insensitive regex match on the cell text."""
+        return self._narrow(
+            self.df[col].astype(str).str.contains(pattern, case=False, na=False)
+        )
+
+    # ---------------- cube shortcuts ----------------
+    def _cube_dim(self, col: str, value_col=None):
+        cubes = self.data.cubes
+        if self._keys is None or (value_col is not None and value_col != cubes.value_col):
+            return None
+        return next((dim for dim, c in cubes.dims.items() if c == col), None)
+
+    # ---------------- results ----------------
+    def count(self) -> int:
+        if self._keys is not None:
+            return self.data.cubes.summary(self._keys)["rows"]
+        return len(self.df)
+
+    def summary(self, value_col: str) -> dict:
+        """rows / sum / mean of `value_col`."""
+        if self._keys is not None and value_col == self.data.cubes.value_col:
+            return self.data.cubes.summary(self._keys)
+        values = self.df[value_col]
+        return {"rows": len(self.df), "sum": values.sum(), "mean": values.mean()}
+
+    def group_sum(self, col: str, value_col=None, name=None, n=None) -> pd.DataFrame:
+        """
+        [col, name] summed by `col`, largest first, ties by `col` (row
+        counts when `value_col` is None).
+        """
+        name = name or value_col or "count"
+        dim = self._cube_dim(col, value_col)
+        cubes = self.data.cubes
+
+        if dim is not None and value_col is None:
+            out = cubes.top_counts(dim, self._keys).rename(name).rename_axis(col).reset_index()
+        elif dim is not None:
+            out = cubes.top_values(dim, self._keys).rename(columns={value_col: name})
+        else:
+            grouped = self.df.groupby(col, observed=True)
+            out = (grouped.size() if value_col is None else grouped[value_col].sum()).reset_index(name=name)
+        out = _largest_first(out, col, name).reset_index(drop=True)
+        return out.head(n) if n else out
+
+    def value_counts(self, col: str, n=None) -> pd.Series:
+        """Row counts per value, largest first."""
+        return self.group_sum(col, None, "count", n).set_index(col)["count"]
+
+    def distinct(self, col: str):
+        return sorted(self.df[col].dropna().unique())
+
+    def rows(self, columns=None, limit=None, offset=0, order_by=None, ascending=True) -> pd.DataFrame:
+        """
+        Rows in dataset order (or sorted by `order_by`, missing last),
+        `offset` / `limit` applied after sorting.
+        """
+        stop = offset + limit if limit else None
+        if order_by is None:
+            df = self.df.iloc[offset:stop]
+        else:
+            # Cached order of the whole frame, narrowed to this query's rows
+            positions = self.data.sorted_positions(order_by, ascending)
+            if len(self.df) != len(self.data):
+                member = np.zeros(len(self.data), dtype=bool)
+                member[self.df.index.to_numpy()] = True
+                positions = positions[member[positions]]
+            df = self.data.frame.take(positions[offset:stop])
+        return df[columns] if columns else df
+
+
+# =====================================================
+# SQL BACKEND (DUCKDB OVER THE PARQUET PARTITIONS)
+# =====================================================
+def _ident(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class SqlDataset:
+    """DuckDB view over one partition selection + detected roles."""
+
+    def __init__(self, files):
+        self._con = duckdb.connect(":memory:")
+        self._lock = threading.Lock()
+        # Partition values live in the rows: no hive columns from the paths
+        self._con.read_parquet(
+            list(files),
+            union_by_name=True,
+            filename=True,
+            file_row_number=True,
+            hive_partitioning=False,
+        ).project("* EXCLUDE (_row_key)").create_view("dataset")
+
+        sample = self.fetch(f"SELECT * EXCLUDE (filename, file_row_number) FROM dataset LIMIT {ROLE_SAMPLE_ROWS}")
+        self.columns = sample.columns.tolist()
+        # Stored dtypes (detect_roles converts the sample in place)
+        self.dtypes = sample.dtypes
+        self.roles = detect_roles(sample)
+
+        # Dates must be stored as timestamps to be filtered in SQL
+        date_col = self.roles["date"]
+        self.usable = date_col is None or pd.api.types.is_datetime64_any_dtype(
+            self.fetch(f"SELECT {_ident(date_col)} FROM dataset LIMIT 0")[date_col]
+        )
+
+        # Date columns searched with their time of day (see search_index._labels)
+        dates = [c for c in self.columns if pd.api.types.is_datetime64_any_dtype(self.dtypes[c])]
+        self.timed = set()
+        if dates:
+            flags = self.fetch("SELECT " + ", ".join(
+                f"COALESCE(bool_or(CAST({_ident(c)} AS TIME) <> TIME '00:00:00'), FALSE) AS {_ident(c)}"
+                for c in dates
+            ) + " FROM dataset").iloc[0]
+            self.timed = {c for c in dates if flags[c]}
+
+        self.min_date = None
+        if date_col and self.usable:
+            self.min_date = self.fetch(f"SELECT min({_ident(date_col)}) AS d FROM dataset")["d"].iloc[0]
+
+        # Same row order as the prepared frame: by date, then load order
+        order = ["filename", "file_row_number"]
+        if date_col:
+            order.insert(0, f"{_ident(date_col)} NULLS LAST")
+        self.order_by = ", ".join(order)
+
+    def fetch(self, sql: str, params=None) -> pd.DataFrame:
+        # Cursors are per thread; the view is shared
+        with self._lock:
+            cursor = self._con.cursor()
+        try:
+            return cursor.execute(sql, params or []).df()
+        finally:
+            cursor.close()
+
+    def value_expr(self, col: str) -> str:
+        """Value column as a number (missing / unparsable → 0)."""
+        if pd.api.types.is_numeric_dtype(self.dtypes[col]):
+            return f"COALESCE({_ident(col)}, 0)"
+        return f"COALESCE(TRY_CAST({_ident(col)} AS DOUBLE), 0)"
+
+    def sum_expr(self, col: str) -> str:
+        # Integer sums stay integers (DuckDB widens them to HUGEINT)
+        total = f"sum({self.value_expr(col)})"
+        if pd.api.types.is_integer_dtype(self.dtypes[col]):
+            return f"CAST({total} AS BIGINT)"
+        return total
+
+    def may_contain(self, col: str, term: str) -> bool:
+        """False when `term` can't occur in the text of a number / date."""
+        dtype = self.dtypes[col]
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return set(term) <= DATE_CHARS
+        if pd.api.types.is_numeric_dtype(dtype):
+            return set(term) <= NUMBER_CHARS
+        return True
+
+    def text_expr(self, col: str) -> str:
+        """Cell text as the search index sees it (lowercase, pandas astype(str))."""
+        if pd.api.types.is_datetime64_any_dtype(self.dtypes[col]):
+            fmt = DATETIME_FORMAT if col in self.timed else DATE_FORMAT
+            return f"lower(strftime({_ident(col)}, '{fmt}'))"
+        return f"lower(CAST({_ident(col)} AS VARCHAR))"
+
+
+class SqlQuery:
+    """WHERE clauses pushed into DuckDB; results fetched on demand."""
+
+    def __init__(self, dataset: SqlDataset, where=(), params=(), label=None, start=None, end=None):
+        self.dataset = dataset
+        self._where, self._params = tuple(where), tuple(params)
+        self.label, self.start, self.end = label, start, end
+
+    @classmethod
+    def open(cls, dataset, search=None, start_date=None, end_date=None, mode=None):
+        query = cls(dataset)
+
+        date_col = dataset.roles["date"]
+        if date_col and start_date is not None and mode is not None and dataset.min_date is not None:
+            resolved = resolve_date_range(mode, start_date, end_date, dataset.min_date)
+            if resolved is not None:
+                start, end, label = resolved
+                query = query._and(f"{_ident(date_col)} BETWEEN ? AND ?", [start, end])
+                query.label, query.start, query.end = label, start, end
+
+        term = (search or "").strip().lower()
+        if term:
+            # Plain substring in any cell, like the search index
+            cells = [
+                f"contains({dataset.text_expr(c)}, ?)"
+                for c in dataset.columns if dataset.may_contain(c, term)
+            ]
+            query = query._and("(" + (" OR ".join(cells) or "FALSE") + ")", [term] * len(cells))
+        return query
+
+    # ---------------- roles / schema ----------------
+    def role(self, name: str, fallback=None):
+        return self.dataset.roles.get(name) or fallback
+
+    @property
+    def columns(self):
+        return list(self.dataset.columns)
+
+    # ---------------- filters ----------------
+    def _and(self, clause: str, params):
+        return SqlQuery(
+            self.dataset, self._where + (clause,), self._params + tuple(params),
+            self.label, self.start, self.end
+        )
+
+    def where_in(self, col: str, values):
+        values = list(values)
+        if not values:
+            return self._and("FALSE", [])
+        marks = ", ".join("?" * len(values))
+        return self._and(f"{_ident(col)} IN ({marks})", values)
+
+    def where_equals(self, col: str, value):
+        return self._and(f"{_ident(col)} = ?", [value])
+
+    def where_contains(self, col: str, pattern: str):
+        """Case-insensitive regex match on the cell text."""
+        return self._and(f"regexp_matches(CAST({_ident(col)} AS VARCHAR), ?, 'i')", [pattern])
+
+    # ---------------- SQL ----------------
+    def _fetch(self, select: str, tail: str = "", where=()) -> pd.DataFrame:
+        clauses = self._where + tuple(where)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        sql = f"SELECT {select} FROM dataset{where} {tail}"
+        return self.dataset.fetch(sql, list(self._params))
+
+    # ---------------- results ----------------
+    def count(self) -> int:
+        return int(self._fetch("count(*) AS n")["n"].iloc[0])
+
+    def summary(self, value_col: str) -> dict:
+        v = self.dataset.value_expr(value_col)
+        s = self.dataset.sum_expr(value_col)
+        row = self._fetch(f"count(*) AS n, {s} AS s, avg({v}) AS m")
+        total, mean = row["s"].iloc[0], row["m"].iloc[0]
+        return {
+            "rows": int(row["n"].iloc[0]),
+            "sum": total if pd.notna(total) else 0,
+            "mean": mean if pd.notna(mean) else float("nan"),
+        }
+
+    def group_sum(self, col: str, value_col=None, name=None, n=None) -> pd.DataFrame:
+        """
+        [col, name] summed by `col`, largest first (row counts when
+        `value_col` is None).
+        """
+        name = name or value_col or "count"
+        total = "count(*)" if value_col is None else self.dataset.sum_expr(value_col)
+        limit = f" LIMIT {int(n)}" if n else ""
+        c = _ident(col)
+        return self._fetch(
+            f"{c}, {total} AS {_ident(name)}",
+            f"GROUP BY {c} ORDER BY 2 DESC, 1{limit}",
+            [f"{c} IS NOT NULL"]
+        )
+
+    def value_counts(self, col: str, n=None) -> pd.Series:
+        """Row counts per value, largest first."""
+        out = self.group_sum(col, None, "count", n)
+        return out.set_index(col)["count"]
+
+    def distinct(self, col: str):
+        c = _ident(col)
+        return self._fetch(f"DISTINCT {c}", "ORDER BY 1", [f"{c} IS NOT NULL"])[col].tolist()
+
+    def rows(self, columns=None, limit=None, offset=0, order_by=None, ascending=True) -> pd.DataFrame:
+        """
+        Rows in dataset order (or sorted by `order_by`, missing last),
+        `offset` / `limit` applied after sorting.
+        """
+        select = ", ".join(_ident(c) for c in columns) if columns else \
+            "* EXCLUDE (filename, file_row_number)"
+        order = self.dataset.order_by
+        if order_by is not None:
+            direction = "ASC" if ascending else "DESC"
+            order = f"{_ident(order_by)} {direction} NULLS LAST, {order}"
+        tail = f"ORDER BY {order}"
+        if limit:
+            tail += f" LIMIT {int(limit)}"
+        if offset:
+            tail += f" OFFSET {int(offset)}"
+        return self._fetch(select, tail)
+
+
+@st.cache_resource(max_entries=4)
+def _sql_dataset(version: float, partitions: tuple):
+    return SqlDataset(DATASET.files(partitions))
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
+def open_query(search=None, start_date=None, end_date=None, mode=None, categories=None):
+    """
+    Dataset query for a screen: period and search already applied.
+
+    Args:
+        search: Top-bar search text
+        start_date, end_date, mode: Period (see apply_date_filter)
+        categories: Only these category partitions (None → all)
+
+    Returns:
+        FrameQuery / SqlQuery (.label, .start, .end describe the period
+        applied), or None when no data has been uploaded
+    """
+    if sql_enabled():
+        version = dataset_version()
+        if version is None:
+            return None
+        dataset = _sql_dataset(version, select_partitions(start_date, end_date, mode, categories))
+        if dataset.usable:
+            return SqlQuery.open(dataset, search, start_date, end_date, mode)
+
+    data = get_prepared_dataset()
+    if data is None:
+        return None
+    query = FrameQuery.open(data, search, start_date, end_date, mode)
+    # Same rows as reading only those category partitions
+    col = DATASET.category_column() if categories else None
+    if col is not None and col.strip() in query.columns:
+        query = query.where_in(col.strip(), categories)
+    return query
@@ -0,0 +1,204 @@
+# services/search_index.py
+# =====================================================
+# GLOBAL SEARCH INDEX (TOP-BAR SEARCH)
+#
+# - Built once per dataset version (see prepared_dataset)
+# - Per column: lowercase distinct values + int32 codes
+# - A query scans only the distinct values (Arrow
+#   substring kernel), then maps hits back to rows with
+#   one vectorized gather per column
+# - Columns whose alphabet lacks a character of the
+#   query (e.g. numbers for "pune") are skipped outright
+# - High-cardinality columns (phone numbers, values,
+#   IDs) also get a trigram index: 3+ char queries only
+#   verify the few values holding every trigram
+# - Last few query masks kept: Streamlit reruns with
+#   an unchanged search box cost nothing
+# - Plain substring, case-insensitive, per cell over
+#   the column's astype(str) text (no regex, no cross-
+#   column matches; missing cells never match)
+# =====================================================
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+DATE_FORMAT = "%Y-%m-%d"
+# Dates with a time of day (astype(str) switches when any isn't midnight)
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Distinct values above which a column gets a trigram index
+TRIGRAM_MIN_TERMS = 50_000
+
+RECENT_QUERIES = 8
+
+
+# =====================================================
+# TRIGRAMS (BYTE LEVEL, OVER THE DISTINCT VALUES)
+# =====================================================
+def _trigram_keys(data: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    d = data.astype(np.uint32)
+    return (d[positions] << 16) | (d[positions + 1] << 8) | d[positions + 2]
+
+
+def _buffers(terms: pa.Array):
+    """(offsets, utf-8 bytes) of a string array, zero-copy."""
+    offsets = np.frombuffer(terms.buffers()[1], dtype=np.int32)[
+        terms.offset: terms.offset + len(terms) + 1
+    ]
+    data = terms.buffers()[2]
+    data = np.frombuffer(data, dtype=np.uint8) if data is not None else np.empty(0, np.uint8)
+    return offsets, data
+
+
+class _Trigrams:
+    """Sorted trigram → distinct-value postings."""
+
+    def __init__(self, terms: pa.Array):
+        offsets, data = _buffers(terms)
+
+        # One position per trigram, tagged with its distinct value
+        counts = np.maximum(np.diff(offsets) - 2, 0)
+        owner = np.repeat(np.arange(len(terms)), counts)
+        first = np.cumsum(counts) - counts
+        positions = offsets[:-1][owner] + (np.arange(len(owner)) - first[owner])
+
+        keys = _trigram_keys(data, positions)
+        order = np.argsort(keys)
+        self.keys, self.starts = np.unique(keys[order], return_index=True)
+        self.ends = np.append(self.starts[1:], len(order))
+        self.owners = owner[order].astype(np.int32)
+
+    def candidates(self, term: bytes):
+        """Distinct-value ids containing every trigram of `term` (sorted)."""
+        data = np.frombuffer(term, dtype=np.uint8)
+        keys = np.unique(_trigram_keys(data, np.arange(len(term) - 2)))
+
+        empty = np.empty(0, dtype=np.int32)
+        if not len(self.keys):
+            return empty
+
+        slots = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        if (self.keys[slots] != keys).any():
+            return empty
+
+        postings = sorted(
+            (self.owners[self.starts[s]:self.ends[s]] for s in slots), key=len
+        )
+        found = np.unique(postings[0])
+        for p in postings[1:]:
+            if not len(found):
+                break
+            found = found[np.isin(found, p)]
+        return found
+
+
+# =====================================================
+# PER-COLUMN INDEX
+# =====================================================
+def _labels(uniques) -> pa.Array:
+    """
+    Distinct values as pandas astype(str) renders the column: floats
+    keep ".0", dates carry the time of day unless every one is midnight.
+    """
+    uniques = pd.Index(uniques)
+    if pd.api.types.is_integer_dtype(uniques.dtype):
+        # Same text as str(), without a Python call per value
+        return pc.cast(pa.array(uniques.to_numpy()), pa.string())
+    return pa.array(uniques.astype(str).to_numpy(dtype=object), type=pa.string())
+
+
+class _ColumnIndex:
+    def __init__(self, s: pd.Series):
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            codes = s.cat.codes.to_numpy()
+            uniques = s.cat.categories
+        else:
+            codes, uniques = pd.factorize(s, use_na_sentinel=True)
+
+        # NA → code -1
+        self.codes = codes.astype(np.int32, copy=False)
+        self.terms = pc.utf8_lower(_labels(uniques))
+        _, data = _buffers(self.terms)
+        self.alphabet = np.bincount(data, minlength=256) > 0
+        self.trigrams = _Trigrams(self.terms) if len(self.terms) > TRIGRAM_MIN_TERMS else None
+
+    def may_contain(self, encoded: bytes) -> bool:
+        """False when some byte of the query occurs nowhere in this column."""
+        return bool(self.alphabet[np.frombuffer(encoded, dtype=np.uint8)].all())
+
+    def matched_terms(self, term: str, encoded: bytes) -> np.ndarray:
+        """Boolean array over the distinct values: contains `term`."""
+        if self.trigrams is None or len(encoded) < 3:
+            return np.asarray(pc.match_substring(self.terms, term), dtype=bool)
+
+        matched = np.zeros(len(self.terms), dtype=bool)
+        ids = self.trigrams.candidates(encoded)
+        if len(ids):
+            verified = np.asarray(pc.match_substring(self.terms.take(ids), term), dtype=bool)
+            matched[ids[verified]] = True
+        return matched
+
+
+# =====================================================
+# SEARCH INDEX
+# =====================================================
+class SearchIndex:
+    """Vectorized case-insensitive substring search over every cell."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.rows = len(df)
+        self._columns = [_ColumnIndex(df[c]) for c in df.columns]
+        self._recent = OrderedDict()
+        # Shared across Streamlit sessions (cache_resource)
+        self._lock = threading.Lock()
+
+    def mask(self, term: str) -> np.ndarray:
+        """Boolean array (one entry per row): any cell contains `term`."""
+        term = (term or "").strip().lower()
+        if not term:
+            return np.ones(self.rows, dtype=bool)
+
+        with self._lock:
+            if term in self._recent:
+                self._recent.move_to_end(term)
+                return self._recent[term]
+
+        hits = self._scan(term)
+        hits.flags.writeable = False
+        with self._lock:
+            self._recent[term] = hits
+            if len(self._recent) > RECENT_QUERIES:
+                self._recent.popitem(last=False)
+        return hits
+
+    def _scan(self, term: str) -> np.ndarray:
+        hits = np.zeros(self.rows, dtype=bool)
+
+        encoded = term.encode("utf-8")
+        for column in self._columns:
+            if not column.may_contain(encoded):
+                continue
+            matched = column.matched_terms(term, encoded)
+            if not matched.any():
+                continue
+            # Trailing False: code -1 (missing) indexes it
+            lookup = np.append(matched, False)
+            hits |= lookup[column.codes]
+        return hits
+
+    def filter(self, df: pd.DataFrame, term: str) -> pd.DataFrame:
+        """
+        Rows of `df` matching `term`.
+
+        Args:
+            df: The indexed frame or a row subset of it (RangeIndex labels
+                are row positions in the indexed frame)
+        """
+        if not (term or "").strip():
+            return df
+        return df[self.mask(term)[df.index.to_numpy()]]
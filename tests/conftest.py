@@ -0,0 +1,57 @@
+# tests/conftest.py
+# =====================================================
+# PYTEST SETUP
+#
+# - Repo root importable (services.*, benchmarks.*)
+# - gem_multi_test.py is a manual Playwright session,
+#   not a pytest module: never collected
+# - make_dataset: typed frame shaped like an uploaded
+#   GeM orders sheet (no reportlab needed)
+# =====================================================
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+collect_ignore = ["gem_multi_test.py"]
+
+
+# =====================================================
+# SHARED DATA
+# =====================================================
+CITIES = ["Pune", "Ranchi", "Patna", "New Delhi", "Lucknow", "Guwahati"]
+STATES = ["Maharashtra", "Jharkhand", "Bihar", "Delhi", "Uttar Pradesh", "Assam"]
+CATEGORIES = ["Malaria Kits", "Dengue Kits", "Typhoid Kits", "Office Furniture"]
+BRANDS = ["TRUSTwell", "J Mitra", "Godrej", "Pratham"]
+
+
+def synthetic_dataset(n, seed=0):
+    """N rows shaped like an uploaded GeM orders sheet (typed)."""
+    r = np.random.default_rng(seed)
+    pick = lambda values: np.asarray(values, dtype=object)[r.integers(0, len(values), n)]  # noqa: E731
+    numbered = lambda prefix, k: np.char.add(prefix, r.integers(0, k, n).astype(str)).astype(object)  # noqa: E731
+
+    return pd.DataFrame({
+        "contract_no": np.char.add("GEMC-", np.arange(n).astype(str)).astype(object),
+        "organization_name": numbered("District Hospital ", max(1, n // 200)),
+        "buyer_name": numbered("Buyer ", max(1, n // 20)),
+        "seller_name": numbered("Vendor ", max(1, n // 50)),
+        "brand_name": pd.Categorical(pick(BRANDS)),
+        "category": pd.Categorical(pick(CATEGORIES)),
+        "quantity": r.integers(1, 5000, n),
+        "value": r.integers(100, 5_000_000, n).astype(float),
+        "city": pd.Categorical(pick(CITIES)),
+        "state": pd.Categorical(pick(STATES)),
+        "order_date": pd.Timestamp("2023-01-01") + pd.to_timedelta(r.integers(0, 730, n), unit="D"),
+    })
+
+
+@pytest.fixture(scope="session")
+def make_dataset():
+    return synthetic_dataset
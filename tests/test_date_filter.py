@@ -0,0 +1,71 @@
+# tests/test_date_filter.py
+# =====================================================
+# DATE RANGES: SORTED (SEARCHSORTED) VS PARSE + MASK
+#
+# apply_date_filter with a SortedDates index must keep
+# exactly the rows, label and bounds of the mask path
+# =====================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.date_filter import SortedDates, apply_date_filter, sort_by_date
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(7)
+    n = 5000
+    # Times within the day too: the end date is a midnight bound
+    dates = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 730 * 24, n), unit="h")
+    dates = pd.Series(dates)
+    dates[rng.random(n) < 0.05] = pd.NaT
+    return pd.DataFrame({"row_id": np.arange(n), "order_date": dates})
+
+
+CASES = [
+    ("quarter", None, None),
+    ("quarter", "2023-05-17", None),
+    ("quarter", "2024-12-31", None),
+    ("quarter", "2026-01-01", None),
+    ("custom", "2023-02-01", "2023-02-28"),
+    ("custom", "2024-03-31", "2023-11-15"),      # swapped
+    ("custom", "2023-06-30", "2023-06-30"),
+    ("custom", "2022-01-01", "2030-01-01"),
+    ("custom", "2023-03-01", None),              # no end → unfiltered
+]
+
+
+@pytest.mark.parametrize("mode, start, end", CASES)
+def test_sorted_matches_mask(frame, mode, start, end):
+    sorted_df, index = sort_by_date(frame, "order_date")
+    assert index is not None
+
+    fast, f_label, f_start, f_end = apply_date_filter(
+        sorted_df, "order_date", start, end, mode, date_index=index
+    )
+    slow, s_label, s_start, s_end = apply_date_filter(frame, "order_date", start, end, mode)
+
+    assert (f_label, f_start, f_end) == (s_label, s_start, s_end)
+    assert sorted(fast["row_id"]) == sorted(slow["row_id"])
+
+
+def test_sorted_dates_bounds():
+    values = pd.to_datetime(["2024-01-01", "2024-01-01", "2024-02-10", "2024-03-31", None]).to_numpy()
+    index = SortedDates(values)
+
+    assert index.min() == pd.Timestamp("2024-01-01")
+    assert index.bounds("2024-01-01", "2024-01-01") == (0, 2)
+    assert index.bounds("2024-01-02", "2024-03-31") == (2, 4)
+    assert index.bounds("2024-04-01", "2024-06-30") == (4, 4)
+    # NaT rows are never inside a range
+    assert index.bounds("2000-01-01", "2100-01-01") == (0, 4)
+
+
+def test_text_dates_fall_back_to_mask():
+    df = pd.DataFrame({"order_date": ["2024-01-05", "2024-04-01"]})
+    same, index = sort_by_date(df, "order_date")
+
+    assert index is None
+    assert same is df
@@ -0,0 +1,67 @@
+# tests/test_excel_ingest.py
+# =====================================================
+# BACKGROUND EXCEL INGEST
+#
+# - Jobs write in upload order, whichever finishes
+#   parsing first; no finished upload is dropped
+# - A failed job doesn't block the uploads after it
+# =====================================================
+
+import io
+import time
+
+import pandas as pd
+import pytest
+
+from services import file_store
+from services.partitioned_store import DatasetStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = DatasetStore(str(tmp_path / "dataset"))
+    monkeypatch.setattr(file_store, "DATASET", store)
+    monkeypatch.setattr(file_store, "_bust_cache", lambda: None)
+    return store
+
+
+def workbook(value):
+    buf = io.BytesIO()
+    pd.DataFrame({"Contract No": ["C1", "C2"], "Total Value": [value, value]}).to_excel(buf, index=False)
+    return buf.getvalue()
+
+
+def wait(*jobs):
+    for job in jobs:
+        job._thread.join(timeout=30)
+        assert job.finished
+
+
+def test_later_upload_waits_for_earlier_one(store):
+    first = file_store.IngestJob("a", "a.xlsx", workbook(1))
+    second = file_store.IngestJob("b", "b.xlsx", workbook(2)).start()
+
+    # Parsed, but an earlier upload hasn't been written yet
+    deadline = time.time() + 30
+    while second.stage != "queued" and time.time() < deadline:
+        time.sleep(0.01)
+    assert second.stage == "queued"
+
+    first.start()
+    wait(first, second)
+
+    assert (first.stage, second.stage) == ("done", "done")
+    assert first.stats["added"] == 2 and second.stats["updated"] == 2
+    assert store.load()["Total Value"].tolist() == [2, 2]
+
+
+def test_failed_upload_releases_its_turn(store):
+    broken = file_store.IngestJob("x", "x.xlsx", b"not a workbook")
+    good = file_store.IngestJob("y", "y.xlsx", workbook(3))
+    good.start()
+    broken.start()
+    wait(broken, good)
+
+    assert broken.stage == "error" and broken.error
+    assert good.stage == "done"
+    assert store.load()["Total Value"].tolist() == [3, 3]
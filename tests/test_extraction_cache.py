@@ -0,0 +1,81 @@
+# tests/test_extraction_cache.py
+# =====================================================
+# SQLITE EXTRACTION / OCR CACHES
+#
+# - Hits after put, misses for other keys
+# - A new extractor version drops old results
+# - Size cap evicts the least recently used entries
+# =====================================================
+
+import itertools
+
+import pytest
+
+from services import extraction_cache as ec
+from services.extraction_cache import ExtractionCache, OcrCache, pdf_hash
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Strictly increasing last_used stamps (no ties between fast puts)
+    ticks = itertools.count(1)
+    monkeypatch.setattr(ec.time, "time", lambda: float(next(ticks)))
+
+
+def test_structured_hit_and_miss(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "c.sqlite"), version="v1")
+    key = pdf_hash(b"%PDF contract 1")
+
+    assert cache.get(key) is None
+    cache.put(key, {"Contract No": "GEMC-1", "Quantity": "10"})
+
+    assert cache.get(key) == {"Contract No": "GEMC-1", "Quantity": "10"}
+    assert cache.get(pdf_hash(b"%PDF contract 2")) is None
+
+
+def test_new_version_drops_old_results(tmp_path):
+    path = str(tmp_path / "c.sqlite")
+    ExtractionCache(path, version="v1").put("k", {"Contract No": "GEMC-1"})
+
+    assert ExtractionCache(path, version="v2").get("k") is None
+    # Opening with v2 deleted the v1 rows for good
+    assert ExtractionCache(path, version="v1").get("k") is None
+
+
+def test_guard_settings_change_extractor_version(monkeypatch):
+    ec.extractor_version.cache_clear()
+    try:
+        base = ec.extractor_version()
+        monkeypatch.setenv("GEM_MAX_FIELD_SEARCH_CHARS", "1000")
+        ec.extractor_version.cache_clear()
+        assert ec.extractor_version() != base
+    finally:
+        ec.extractor_version.cache_clear()
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path, clock):
+    payload = {"text": "x" * 80}          # ~93 bytes of JSON each
+    cache = ExtractionCache(str(tmp_path / "c.sqlite"), max_bytes=300, version="v1")
+
+    cache.put("a", payload)
+    cache.put("b", payload)
+    cache.put("c", payload)
+    assert cache.get("a") == payload      # "a" is now the most recent
+
+    cache.put("d", payload)               # over the cap: "b" goes first
+
+    assert cache.get("b") is None
+    assert cache.get("a") == payload
+    assert cache.get("d") == payload
+
+
+def test_ocr_cache_keys_on_page_and_settings(tmp_path):
+    cache = OcrCache(str(tmp_path / "o.sqlite"))
+    key = pdf_hash(b"%PDF scanned")
+
+    cache.put(key, 0, 300, "eng", "", "page one")
+
+    assert cache.get(key, 0, 300, "eng", "") == "page one"
+    assert cache.get(key, 1, 300, "eng", "") is None
+    assert cache.get(key, 0, 200, "eng", "") is None
+    assert cache.get(key, 0, 300, "hin", "") is None
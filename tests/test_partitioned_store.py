@@ -0,0 +1,181 @@
+# tests/test_partitioned_store.py
+# =====================================================
+# PARTITIONED MULTI-UPLOAD DATASET
+#
+# - Upsert adds new keys, replaces known ones (also
+#   across partitions), dedupes keyless re-uploads
+# - Replace drops earlier uploads
+# - Loads read only the selected category × quarter
+#   partitions and keep every stored row once
+# - Compaction, head / sample / row_count
+# =====================================================
+
+import pandas as pd
+import pytest
+
+from services import partitioned_store
+from services.partitioned_store import DatasetStore, NO_CATEGORY, NO_QUARTER
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DatasetStore(str(tmp_path / "dataset"))
+
+
+def orders(rows):
+    """[(contract, category, date, value)] → typed upload."""
+    return pd.DataFrame(rows, columns=["Contract No", "Category", "Order Date", "Value"]).astype({
+        "Order Date": "datetime64[ns]",
+    })
+
+
+def by_contract(df):
+    return df.set_index("Contract No").sort_index()
+
+
+def test_upsert_adds_then_updates(store):
+    first = store.upsert(orders([
+        ("C1", "Malaria", "2024-01-10", 10),
+        ("C2", "Malaria", "2024-05-01", 20),
+        ("C3", "Dengue", "2024-02-01", 30),
+    ]))
+    assert first == {"added": 3, "updated": 0, "partitions": 3}
+
+    second = store.upsert(orders([
+        ("C2", "Malaria", "2024-05-01", 25),
+        ("C4", "Dengue", "2024-02-15", 40),
+    ]))
+    assert second["added"] == 1 and second["updated"] == 1
+
+    df = by_contract(store.load())
+    assert df["Value"].to_dict() == {"C1": 10, "C2": 25, "C3": 30, "C4": 40}
+
+
+def test_update_moves_row_between_partitions(store):
+    store.upsert(orders([("C1", "Malaria", "2024-01-10", 10)]))
+    store.upsert(orders([("C1", "Dengue", "2024-08-01", 11)]))
+
+    assert [(c, q) for c, q, _ in store.partitions()] == [("Dengue", "2024Q3")]
+    assert by_contract(store.load())["Value"].to_dict() == {"C1": 11}
+
+
+def test_same_key_twice_in_one_upload_keeps_last(store):
+    rows = [(f"C{i}", "Malaria", "2024-01-10", i) for i in range(40)]
+    stats = store.upsert(orders(rows + [("C1", "Malaria", "2024-01-10", 99)]))
+
+    assert stats["added"] == 40
+    assert by_contract(store.load()).loc["C1", "Value"] == 99
+
+
+def test_date_or_value_column_is_never_the_key(store):
+    # "Contract Date" / "Contract Value" come before "Contract No"
+    sheet = pd.DataFrame({
+        "Contract Date": pd.to_datetime(["2024-01-10", "2024-01-10", "2024-02-01"]),
+        "Contract Value": [500.0, 500.0, 700.0],
+        "Contract No": ["GEMC-1", "GEMC-2", "GEMC-3"],
+    })
+    stats = store.upsert(sheet)
+
+    assert stats["added"] == 3
+    assert sorted(store.load()["Contract No"]) == ["GEMC-1", "GEMC-2", "GEMC-3"]
+
+    # Keyed by Contract No: a re-upload updates in place
+    stats = store.upsert(sheet.assign(**{"Contract Value": [1.0, 2.0, 3.0]}))
+    assert stats == {"added": 0, "updated": 3, "partitions": 1}
+
+
+def test_repetitive_key_column_falls_back_to_row_hash(store):
+    # "Order No" that repeats across distinct lines: not a usable key
+    sheet = pd.DataFrame({"Order No": ["A", "A", "A", "B"], "Item": ["x", "y", "z", "x"]})
+    store.upsert(sheet)
+
+    assert len(store.load()) == 4
+    assert store.upsert(sheet)["added"] == 0
+
+
+def test_keyless_reupload_is_idempotent(store):
+    sheet = pd.DataFrame({
+        "Buyer": ["A", "A", "B"],            # two identical rows stay two rows
+        "Amount": [5, 5, 7],
+    })
+    store.upsert(sheet)
+    stats = store.upsert(sheet)
+
+    assert stats == {"added": 0, "updated": 3, "partitions": 1}
+    assert sorted(store.load()["Amount"]) == [5, 5, 7]
+    assert [(c, q) for c, q, _ in store.partitions()] == [(NO_CATEGORY, NO_QUARTER)]
+
+
+def test_numeric_keys_match_across_float_and_int(store):
+    store.upsert(pd.DataFrame({"Order No": [1001.0, 1002.0], "Amount": [1, 2]}))
+    stats = store.upsert(pd.DataFrame({"Order No": [1001], "Amount": [9]}))
+
+    assert stats["updated"] == 1
+    assert len(store.load()) == 2
+
+
+def test_replace_drops_earlier_uploads(store):
+    store.upsert(orders([("C1", "Malaria", "2024-01-10", 10)]))
+    store.replace(orders([("C9", "Typhoid", "2023-11-30", 90)]))
+
+    assert by_contract(store.load())["Value"].to_dict() == {"C9": 90}
+    assert store.categories() == ["Typhoid"]
+
+
+def test_select_by_category_and_quarter(store):
+    store.upsert(orders([
+        ("C1", "Malaria", "2024-01-10", 10),
+        ("C2", "Malaria", "2024-05-01", 20),
+        ("C3", "Dengue", "2024-02-01", 30),
+        ("C4", "Dengue/Chikungunya", "2024-03-31", 40),   # quoted in the path
+        ("C5", "Dengue", None, 50),
+    ]))
+
+    assert store.categories() == ["Dengue", "Dengue/Chikungunya", "Malaria"]
+    assert store.min_date() == pd.Timestamp("2024-01-01")
+
+    def contracts(**kw):
+        df = store.load(**kw)
+        return sorted(df["Contract No"]) if df is not None else []
+
+    assert contracts(categories=["Malaria"]) == ["C1", "C2"]
+    assert contracts(start="2024-01-01", end="2024-03-31") == ["C1", "C3", "C4"]
+    assert contracts(categories=["Dengue"], start="2024-04-01", end="2024-06-30") == []
+    # Undated rows only when no date range is asked for
+    assert contracts(categories=["Dengue"]) == ["C3", "C5"]
+    assert contracts(categories=["Dengue/Chikungunya"]) == ["C4"]
+
+
+def test_projection_and_row_key_hidden(store):
+    store.upsert(orders([("C1", "Malaria", "2024-01-10", 10)]))
+
+    assert store.columns() == ["Contract No", "Category", "Order Date", "Value"]
+    assert store.load(columns=["Value"]).columns.tolist() == ["Value"]
+
+
+def test_compaction_merges_small_files(store, monkeypatch):
+    monkeypatch.setattr(partitioned_store, "MAX_PARTS", 3)
+    for i in range(6):
+        store.upsert(orders([(f"C{i}", "Malaria", "2024-01-10", i)]))
+
+    (_, _, part), = store.partitions()
+    assert len(store.files([part])) <= 3
+    assert sorted(store.load()["Value"]) == list(range(6))
+
+
+def test_head_sample_and_row_count(store):
+    store.upsert(orders([
+        (f"C{i}", ["Malaria", "Dengue"][i % 2], f"2024-0{1 + i % 6}-01", i) for i in range(60)
+    ]))
+
+    assert store.row_count() == 60
+    assert store.head(7).equals(store.load().head(7))
+    sample = store.sample(12)
+    assert 6 <= len(sample) <= 18
+    assert set(sample["Contract No"]) <= set(store.load()["Contract No"])
+
+
+def test_version_changes_on_write(store):
+    assert store.version() is None and not store.exists()
+    store.upsert(orders([("C1", "Malaria", "2024-01-10", 10)]))
+    assert store.exists()
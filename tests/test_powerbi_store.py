@@ -0,0 +1,96 @@
+# tests/test_powerbi_store.py
+# =====================================================
+# PERSISTENT POWER BI STAR SCHEMA
+#
+# - Re-uploaded contracts replace their fact row
+# - Dimensions keep one row per key across uploads
+# - "NA" never overwrites a known attribute
+# - Reloaded tables equal what was written
+# =====================================================
+
+import pytest
+
+from services.custom_pdf_extractor import generate_powerbi_tables
+from services.powerbi_store import FACT_TABLE, PowerBIStore
+
+
+def contract(no, seller_id="49B2656973P0000", **fields):
+    row = {
+        "Contract No": no,
+        "Buyer Designation": "Medical Officer",
+        "Buyer Email": "buyer@gov.in",
+        "Buyer Phone Number": "0716-3336625",
+        "Buyer State": "Jharkhand",
+        "Seller Name": "Acme Enterprises",
+        "Seller Email": "sales@vendor.co.in",
+        "Seller Phone Number": "9860481052",
+        "Seller GSTIN": "27AABCA6796B1Z9",
+        "Seller State": "Assam",
+        "GeM Seller ID": seller_id,
+        "Product Name": "Malaria Rapid Diagnostic Test Kit",
+        "Brand": "TRUSTwell",
+        "Unit": "Test",
+        "Quantity": "100",
+        "Unit Price": "50",
+        "Total Order Value (INR)": "5000",
+    }
+    row.update(fields)
+    return row
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PowerBIStore("Malaria", root=str(tmp_path))
+
+
+def upload(store, rows):
+    return generate_powerbi_tables(rows, store=store)
+
+
+def test_reupload_replaces_fact_rows(store):
+    upload(store, [contract("GEMC-1"), contract("GEMC-2")])
+    tables = upload(store, [contract("GEMC-2", Quantity="300"), contract("GEMC-3")])
+
+    facts = tables[FACT_TABLE].set_index("Contract Number")
+    assert sorted(facts.index) == ["GEMC-1", "GEMC-2", "GEMC-3"]
+    assert facts.loc["GEMC-2", "Ordered Quantity"] == 300.0
+
+
+def test_contracts_without_number_dedupe_by_row(store):
+    upload(store, [contract("NA"), contract("NA", Quantity="7")])
+    tables = upload(store, [contract("NA")])
+
+    facts = tables[FACT_TABLE]
+    assert (facts["Contract Number"] == "NA").sum() == 2
+    assert sorted(facts["Ordered Quantity"]) == [7.0, 100.0]
+
+
+def test_dimensions_stay_unique(store):
+    upload(store, [contract("GEMC-1")])
+    tables = upload(store, [contract("GEMC-2"), contract("GEMC-3")])
+
+    assert len(tables["Dim_Buyer"]) == 1
+    assert len(tables["Dim_Seller"]) == 1
+    assert len(tables["Dim_Product"]) == 1
+    assert tables["Dim_Seller"]["Seller_ID"].is_unique
+
+
+def test_na_never_overwrites_known_value(store):
+    upload(store, [contract("GEMC-1")])
+    tables = upload(store, [contract(
+        "GEMC-2", **{"Seller GSTIN": "NA", "Seller State": "Bihar", "Seller Phone Number": "NA"}
+    )])
+
+    seller = tables["Dim_Seller"].set_index("Seller_ID").loc["49B2656973P0000"]
+    assert seller["Seller GSTIN"] == "27AABCA6796B1Z9"
+    assert seller["Seller Contact Number"] == "9860481052"
+    # A real new value still wins
+    assert seller["Seller State"] == "Bihar"
+
+
+def test_reload_round_trips(store, tmp_path):
+    written = upload(store, [contract("GEMC-1"), contract("NA", **{"Seller GSTIN": "NA"})])
+    loaded = PowerBIStore("Malaria", root=str(tmp_path)).load()
+
+    for table, df in written.items():
+        assert loaded[table].equals(df.astype(loaded[table].dtypes.to_dict())), table
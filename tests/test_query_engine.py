@@ -0,0 +1,159 @@
+# tests/test_query_engine.py
+# =====================================================
+# QUERY BACKENDS: PANDAS (FrameQuery) VS DUCKDB (SqlQuery)
+#
+# The same screen queries over the same stored dataset
+# must give the same counts, sums, grouped tables,
+# distinct values and row pages on both backends
+# =====================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+
+from services.partitioned_store import DatasetStore  # noqa: E402
+from services.prepared_dataset import PreparedDataset  # noqa: E402
+from services.query_engine import FrameQuery, SqlDataset, SqlQuery  # noqa: E402
+
+PERIOD = dict(start_date="2023-04-01", end_date="2023-09-30", mode="custom")
+QUARTER = dict(start_date="2024-02-10", mode="quarter")
+
+
+@pytest.fixture(scope="module")
+def backends(tmp_path_factory, make_dataset):
+    df = make_dataset(4000, seed=11)
+    df.loc[df.index % 97 == 0, "order_date"] = pd.NaT
+    df.loc[df.index % 89 == 0, "city"] = None
+    df["rate"] = (df.index % 40) / 4
+    df["updated_at"] = df["order_date"] + pd.to_timedelta((df.index % 7) * 150, unit="min")
+
+    store = DatasetStore(str(tmp_path_factory.mktemp("query") / "dataset"))
+    store.upsert(df)
+
+    data = PreparedDataset(store.load(), 0)
+    sql = SqlDataset(store.files(store.select()))
+    yield (
+        lambda **kw: FrameQuery.open(data, **kw),
+        lambda **kw: SqlQuery.open(sql, **kw),
+    )
+    sql._con.close()
+
+
+def assert_same_frame(a, b):
+    a = a.reset_index(drop=True)
+    b = b.reset_index(drop=True)
+    assert a.columns.tolist() == b.columns.tolist()
+    assert a.astype(str).equals(b.astype(str))
+
+
+def assert_same_summary(a, b):
+    assert a["rows"] == b["rows"]
+    assert a["sum"] == pytest.approx(b["sum"])
+    if a["rows"]:
+        assert a["mean"] == pytest.approx(b["mean"])
+
+
+QUERIES = {
+    "all": {},
+    "custom period": PERIOD,
+    "quarter": QUARTER,
+    "search": dict(search="pune"),
+    "search + period": dict(search="vendor 1", **PERIOD),
+    "date search": dict(search="2023-05"),
+    "time search": dict(search="02:30"),
+    "float search": dict(search="7.0"),
+    "no match": dict(search="zzz-nothing"),
+}
+
+
+@pytest.mark.parametrize("kw", QUERIES.values(), ids=QUERIES.keys())
+def test_counts_and_summary(backends, kw):
+    frame, sql = backends
+    f, s = frame(**kw), sql(**kw)
+
+    assert (f.label, f.start, f.end) == (s.label, s.start, s.end)
+    assert f.count() == s.count()
+    assert_same_summary(f.summary("value"), s.summary("value"))
+
+
+@pytest.mark.parametrize("kw", QUERIES.values(), ids=QUERIES.keys())
+def test_group_sums(backends, kw):
+    frame, sql = backends
+    f, s = frame(**kw), sql(**kw)
+
+    for col in ("city", "category", "seller_name"):
+        assert_same_frame(f.group_sum(col, "value", n=5), s.group_sum(col, "value", n=5))
+        assert_same_frame(f.group_sum(col, None, "Orders"), s.group_sum(col, None, "Orders"))
+
+    np.testing.assert_array_equal(f.value_counts("state").to_numpy(), s.value_counts("state").to_numpy())
+
+
+def test_column_filters(backends):
+    frame, sql = backends
+    f = frame(**PERIOD).where_in("category", ["Malaria Kits", "Dengue Kits"]).where_equals("city", "Pune")
+    s = sql(**PERIOD).where_in("category", ["Malaria Kits", "Dengue Kits"]).where_equals("city", "Pune")
+
+    assert f.count() == s.count() > 0
+    assert_same_summary(f.summary("quantity"), s.summary("quantity"))
+    assert_same_frame(f.group_sum("buyer_name", "value", n=10), s.group_sum("buyer_name", "value", n=10))
+
+    f = frame().where_contains("organization_name", r"hospital 1\d$")
+    s = sql().where_contains("organization_name", r"hospital 1\d$")
+    assert f.count() == s.count() > 0
+
+    assert frame().where_in("city", []).count() == sql().where_in("city", []).count() == 0
+
+
+def test_distinct(backends):
+    frame, sql = backends
+    for col in ("city", "brand_name", "seller_name"):
+        assert [str(v) for v in frame(**PERIOD).distinct(col)] == [str(v) for v in sql(**PERIOD).distinct(col)]
+
+
+@pytest.mark.parametrize("order_by, ascending", [
+    (None, True),
+    ("value", False),
+    ("city", True),
+    ("order_date", False),
+])
+def test_row_pages(backends, order_by, ascending):
+    frame, sql = backends
+    cols = ["contract_no", "city", "value", "order_date"]
+
+    for kw in ({}, PERIOD, dict(search="pune")):
+        for offset in (0, 150):
+            page = dict(columns=cols, limit=50, offset=offset, order_by=order_by, ascending=ascending)
+            assert_same_frame(frame(**kw).rows(**page), sql(**kw).rows(**page))
+
+
+def test_open_query_prepares_once_per_version(tmp_path, monkeypatch, make_dataset):
+    import services.prepared_dataset as prepared
+    import services.query_engine as engine
+
+    store = DatasetStore(str(tmp_path / "dataset"))
+    store.upsert(make_dataset(1500, seed=5))
+    for module in (prepared, engine):
+        monkeypatch.setattr(module, "DATASET", store)
+        monkeypatch.setattr(module, "dataset_version", lambda: 7.0)
+
+    built = []
+    monkeypatch.setattr(prepared, "PreparedDataset", lambda df, v: built.append(v) or PreparedDataset(df, v))
+    prepared._prepare.clear()
+    engine._sql_dataset.clear()
+
+    picked = ["Malaria Kits", "Dengue Kits"]
+    for kw in ({}, PERIOD, QUARTER, dict(categories=picked, **PERIOD)):
+        monkeypatch.setattr(engine, "ENGINE", "pandas")
+        f = engine.open_query(**kw)
+        monkeypatch.setattr(engine, "ENGINE", "duckdb")
+        s = engine.open_query(**kw)
+        assert isinstance(f, FrameQuery) and isinstance(s, SqlQuery)
+        assert f.count() == s.count() > 0
+        assert_same_summary(f.summary("value"), s.summary("value"))
+
+    # Every period / category selection sliced from the same prepared frame
+    assert built == [7.0]
+    prepared._prepare.clear()
+    engine._sql_dataset.clear()
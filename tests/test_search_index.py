@@ -0,0 +1,98 @@
+# tests/test_search_index.py
+# =====================================================
+# TOP-BAR SEARCH INDEX VS A PLAIN SCAN
+#
+# SearchIndex.mask must equal a per-cell, case-
+# insensitive literal str.contains over the column's
+# astype(str) text (whole floats keep ".0", dates
+# show a time of day only when some value has one,
+# missing cells never match), with and without the
+# trigram index
+# =====================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import search_index
+from services.search_index import SearchIndex
+
+QUERIES = [
+    "pune", "PUNE", "vendor 12", "hospital 3", "2024-03", "987", "12.5",
+    "e", "kits", "zzz-no-match", "(", ".", ".0", "00:00", "14:30",
+]
+
+
+@pytest.fixture
+def frame(make_dataset):
+    df = make_dataset(3000, seed=3)
+    rng = np.random.default_rng(3)
+    df["rate"] = rng.integers(0, 400, len(df)) / 4          # 12.5, 3.25, 7.0, …
+    # Dates with a time of day on some rows
+    df["updated_at"] = df["order_date"] + pd.to_timedelta(
+        np.where(rng.random(len(df)) < 0.3, rng.integers(0, 96, len(df)) * 15, 0), unit="min"
+    )
+    # Missing cells in text, numeric and date columns
+    for c in ("buyer_name", "rate", "order_date", "updated_at", "city"):
+        df.loc[rng.random(len(df)) < 0.05, c] = None
+    return df
+
+
+def scan(df, term):
+    """Reference: any cell's astype(str) text contains `term`."""
+    term = term.strip().lower()
+    hits = np.zeros(len(df), dtype=bool)
+    for c in df.columns:
+        col = df[c]
+        text = col.astype(str).where(col.notna())
+        hits |= text.str.lower().str.contains(term, regex=False, na=False).to_numpy()
+    return hits
+
+
+@pytest.mark.parametrize("trigram_min_terms", [50_000, 10], ids=["scan", "trigrams"])
+@pytest.mark.parametrize("term", QUERIES)
+def test_mask_matches_scan(frame, monkeypatch, trigram_min_terms, term):
+    monkeypatch.setattr(search_index, "TRIGRAM_MIN_TERMS", trigram_min_terms)
+    index = SearchIndex(frame)
+
+    np.testing.assert_array_equal(index.mask(term), scan(frame, term))
+
+
+def test_blank_term_keeps_every_row(frame):
+    index = SearchIndex(frame)
+
+    assert index.mask("   ").all()
+    assert index.filter(frame, "") is frame
+
+
+def test_filter_on_a_row_subset(frame):
+    index = SearchIndex(frame)
+    subset = frame.iloc[500:1500]
+
+    expected = subset[scan(subset, "pune")]
+    assert index.filter(subset, "pune").equals(expected)
+
+
+def test_repeated_query_served_from_recent(frame):
+    index = SearchIndex(frame)
+    first = index.mask("vendor 1")
+
+    assert index.mask("VENDOR 1 ") is first
+    assert not first.flags.writeable
+
+
+def test_labels_render_like_astype_str():
+    df = pd.DataFrame({
+        "value": [1500.0, 12.5, 1e-05],
+        "day": pd.to_datetime(["2024-05-01", "2024-05-02", None]),
+        "stamp": pd.to_datetime(["2024-03-01 00:00", "2024-03-02 14:30", "2024-03-03 00:00"]),
+    })
+    index = SearchIndex(df)
+
+    assert index.mask("1500.0").tolist() == [True, False, False]
+    assert index.mask("1e-05").tolist() == [False, False, True]
+    # Midnight-only dates show no time; one timed value gives every row one
+    assert index.mask("2024-05-01").tolist() == [True, False, False]
+    assert not index.mask("2024-05-01 00").any()
+    assert index.mask("2024-03-03 00:00:00").tolist() == [False, False, True]
+    assert index.mask("14:30").tolist() == [False, True, False]